@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Black Ops - 程序化素材图集
+
+墙壁/地面纹理、天空、地面、武器和敌人精灵原本每次启动都用 pygame 绘图调用生成;
+现在第一次生成后存入磁盘上的图集, 之后内存映射直接复制像素, 不再重新绘制
+(天空/地面绘制一次约 6ms, 压缩后解码也要 3ms 以上, 所以像素不压缩)
+
+文件布局 (小端):
+    头部   魔数, 版本, 索引长度
+    索引   JSON: 每个素材的绘制函数哈希和各个表面的像素块, 每个像素块 (宽, 高, 格式, 偏移, 长度),
+           偏移从像素区开头算起
+    像素   原始像素 (不透明为 RGBX, 带透明度为 RGBA), 按需复制
+
+文件名含设置哈希 (版本, 纹理尺寸, Python/pygame 版本); 每个素材另记绘制函数的字节码和参数哈希,
+修改某个绘制函数后只重画该素材
+
+运行方式:
+    python3 assets.py          # 预先生成所有素材
+    python3 assets.py --info   # 查看图集内容
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pygame
+from settings import *
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '.cache')
+
+MAGIC = b'BOAT'
+ATLAS_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHI')
+
+
+def settings_hash():
+    """影响绘制结果的设置的哈希"""
+    key = (ATLAS_VERSION, TEXTURE_SIZE, sys.version_info[:2], pygame.version.ver)
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:12]
+
+
+def _update_code(digest, code):
+    """把函数的字节码和常量 (含嵌套函数) 加入哈希"""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _update_code(digest, const)
+        else:
+            digest.update(repr(const).encode('utf-8'))
+
+
+def builder_digest(builder, args):
+    """绘制函数和参数的哈希"""
+    digest = hashlib.sha1()
+    _update_code(digest, getattr(builder, '__func__', builder).__code__)
+    digest.update(repr(args).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class AssetAtlas:
+    """磁盘上的素材图集
+
+    load 返回缓存的表面 (或 {键: 表面} 字典), 缺失或绘制函数变化时调用绘制函数并标记待保存;
+    save 把新生成的素材写回文件
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = None  # 名称 -> {'digest', 'kind', 'items': [[键, 像素块序号]]}
+        self.blobs = []  # 像素块 (宽, 高, 格式, 像素)
+        self._mmap = None
+        self.surfaces = {}  # 名称 -> 已解码的表面或字典
+        self.dirty = False
+        self.built = 0  # 本次运行中重新绘制的素材数
+
+    def _read(self):
+        """映射图集文件 (不存在或格式不对时为空图集)"""
+        self.entries = {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            magic, version, _, index_size = _HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != ATLAS_VERSION:
+                return
+            index = json.loads(data[_HEADER.size:_HEADER.size + index_size].decode('utf-8'))
+        except (OSError, ValueError, struct.error):
+            return
+
+        self._mmap = data
+        view = memoryview(data)[_HEADER.size + index_size:]
+        self.blobs = [(w, h, mode, view[offset:offset + length])
+                      for w, h, mode, offset, length in index['blobs']]
+        self.entries = index['entries']
+
+    def _decode(self, blob):
+        """把像素块复制为表面 (与绘制函数创建的表面格式相同)"""
+        w, h, mode, pixels = blob
+        image = pygame.image.frombuffer(pixels, (w, h), mode)
+        if mode == 'RGBA':
+            return image.copy()
+        surface = pygame.Surface((w, h))
+        surface.blit(image, (0, 0))
+        return surface
+
+    def _encode(self, surface):
+        """把表面转换为像素块"""
+        mode = 'RGBA' if surface.get_flags() & pygame.SRCALPHA else 'RGBX'
+        w, h = surface.get_size()
+        return w, h, mode, pygame.image.tobytes(surface, mode)
+
+    def load(self, name, builder, *args):
+        """获取素材: builder(*args) 返回表面或 {键: 表面} 字典 (多个键可以共用一个表面)"""
+        if self.entries is None:
+            self._read()
+
+        digest = builder_digest(builder, args)
+        entry = self.entries.get(name)
+        if entry is not None and entry['digest'] == digest:
+            value = self.surfaces.get(name)
+            if value is None:
+                decoded = {}
+                items = {}
+                for key, blob in entry['items']:
+                    surface = decoded.get(blob)
+                    if surface is None:
+                        surface = decoded[blob] = self._decode(self.blobs[blob])
+                    items[key] = surface
+                value = items[None] if entry['kind'] == 'surface' else items
+                self.surfaces[name] = value
+            return value
+
+        value = builder(*args)
+        self.built += 1
+        items = [(None, value)] if isinstance(value, pygame.Surface) else list(value.items())
+        blob_ids = {}
+        entry = {'digest': digest, 'kind': 'surface' if items[0][0] is None else 'dict', 'items': []}
+        for key, surface in items:
+            blob = blob_ids.get(id(surface))
+            if blob is None:
+                blob = blob_ids[id(surface)] = len(self.blobs)
+                self.blobs.append(self._encode(surface))
+            entry['items'].append([key, blob])
+        self.entries[name] = entry
+        self.surfaces[name] = value
+        self.dirty = True
+        return value
+
+    def save(self):
+        """写回新生成的素材 (只保留仍被索引引用的像素块, 先写临时文件再替换)"""
+        if not self.dirty:
+            return
+        blobs = []
+        body = bytearray()
+        remap = {}
+        for entry in self.entries.values():
+            for item in entry['items']:
+                blob = item[1]
+                if blob not in remap:
+                    w, h, mode, pixels = self.blobs[blob]
+                    remap[blob] = len(blobs)
+                    blobs.append([w, h, mode, len(body), len(pixels)])
+                    body += pixels
+                item[1] = remap[blob]
+        view = memoryview(body)
+        self.blobs = [(w, h, mode, view[offset:offset + length])
+                      for w, h, mode, offset, length in blobs]
+
+        # 旧文件的像素已复制到 body, 不再引用旧的映射
+        self._mmap = None
+
+        index = json.dumps({'entries': self.entries, 'blobs': blobs}).encode('utf-8')
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = self.path + '.tmp'
+            with open(temp, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, ATLAS_VERSION, 0, len(index)))
+                f.write(index)
+                f.write(body)
+            os.replace(temp, self.path)
+        except OSError as e:
+            # 目录不可写时只在内存中使用
+            print(f"无法写入素材图集: {e}")
+        self.dirty = False
+
+
+def atlas_path():
+    """当前设置对应的图集文件"""
+    return os.path.join(CACHE_DIR, f'atlas-{settings_hash()}.bin')
+
+
+# 全局图集
+atlas = AssetAtlas(atlas_path())
+
+
+def bake(screen):
+    """生成所有素材: 各档分辨率的渲染器, 武器和所有敌人类型"""
+    # 作为脚本运行时本模块是 __main__, 要用渲染器导入的 assets 模块中的图集
+    from assets import atlas
+    from raycaster import GameMap
+    from resolution import ResolutionController
+    from systems.weapon import WeaponRenderer
+    from entities.enemy import Enemy
+    from data.enemies import ENEMY_TYPES
+
+    game_map = GameMap()
+    game_map.load_from_string('###\n#P#\n###')
+    resolution = ResolutionController(screen, game_map)
+    for level in range(len(RESOLUTION_LEVELS)):
+        resolution._get_raycaster(level)
+    WeaponRenderer(screen)
+    for enemy_type in ENEMY_TYPES:
+        Enemy(1.5, 1.5, enemy_type)
+    atlas.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Black Ops 素材图集')
+    parser.add_argument('--info', action='store_true', help='只显示图集内容')
+    args = parser.parse_args()
+
+    from assets import atlas
+    if args.info:
+        atlas._read()
+        if not atlas.entries:
+            print(f"图集不存在: {atlas.path}")
+            return 1
+    else:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.init()
+        bake(pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT)))
+
+    for name, entry in sorted(atlas.entries.items()):
+        surfaces = {blob for _, blob in entry['items']}
+        print(f"{name:<24}{len(entry['items']):>3} 项  {len(surfaces)} 个表面  {entry['digest']}")
+    print(f"{atlas.path}  {os.path.getsize(atlas.path)} 字节")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
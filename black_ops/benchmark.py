@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Black Ops - 无窗口性能基准测试
+
+在 SDL dummy 驱动下加载每个关卡, 按固定 dt 回放脚本化的玩家路线,
+统计各阶段 (AI, 光线, 地面, 墙壁, 精灵, HUD) 每帧耗时的分位数,
+并与 JSON 基线比较以发现渲染路径的性能回退
+
+运行方式:
+    python3 benchmark.py                 # 运行并与基线比较
+    python3 benchmark.py --save          # 运行并写入基线
+    python3 benchmark.py --missions mission1 --frames 300
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+
+# 必须在导入 pygame 之前设置
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from settings import *
+from game import Game
+from systems.navigation import Navigator
+from data.missions import MISSIONS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+
+# 统计的阶段 (顺序即输出顺序)
+STAGES = ['frame', 'update', 'ai', 'draw', 'rays', 'floor', 'walls', 'sprites', 'hud']
+
+
+class StageTimer:
+    """给对象的方法套上计时, 按阶段累计每帧耗时 (毫秒)"""
+
+    def __init__(self):
+        self.frame = {}
+        self.samples = {stage: [] for stage in STAGES}
+
+    def wrap(self, obj, name, stage):
+        """替换实例上的方法为计时版本"""
+        func = getattr(obj, name)
+        frame = self.frame
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                frame[stage] = frame.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+        setattr(obj, name, timed)
+
+    def commit(self, record):
+        """结束一帧: 记录各阶段耗时"""
+        frame = self.frame
+        # 墙壁 = 整个光线投射阶段减去其中的光线求交和地面投射
+        frame['walls'] = frame.get('walls', 0.0) - frame.get('rays', 0.0) - frame.get('floor', 0.0)
+        if record:
+            for stage in STAGES:
+                self.samples[stage].append(frame.get(stage, 0.0))
+        frame.clear()
+
+
+def percentile(values, q):
+    """线性插值分位数 (q 为 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(values):
+    """耗时统计"""
+    return {
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else 0.0,
+    }
+
+
+def build_route(game_map, start):
+    """脚本化路线: 从起点沿A*路径走到最远的可达格子"""
+    navigator = Navigator()
+    navigator.begin_frame(game_map)
+    start_index = navigator._index(*start)
+    field = navigator.flow_field(start_index)
+    farthest = max(range(len(field)), key=lambda i: field[i])
+    stride = game_map.stride
+    goal = (farthest % stride - 0.5, farthest // stride - 0.5)
+    return navigator.find_path(start[0], start[1], goal[0], goal[1]) or [start]
+
+
+def player_poses(game_map, start, start_angle, frames, dt):
+    """逐帧的玩家位置和朝向: 先原地转一圈, 再沿路线往返并左右扫视"""
+    route = [start] + build_route(game_map, start)
+    turn_frames = int(2.0 / dt)
+    step = PLAYER_SPEED * dt
+
+    x, y = start
+    angle = start_angle
+    index = 1
+    direction = 1
+    for frame in range(frames):
+        if frame < turn_frames:
+            angle = start_angle + 2 * math.pi * frame / turn_frames
+        elif len(route) > 1:
+            target = route[index]
+            dx = target[0] - x
+            dy = target[1] - y
+            distance = math.sqrt(dx * dx + dy * dy)
+            if distance <= step:
+                x, y = target
+                # 到达终点后折返
+                if not 0 <= index + direction < len(route):
+                    direction = -direction
+                index += direction
+            else:
+                x += dx / distance * step
+                y += dy / distance * step
+            angle = math.atan2(dy, dx) + 0.4 * math.sin(frame * dt * 2)
+        yield x, y, angle
+
+
+def run_mission(game, mission_id, frames, warmup, dt, seed):
+    """回放一个关卡, 返回各阶段的耗时统计"""
+    random.seed(seed)
+    game._start_mission(mission_id)
+    game.state = GameState.PLAYING
+
+    # 固定在全分辨率, 结果才可比较
+    game.resolution.enabled = False
+    game.resolution.set_level(0)
+
+    timer = StageTimer()
+    timer.wrap(game.enemy_manager, 'update', 'ai')
+    timer.wrap(game.raycaster, 'cast_rays', 'walls')
+    if game.raycaster.use_numpy:
+        timer.wrap(game.raycaster, 'cast_all', 'rays')
+    if game.raycaster.floor_caster:
+        # 整帧模式只调用 render, 逐列模式由 draw 投射并贴图
+        name = 'render' if game.raycaster.use_framebuffer else 'draw'
+        timer.wrap(game.raycaster.floor_caster, name, 'floor')
+    timer.wrap(game.raycaster, 'render_sprites', 'sprites')
+    timer.wrap(game.weapon_renderer, 'draw_weapon', 'hud')
+    timer.wrap(game.hud, 'draw', 'hud')
+    timer.wrap(game.dialogue_box, 'draw', 'hud')
+
+    player = game.player
+    poses = player_poses(game.game_map, (player.x, player.y), player.angle, frames + warmup, dt)
+    for frame, (x, y, angle) in enumerate(poses):
+        player.x, player.y, player.angle = x, y, angle
+        player.hp = player.max_hp  # 基准测试中玩家不死亡
+
+        start = time.perf_counter()
+        game._update_playing(dt)
+        updated = time.perf_counter()
+        game._draw_playing()
+        end = time.perf_counter()
+
+        timer.frame['update'] = (updated - start) * 1000
+        timer.frame['draw'] = (end - updated) * 1000
+        timer.frame['frame'] = (end - start) * 1000
+        timer.commit(frame >= warmup)
+
+    return {stage: summarize(values) for stage, values in timer.samples.items()}
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """与基线比较 p95, 返回回退列表"""
+    regressions = []
+    for mission_id, stages in results.items():
+        old_stages = baseline.get('missions', {}).get(mission_id)
+        if not old_stages:
+            continue
+        for stage, stats in stages.items():
+            old = old_stages.get(stage, {}).get('p95')
+            if old is None:
+                continue
+            new = stats['p95']
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append((mission_id, stage, old, new))
+    return regressions
+
+
+def print_results(results):
+    """打印结果表"""
+    print(f"{'mission':<12}{'stage':<10}{'mean':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  (ms)")
+    for mission_id, stages in results.items():
+        for stage in STAGES:
+            s = stages[stage]
+            print(f"{mission_id:<12}{stage:<10}{s['mean']:8.2f}{s['p50']:8.2f}"
+                  f"{s['p95']:8.2f}{s['p99']:8.2f}{s['max']:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Black Ops 无窗口性能基准测试')
+    parser.add_argument('--missions', nargs='*', default=list(MISSIONS), help='要测试的关卡')
+    parser.add_argument('--frames', type=int, default=600, help='每个关卡统计的帧数')
+    parser.add_argument('--warmup', type=int, default=30, help='不计入统计的预热帧数')
+    parser.add_argument('--seed', type=int, default=1234, help='随机种子 (AI和屏幕抖动)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线JSON路径')
+    parser.add_argument('--save', action='store_true', help='将结果写入基线')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='p95 允许变慢的比例')
+    parser.add_argument('--min-delta', type=float, default=0.5, help='忽略小于该值的变化 (毫秒)')
+    args = parser.parse_args()
+
+    dt = 1.0 / FPS
+    game = Game()
+    results = {}
+    for mission_id in args.missions:
+        results[mission_id] = run_mission(game, mission_id, args.frames, args.warmup, dt, args.seed)
+
+    print_results(results)
+
+    if args.save:
+        data = {
+            'settings': {
+                'num_rays': NUM_RAYS,
+                'ray_engine': RAY_ENGINE,
+                'render_mode': RENDER_MODE,
+                'floor_casting': FLOOR_CASTING,
+                'frames': args.frames,
+                'seed': args.seed,
+            },
+            'missions': results,
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"\n基线已写入: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n没有基线文件 ({args.baseline}), 使用 --save 创建")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if not regressions:
+        print("\n没有发现性能回退")
+        return 0
+
+    print("\n性能回退 (p95):")
+    for mission_id, stage, old, new in regressions:
+        print(f"  {mission_id:<12}{stage:<10}{old:8.2f} -> {new:8.2f} ms")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Black Ops - 批量DDA光线求交
+一次性计算所有光线与网格墙壁的交点 (NumPy向量化)
+"""
+
+import math
+from settings import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def cast_rays_dda(grid, px, py, angles, max_depth=MAX_DEPTH):
+    """批量DDA光线投射
+
+    grid: GameMap.grid_array (带一圈实心边框的uint8网格), angles: 每条光线的角度数组
+    返回 (depth, texture, offset, is_vertical) 四个数组:
+    depth 为沿光线的欧氏距离 (未做鱼眼修正), 未命中时为 max_depth, 纹理为1
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    n = angles.shape[0]
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+
+    # 避免除零 (平行于坐标轴的光线)
+    cos_a[np.abs(cos_a) < 1e-9] = 1e-9
+    sin_a[np.abs(sin_a) < 1e-9] = 1e-9
+
+    delta_x = np.abs(1.0 / cos_a)
+    delta_y = np.abs(1.0 / sin_a)
+    step_x = np.where(cos_a > 0, 1, -1)
+    step_y = np.where(sin_a > 0, 1, -1)
+
+    cell_x = math.floor(px)
+    cell_y = math.floor(py)
+    map_x = np.full(n, cell_x, dtype=np.int64)
+    map_y = np.full(n, cell_y, dtype=np.int64)
+
+    # 到第一条竖直/水平网格线的距离
+    side_x = np.where(cos_a > 0, cell_x + 1 - px, px - cell_x) * delta_x
+    side_y = np.where(sin_a > 0, cell_y + 1 - py, py - cell_y) * delta_y
+
+    depth = np.full(n, float(max_depth))
+    texture = np.ones(n, dtype=np.uint8)
+    is_vertical = np.zeros(n, dtype=bool)
+
+    max_x = grid.shape[1] - 1
+    max_y = grid.shape[0] - 1
+
+    # 只对仍在前进的光线计算
+    active = np.arange(n)
+    while active.size:
+        sx = side_x[active]
+        sy = side_y[active]
+        vertical = sx < sy
+
+        dist = np.where(vertical, sx, sy)
+        map_x[active] += np.where(vertical, step_x[active], 0)
+        map_y[active] += np.where(vertical, 0, step_y[active])
+        side_x[active] = np.where(vertical, sx + delta_x[active], sx)
+        side_y[active] = np.where(vertical, sy, sy + delta_y[active])
+
+        gx = np.clip(map_x[active] + 1, 0, max_x)
+        gy = np.clip(map_y[active] + 1, 0, max_y)
+        tile = grid[gy, gx]
+
+        hit = (tile > 0) & (dist < max_depth)
+        hit_rays = active[hit]
+        depth[hit_rays] = dist[hit]
+        texture[hit_rays] = tile[hit]
+        is_vertical[hit_rays] = vertical[hit]
+
+        active = active[~hit & (dist < max_depth)]
+
+    # 纹理偏移: 竖直墙取y坐标小数部分, 水平墙取x坐标小数部分
+    hit_x = px + depth * cos_a
+    hit_y = py + depth * sin_a
+    offset = np.where(is_vertical, hit_y, hit_x) % 1.0
+
+    return depth, texture, offset, is_vertical
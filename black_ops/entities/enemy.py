@@ -12,12 +12,53 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from data.enemies import ENEMY_TYPES, ENEMY_BEHAVIOR
+from systems.navigation import Navigator
+from pool import ObjectPool, FramePool
+from assets import atlas
+from dda import np
+from entities.enemy_engine import EnemyBatchEngine
+
+
+class EnemyAttack:
+    """敌人的一次攻击 (按帧回收, 只在产生的当帧有效)"""
+
+    __slots__ = ('type', 'x', 'y', 'angle', 'damage', 'enemy')
+
+    def __init__(self):
+        self.type = 'enemy_attack'
+        self.x = 0.0
+        self.y = 0.0
+        self.angle = 0.0
+        self.damage = 0
+        self.enemy = None
+
+
+# 攻击对象池 (EnemyManager.update 每帧开始时回收)
+_attack_pool = FramePool('attack', EnemyAttack)
 
 
 class Enemy:
     """敌人类"""
 
+    __slots__ = (
+        'x', 'y', 'type', 'angle',
+        'hp', 'max_hp', 'damage', 'fire_rate', 'accuracy', 'speed', 'view_distance', 'view_angle',
+        'attack_range', 'view_cos', 'color', 'points', 'is_boss', 'drops', 'is_target',
+        'state', 'patrol_points', 'patrol_index', 'wait_timer', 'alert_timer', 'last_known_player_pos',
+        'path', 'path_index', 'path_goal',
+        'shoot_cooldown', 'is_alive', 'death_timer',
+        'animation_frame', 'animation_timer', 'hit_flash', 'sprite_base', 'sprite_surface',
+        'cell', 'sight_visible', 'sight_cell',
+    )
+
+    # 基础精灵只取决于类型, 同类型敌人共享
+    _sprite_bases = {}
+
     def __init__(self, x, y, enemy_type, patrol_points=None):
+        self.reset(x, y, enemy_type, patrol_points)
+
+    def reset(self, x, y, enemy_type, patrol_points=None):
+        """(重新) 初始化敌人, 对象池复用时调用"""
         if enemy_type not in ENEMY_TYPES:
             enemy_type = "soldier"
 
@@ -38,10 +79,12 @@ class Enemy:
         self.view_distance = data["view_distance"]
         self.view_angle = data["view_angle"]
         self.attack_range = data["attack_range"]
+        self.view_cos = math.cos(math.radians(self.view_angle / 2))
         self.color = data["color"]
         self.points = data["points"]
         self.is_boss = data.get("is_boss", False)
         self.drops = data.get("drops", [])
+        self.is_target = False
 
         # AI状态
         self.state = EnemyState.PATROL if patrol_points else EnemyState.IDLE
@@ -51,6 +94,11 @@ class Enemy:
         self.alert_timer = 0
         self.last_known_player_pos = None
 
+        # 巡逻路径 (A* 路径点, 由寻路系统缓存)
+        self.path = None
+        self.path_index = 0
+        self.path_goal = None
+
         # 战斗状态
         self.shoot_cooldown = 0
         self.is_alive = True
@@ -62,61 +110,79 @@ class Enemy:
         self.hit_flash = 0
         self.sprite_surface = None
 
+        # 空间哈希中的格子 (由 EnemyManager 维护)
+        self.cell = None
+
+        # 最近一次视线检测的结果和当时玩家所在的格子 (检测预算用完时, 玩家没换格子才沿用)
+        self.sight_visible = False
+        self.sight_cell = None
+
         # 生成精灵
         self._generate_sprite()
 
     def _generate_sprite(self):
-        """生成敌人精灵 (像素风格)"""
+        """获取敌人精灵 (同类型的敌人共用, 素材图集中有时直接加载)"""
+        sprite_base = Enemy._sprite_bases.get(self.type)
+        if sprite_base is None:
+            sprite_base = atlas.load('enemy/' + self.type, Enemy._draw_sprite, self.type, self.color, self.is_boss)
+            Enemy._sprite_bases[self.type] = sprite_base
+        self.sprite_base = sprite_base
+
+    @staticmethod
+    def _draw_sprite(enemy_type, color, is_boss):
+        """绘制敌人精灵 (像素风格)"""
         size = 64
-        self.sprite_base = pygame.Surface((size, size), pygame.SRCALPHA)
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
 
         # 身体颜色
-        body_color = self.color
+        body_color = color
         darker = tuple(max(0, c - 30) for c in body_color)
         skin_color = (220, 180, 150)
 
         # 头部
         head_y = 8
         head_size = 16
-        pygame.draw.rect(self.sprite_base, skin_color, (24, head_y, head_size, head_size))
+        pygame.draw.rect(sprite, skin_color, (24, head_y, head_size, head_size))
         # 头盔
-        if self.type in ['soldier', 'elite', 'heavy']:
-            helmet_color = (60, 80, 60) if self.type != 'elite' else (40, 40, 60)
-            pygame.draw.rect(self.sprite_base, helmet_color, (22, head_y - 2, 20, 10))
+        if enemy_type in ['soldier', 'elite', 'heavy']:
+            helmet_color = (60, 80, 60) if enemy_type != 'elite' else (40, 40, 60)
+            pygame.draw.rect(sprite, helmet_color, (22, head_y - 2, 20, 10))
 
         # 身体
         body_y = head_y + head_size
         body_height = 24
-        pygame.draw.rect(self.sprite_base, body_color, (20, body_y, 24, body_height))
+        pygame.draw.rect(sprite, body_color, (20, body_y, 24, body_height))
 
         # 武器 (根据类型)
         weapon_color = (50, 50, 55)
-        if self.type == 'sniper':
+        if enemy_type == 'sniper':
             # 长枪
-            pygame.draw.rect(self.sprite_base, weapon_color, (42, body_y + 5, 20, 6))
-        elif self.type == 'shotgunner':
+            pygame.draw.rect(sprite, weapon_color, (42, body_y + 5, 20, 6))
+        elif enemy_type == 'shotgunner':
             # 霰弹枪
-            pygame.draw.rect(self.sprite_base, weapon_color, (40, body_y + 8, 18, 8))
-        elif self.type in ['commander', 'general']:
+            pygame.draw.rect(sprite, weapon_color, (40, body_y + 8, 18, 8))
+        elif enemy_type in ['commander', 'general']:
             # 手枪
-            pygame.draw.rect(self.sprite_base, weapon_color, (42, body_y + 10, 12, 5))
+            pygame.draw.rect(sprite, weapon_color, (42, body_y + 10, 12, 5))
         else:
             # 步枪
-            pygame.draw.rect(self.sprite_base, weapon_color, (40, body_y + 6, 16, 6))
+            pygame.draw.rect(sprite, weapon_color, (40, body_y + 6, 16, 6))
 
         # 腿
         leg_y = body_y + body_height
         leg_color = (60, 60, 50)
-        pygame.draw.rect(self.sprite_base, leg_color, (22, leg_y, 8, 16))
-        pygame.draw.rect(self.sprite_base, leg_color, (34, leg_y, 8, 16))
+        pygame.draw.rect(sprite, leg_color, (22, leg_y, 8, 16))
+        pygame.draw.rect(sprite, leg_color, (34, leg_y, 8, 16))
 
         # Boss 特效
-        if self.is_boss:
+        if is_boss:
             # 金色边框
-            pygame.draw.rect(self.sprite_base, (200, 180, 50), (18, head_y - 4, 28, 48), 2)
+            pygame.draw.rect(sprite, (200, 180, 50), (18, head_y - 4, 28, 48), 2)
+
+        return sprite
 
-    def update(self, dt, player, game_map, enemies):
-        """更新敌人状态"""
+    def update(self, dt, player, game_map, enemy_manager):
+        """更新敌人状态 (通过 enemy_manager 查询附近的敌人)"""
         if not self.is_alive:
             self.death_timer += dt
             return
@@ -134,62 +200,39 @@ class Enemy:
             self.animation_frame = (self.animation_frame + 1) % 4
 
         # AI状态机
-        can_see = self._check_line_of_sight(player, game_map)
+        can_see = self._check_line_of_sight(player, game_map, enemy_manager)
 
         if can_see:
             self.state = EnemyState.COMBAT
             self.last_known_player_pos = (player.x, player.y)
-            self._combat_behavior(dt, player, game_map)
+            self._combat_behavior(dt, player, game_map, enemy_manager)
         elif self.state == EnemyState.COMBAT:
             self.state = EnemyState.ALERT
             self.alert_timer = ENEMY_BEHAVIOR['alert_duration']
         elif self.state == EnemyState.ALERT:
-            self._alert_behavior(dt, player, game_map)
+            self._alert_behavior(dt, player, game_map, enemy_manager)
         elif self.state == EnemyState.PATROL:
-            self._patrol_behavior(dt, game_map)
+            self._patrol_behavior(dt, game_map, enemy_manager)
         else:
             self._idle_behavior(dt)
 
-    def _check_line_of_sight(self, player, game_map):
+    def _check_line_of_sight(self, player, game_map, enemy_manager):
         """检查是否能看到玩家"""
         dx = player.x - self.x
         dy = player.y - self.y
-        distance = math.sqrt(dx * dx + dy * dy)
+        distance_sq = dx * dx + dy * dy
 
         # 距离检查
-        if distance > self.view_distance:
+        if distance_sq > self.view_distance * self.view_distance:
             return False
 
-        # 角度检查
-        angle_to_player = math.atan2(dy, dx)
-        angle_diff = abs(self._normalize_angle(angle_to_player - self.angle))
-        if angle_diff > math.radians(self.view_angle / 2):
+        # 角度检查 (与朝向的夹角余弦)
+        facing = dx * math.cos(self.angle) + dy * math.sin(self.angle)
+        if facing < math.sqrt(distance_sq) * self.view_cos:
             return False
 
-        # 射线检测 (墙壁遮挡)
-        return self._raycast_to_point(player.x, player.y, game_map)
-
-    def _raycast_to_point(self, target_x, target_y, game_map):
-        """射线检测到目标点"""
-        dx = target_x - self.x
-        dy = target_y - self.y
-        distance = math.sqrt(dx * dx + dy * dy)
-
-        if distance < 0.1:
-            return True
-
-        steps = int(distance * 4)
-        step_x = dx / steps
-        step_y = dy / steps
-
-        x, y = self.x, self.y
-        for _ in range(steps):
-            x += step_x
-            y += step_y
-            if game_map.is_wall(x, y):
-                return False
-
-        return True
+        # 墙壁遮挡 (缓存并分帧计算)
+        return enemy_manager.sight.is_visible(self, player, game_map)
 
     def _normalize_angle(self, angle):
         """归一化角度到 [-pi, pi]"""
@@ -199,7 +242,7 @@ class Enemy:
             angle += 2 * math.pi
         return angle
 
-    def _combat_behavior(self, dt, player, game_map):
+    def _combat_behavior(self, dt, player, game_map, enemy_manager):
         """战斗行为"""
         dx = player.x - self.x
         dy = player.y - self.y
@@ -215,7 +258,7 @@ class Enemy:
             self._move_away_from(player.x, player.y, dt, game_map)
         elif distance > self.attack_range:
             # 靠近玩家
-            self._move_towards(player.x, player.y, dt, game_map)
+            self._chase(player.x, player.y, dt, game_map, enemy_manager)
 
         # 攻击
         if distance <= self.attack_range and self.shoot_cooldown <= 0:
@@ -223,16 +266,16 @@ class Enemy:
 
         return None
 
-    def _alert_behavior(self, dt, player, game_map):
+    def _alert_behavior(self, dt, player, game_map, enemy_manager):
         """警戒行为"""
         self.alert_timer -= dt
 
         if self.last_known_player_pos:
             # 向最后看到玩家的位置移动
-            self._move_towards(
+            self._chase(
                 self.last_known_player_pos[0],
                 self.last_known_player_pos[1],
-                dt, game_map
+                dt, game_map, enemy_manager
             )
 
             # 检查是否到达
@@ -244,7 +287,7 @@ class Enemy:
         if self.alert_timer <= 0:
             self.state = EnemyState.PATROL if self.patrol_points else EnemyState.IDLE
 
-    def _patrol_behavior(self, dt, game_map):
+    def _patrol_behavior(self, dt, game_map, enemy_manager):
         """巡逻行为"""
         if not self.patrol_points:
             self.state = EnemyState.IDLE
@@ -262,8 +305,8 @@ class Enemy:
                 self.wait_timer = 0
                 self.patrol_index = (self.patrol_index + 1) % len(self.patrol_points)
         else:
-            # 移动到巡逻点
-            self._move_towards(target[0], target[1], dt, game_map)
+            # 沿路径移动到巡逻点
+            self._follow_path(target, dt, game_map, enemy_manager)
 
     def _idle_behavior(self, dt):
         """空闲行为"""
@@ -271,6 +314,37 @@ class Enemy:
         if random.random() < 0.01:
             self.angle += random.uniform(-0.5, 0.5)
 
+    def _chase(self, target_x, target_y, dt, game_map, enemy_manager):
+        """沿共享流场追击目标"""
+        self.path = None  # 离开巡逻路线
+        waypoint = enemy_manager.navigator.next_waypoint(self.x, self.y, target_x, target_y)
+        self._move_towards(waypoint[0], waypoint[1], dt, game_map)
+
+    def _follow_path(self, target, dt, game_map, enemy_manager):
+        """沿缓存的A*路径移动"""
+        waypoint = self._path_waypoint(target, enemy_manager)
+        self._move_towards(waypoint[0], waypoint[1], dt, game_map)
+
+    def _path_waypoint(self, target, enemy_manager):
+        """前往目标的A*路径上的当前路径点 (目标变化时重新寻路)"""
+        if self.path is None or self.path_goal != target:
+            self.path = enemy_manager.navigator.find_path(self.x, self.y, target[0], target[1])
+            self.path_index = 0
+            self.path_goal = target
+            if self.path is None:
+                # 不可达, 退回直线移动
+                self.path = [target]
+
+        # 接近当前路径点后前往下一个
+        waypoint = self.path[self.path_index]
+        if self.path_index < len(self.path) - 1:
+            dx = waypoint[0] - self.x
+            dy = waypoint[1] - self.y
+            if dx * dx + dy * dy < 0.0625:
+                self.path_index += 1
+                waypoint = self.path[self.path_index]
+        return waypoint
+
     def _move_towards(self, target_x, target_y, dt, game_map):
         """向目标移动"""
         dx = target_x - self.x
@@ -342,14 +416,13 @@ class Enemy:
         spread = (1 - accuracy) * 0.5
         angle_offset = random.uniform(-spread, spread)
 
-        return {
-            'type': 'enemy_attack',
-            'x': self.x,
-            'y': self.y,
-            'angle': self.angle + angle_offset,
-            'damage': self.damage,
-            'enemy': self,
-        }
+        attack = _attack_pool.acquire()
+        attack.x = self.x
+        attack.y = self.y
+        attack.angle = self.angle + angle_offset
+        attack.damage = self.damage
+        attack.enemy = self
+        return attack
 
     def take_damage(self, damage):
         """受到伤害"""
@@ -372,8 +445,19 @@ class Enemy:
                 drops.append(drop)
         return drops
 
+    def get_sprite_key(self):
+        """精灵缓存键: (精灵id, 帧)"""
+        frame = 'hit' if self.hit_flash > 0 else 'normal'
+        return ('enemy', self.type, self.is_boss), frame
+
+    def get_sprite_alpha(self):
+        """精灵透明度 (死亡后淡出)"""
+        if self.is_alive:
+            return 255
+        return max(0, 255 - int(self.death_timer * 200))
+
     def get_sprite_surface(self, width, height):
-        """获取缩放后的精灵"""
+        """获取缩放后的精灵 (不含淡出, 见 get_sprite_alpha)"""
         # 复制基础精灵
         sprite = self.sprite_base.copy()
 
@@ -383,31 +467,122 @@ class Enemy:
             flash.fill((255, 100, 100, 100))
             sprite.blit(flash, (0, 0))
 
-        # 死亡效果
-        if not self.is_alive:
-            # 淡出
-            alpha = max(0, 255 - int(self.death_timer * 200))
-            sprite.set_alpha(alpha)
-
         # 缩放
         return pygame.transform.scale(sprite, (width, height))
 
 
+class LineOfSight:
+    """敌人到玩家的视线检测服务
+
+    结果按 (敌人格子, 玩家格子) 缓存, 玩家换格子时整体失效;
+    每帧最多做 LOS_CHECKS_PER_FRAME 次网格DDA, 预算用完的敌人记入 starved,
+    EnemyManager 下一帧从它开始检测; 没检测到的敌人沿用同一玩家格子下的上次结果, 否则判为不可见;
+    潜在可见集是采样光线得到的, 不保证不漏: 不在玩家可见集中的敌人本帧先判为不可见,
+    不缓存, 帧末用剩余预算补做DDA, 结果才写入缓存
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.deferred = {}  # 被潜在可见集排除, 待补做DDA的 (敌人格子, 玩家格子) -> 坐标
+        self.player_cell = None
+        self.budget = LOS_CHECKS_PER_FRAME
+        self.checks = 0  # 本帧实际做的DDA次数
+        self.starved = None  # 本帧第一个因预算用完没检测的敌人
+
+    def begin_frame(self, player):
+        """每帧开始时调用: 重置预算, 玩家换格子时清空缓存"""
+        cell = (int(player.x), int(player.y))
+        if cell != self.player_cell:
+            self.player_cell = cell
+            self.cache.clear()
+        self.budget = LOS_CHECKS_PER_FRAME
+        self.checks = 0
+        self.starved = None
+
+    def clear(self):
+        """清空缓存 (重新加载地图时)"""
+        self.cache.clear()
+        self.deferred.clear()
+        self.player_cell = None
+
+    def is_visible(self, enemy, player, game_map):
+        """敌人和玩家之间是否没有墙壁遮挡"""
+        key = ((int(enemy.x), int(enemy.y)), self.player_cell)
+        visible = self.cache.get(key)
+        if visible is None and game_map.pvs is not None and not game_map.pvs.can_see(
+                player.x, player.y, enemy.x, enemy.y):
+            self.deferred[key] = (enemy.x, enemy.y, player.x, player.y)
+            enemy.sight_visible = False
+            enemy.sight_cell = self.player_cell
+            return False
+        if visible is None:
+            if self.budget <= 0:
+                if self.starved is None:
+                    self.starved = enemy
+                # 玩家换了格子后旧结果不可信 (可能隔墙), 重新检测前按不可见处理
+                return enemy.sight_visible and enemy.sight_cell == self.player_cell
+            self.budget -= 1
+            self.checks += 1
+            visible = game_map.has_line_of_sight(enemy.x, enemy.y, player.x, player.y)
+            self.cache[key] = visible
+
+        enemy.sight_visible = visible
+        enemy.sight_cell = self.player_cell
+        return visible
+
+    def end_frame(self, game_map):
+        """每帧结束时调用: 用剩余预算检查被潜在可见集排除的敌人, 其余下一帧重新登记"""
+        deferred = self.deferred
+        while deferred and self.budget > 0:
+            key, (x0, y0, x1, y1) = deferred.popitem()
+            if key in self.cache:
+                continue
+            self.budget -= 1
+            self.checks += 1
+            self.cache[key] = game_map.has_line_of_sight(x0, y0, x1, y1)
+        deferred.clear()
+
+
 class EnemyManager:
     """敌人管理器"""
 
     def __init__(self):
         self.enemies = []
+        self.pool = ObjectPool('enemy', lambda: Enemy.__new__(Enemy))
+        self.attacks = []  # 本帧的攻击 (update 返回, 下一帧回收)
+        self._expired = False  # 是否有死亡时间过长待移除的敌人
+
+        # 空间哈希: 格子 (tx, ty) -> 该格内的敌人列表
+        self.cells = {}
+
+        # 视线检测服务; 每帧从 sight_start 开始检测, 上一帧预算用完处接着做
+        self.sight = LineOfSight()
+        self.sight_start = 0
+
+        # 寻路 (流场和路径缓存)
+        self.navigator = Navigator()
+
+        # 批量更新 (敌人多时使用)
+        self.engine = None
+        if ENEMY_ENGINE == 'numpy' and np is not None:
+            self.engine = EnemyBatchEngine(self)
 
     def spawn_enemy(self, x, y, enemy_type, patrol_points=None):
         """生成敌人"""
-        enemy = Enemy(x, y, enemy_type, patrol_points)
+        enemy = self.pool.acquire()
+        enemy.reset(x, y, enemy_type, patrol_points)
         self.enemies.append(enemy)
+        self._hash_insert(enemy)
         return enemy
 
     def spawn_from_mission(self, mission_data):
         """从关卡数据生成敌人"""
+        for enemy in self.enemies:
+            self.pool.release(enemy)
         self.enemies.clear()
+        self.cells.clear()
+        self.sight.clear()
+        self.sight_start = 0
         for enemy_data in mission_data.get('enemies', []):
             patrol = enemy_data.get('patrol')
             enemy = self.spawn_enemy(
@@ -420,14 +595,89 @@ class EnemyManager:
                 enemy.is_target = True
 
     def update(self, dt, player, game_map):
-        """更新所有敌人"""
-        attacks = []
-        for enemy in self.enemies:
-            result = enemy.update(dt, player, game_map, self.enemies)
-            if result:
-                attacks.append(result)
+        """更新所有敌人, 返回本帧的攻击列表 (列表和攻击对象在下一次 update 时复用)"""
+        _attack_pool.begin_frame()
+        attacks = self.attacks
+        attacks.clear()
+        self.sight.begin_frame(player)
+        self.navigator.begin_frame(game_map)
+        if self.engine is not None and len(self.enemies) >= ENEMY_BATCH_MIN:
+            self.engine.update(dt, player, game_map)
+        else:
+            enemies = self.enemies
+            count = len(enemies)
+            start = self.sight_start % count if count else 0
+            for i in range(count):
+                enemy = enemies[(start + i) % count]
+                result = enemy.update(dt, player, game_map, self)
+                if result:
+                    attacks.append(result)
+                elif not enemy.is_alive and enemy.death_timer >= 5:
+                    self._expired = True
+                self._hash_move(enemy)
+        self.sight.end_frame(game_map)
+        if self.sight.starved is not None:
+            self.sight_start = self.enemies.index(self.sight.starved)
         return attacks
 
+    def _hash_insert(self, enemy):
+        """将敌人加入所在格子"""
+        cell = (int(enemy.x), int(enemy.y))
+        enemy.cell = cell
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            self.cells[cell] = [enemy]
+        else:
+            bucket.append(enemy)
+
+    def _hash_remove(self, enemy):
+        """将敌人移出所在格子"""
+        bucket = self.cells[enemy.cell]
+        bucket.remove(enemy)
+        if not bucket:
+            del self.cells[enemy.cell]
+
+    def _hash_move(self, enemy):
+        """敌人移动后更新所在格子"""
+        if (int(enemy.x), int(enemy.y)) != enemy.cell:
+            self._hash_remove(enemy)
+            self._hash_insert(enemy)
+
+    def query_radius(self, x, y, radius, alive_only=True):
+        """获取距离 (x, y) 不超过 radius 的敌人"""
+        min_x, max_x = int(x - radius), int(x + radius)
+        min_y, max_y = int(y - radius), int(y + radius)
+
+        # 范围较大时直接遍历非空格子
+        if len(self.cells) < (max_x - min_x + 1) * (max_y - min_y + 1):
+            buckets = [
+                bucket for (cx, cy), bucket in self.cells.items()
+                if min_x <= cx <= max_x and min_y <= cy <= max_y
+            ]
+        else:
+            get = self.cells.get
+            buckets = [
+                get((cx, cy)) for cx in range(min_x, max_x + 1) for cy in range(min_y, max_y + 1)
+            ]
+
+        found = []
+        radius_sq = radius * radius
+        for bucket in buckets:
+            if not bucket:
+                continue
+            for enemy in bucket:
+                if alive_only and not enemy.is_alive:
+                    continue
+                dx = enemy.x - x
+                dy = enemy.y - y
+                if dx * dx + dy * dy <= radius_sq:
+                    found.append(enemy)
+        return found
+
+    def get_neighbors(self, enemy, radius):
+        """获取某个敌人附近的其他存活敌人"""
+        return [e for e in self.query_radius(enemy.x, enemy.y, radius) if e is not enemy]
+
     def get_alive_enemies(self):
         """获取存活的敌人"""
         return [e for e in self.enemies if e.is_alive]
@@ -437,8 +687,21 @@ class EnemyManager:
         return [e for e in self.enemies if not e.is_alive and e.death_timer < 5]
 
     def remove_dead(self):
-        """移除死亡时间过长的敌人"""
-        self.enemies = [e for e in self.enemies if e.is_alive or e.death_timer < 5]
+        """移除死亡时间过长的敌人 (原地压缩列表, 移除的敌人归还对象池)"""
+        if not self._expired:
+            return
+        self._expired = False
+
+        enemies = self.enemies
+        kept = 0
+        for enemy in enemies:
+            if enemy.is_alive or enemy.death_timer < 5:
+                enemies[kept] = enemy
+                kept += 1
+            else:
+                self._hash_remove(enemy)
+                self.pool.release(enemy)
+        del enemies[kept:]
 
     def count_alive(self):
         """计算存活敌人数量"""
@@ -0,0 +1,296 @@
+"""
+Black Ops - 批量敌人模拟 (结构数组)
+把所有敌人的位置、朝向、计时器、生命和状态读入 NumPy 数组,
+计时器、到玩家的距离/夹角、视野锥检测、追击寻路和移动对所有敌人一起计算;
+只有巡逻路径记录、视线检测、攻击和随机转向这些需要逐个处理的分支留在 Python 中
+"""
+
+import math
+import random
+from settings import *
+from dda import np
+from data.enemies import ENEMY_BEHAVIOR
+
+
+def _normalize(angle):
+    """归一化角度到 [-pi, pi] (与 Enemy._normalize_angle 一样逐次加减 2pi)"""
+    while True:
+        high = angle > math.pi
+        low = angle < -math.pi
+        if not (high.any() or low.any()):
+            return angle
+        angle = np.where(high, angle - 2 * math.pi, np.where(low, angle + 2 * math.pi, angle))
+
+
+class EnemyBatchEngine:
+    """EnemyManager.update 的批量实现
+
+    Enemy 对象仍是权威状态 (渲染、命中检测和任务系统都读它):
+    每帧开始时读入数组, 批量计算后只把变化的字段写回
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def update(self, dt, player, game_map):
+        """更新所有敌人 (与逐个调用 Enemy.update 的行为一致)"""
+        manager = self.manager
+        enemies = manager.enemies
+        n = len(enemies)
+
+        alive = np.array([e.is_alive for e in enemies], dtype=bool)
+        # 状态用对象数组比较 (按身份比较, 不调用枚举的 __hash__)
+        state = np.array([e.state for e in enemies], dtype=object)
+        x = np.array([e.x for e in enemies])
+        y = np.array([e.y for e in enemies])
+        angle = np.array([e.angle for e in enemies])
+        start_x = x.copy()
+        start_y = y.copy()
+        start_angle = angle.copy()
+
+        # 死亡的敌人只累计死亡时间
+        for i in np.flatnonzero(~alive).tolist():
+            enemy = enemies[i]
+            enemy.death_timer += dt
+            if enemy.death_timer >= 5:
+                manager._expired = True
+
+        self._update_timers(enemies, alive, dt)
+
+        # 视线: 距离和视野锥一起判断, 通过的再做 (带缓存和预算的) 墙壁遮挡检测
+        dx = player.x - x
+        dy = player.y - y
+        distance_sq = dx * dx + dy * dy
+        distance = np.sqrt(distance_sq)
+        view_distance = np.array([e.view_distance for e in enemies])
+        view_cos = np.array([e.view_cos for e in enemies])
+        facing = dx * np.cos(angle) + dy * np.sin(angle)
+        candidates = alive & (distance_sq <= view_distance * view_distance) & (facing >= distance * view_cos)
+
+        # 从 manager.sight_start 开始轮流检测, 预算不会总被列表前面的敌人用完
+        can_see = np.zeros(n, dtype=bool)
+        sight = manager.sight
+        order = np.flatnonzero(candidates)
+        order = np.roll(order, -int(np.searchsorted(order, manager.sight_start % n)))
+        for i in order.tolist():
+            can_see[i] = sight.is_visible(enemies[i], player, game_map)
+
+        # 各状态分组 (与 Enemy.update 的分支顺序相同)
+        rest = alive & ~can_see
+        combat = np.flatnonzero(can_see)
+        lost = np.flatnonzero(rest & (state == EnemyState.COMBAT))
+        alert = np.flatnonzero(rest & (state == EnemyState.ALERT))
+        patrol = np.flatnonzero(rest & (state == EnemyState.PATROL))
+        idle = np.flatnonzero(rest & (state != EnemyState.COMBAT) & (state != EnemyState.ALERT)
+                              & (state != EnemyState.PATROL))
+
+        # 追击请求: (敌人下标, 目标x, 目标y), 统一批量寻路
+        chase_index = []
+        chase_x = []
+        chase_y = []
+
+        # 战斗: 面向玩家, 太近后退, 太远追击, 在射程内攻击
+        if combat.size:
+            attack_range = np.array([enemies[i].attack_range for i in combat.tolist()])
+            combat_distance = distance[combat]
+            angle[combat] = self._rotate(angle[combat], np.arctan2(dy[combat], dx[combat]), dt)
+            near = combat[combat_distance < attack_range * 0.5]
+            far = combat[combat_distance > attack_range]
+            attackers = combat[combat_distance <= attack_range]
+            if near.size:
+                self._move_away(enemies, near, x, y, player.x, player.y, dt, game_map)
+            chase_index.extend(far.tolist())
+            chase_x.extend([player.x] * far.size)
+            chase_y.extend([player.y] * far.size)
+            for i in combat.tolist():
+                enemy = enemies[i]
+                enemy.state = EnemyState.COMBAT
+                enemy.last_known_player_pos = (player.x, player.y)
+
+        # 失去视线: 进入警戒
+        for i in lost.tolist():
+            enemy = enemies[i]
+            enemy.state = EnemyState.ALERT
+            enemy.alert_timer = ENEMY_BEHAVIOR['alert_duration']
+
+        # 警戒: 前往最后看到玩家的位置
+        alert_enemies = [enemies[i] for i in alert.tolist()]
+        alert_timer = np.array([e.alert_timer for e in alert_enemies], dtype=np.float64) - dt
+        targets = [e.last_known_player_pos for e in alert_enemies]
+        has_target = np.array([bool(t) for t in targets], dtype=bool)
+        target_x = np.array([t[0] if t else 0.0 for t in targets], dtype=np.float64)
+        target_y = np.array([t[1] if t else 0.0 for t in targets], dtype=np.float64)
+        chase_index.extend(alert[has_target].tolist())
+        chase_x.extend(target_x[has_target].tolist())
+        chase_y.extend(target_y[has_target].tolist())
+
+        # 巡逻: 路径记录逐个处理, 得到的路径点与追击一起批量移动
+        move_index = []
+        move_x = []
+        move_y = []
+        for i in patrol.tolist():
+            enemy = enemies[i]
+            if not enemy.patrol_points:
+                enemy.state = EnemyState.IDLE
+                continue
+            target = enemy.patrol_points[enemy.patrol_index]
+            tx = target[0] - enemy.x
+            ty = target[1] - enemy.y
+            if math.sqrt(tx * tx + ty * ty) < 0.5:
+                # 到达巡逻点
+                enemy.wait_timer += dt
+                if enemy.wait_timer > ENEMY_BEHAVIOR['patrol_wait_time']:
+                    enemy.wait_timer = 0
+                    enemy.patrol_index = (enemy.patrol_index + 1) % len(enemy.patrol_points)
+            else:
+                waypoint = enemy._path_waypoint(target, manager)
+                move_index.append(i)
+                move_x.append(waypoint[0])
+                move_y.append(waypoint[1])
+
+        if chase_index:
+            index = np.array(chase_index)
+            waypoint_x, waypoint_y = self._chase_waypoints(
+                index, np.array(chase_x, dtype=np.float64), np.array(chase_y, dtype=np.float64), x, y, game_map)
+            for i in chase_index:
+                enemies[i].path = None  # 离开巡逻路线
+            move_index.extend(chase_index)
+            move_x.extend(waypoint_x.tolist())
+            move_y.extend(waypoint_y.tolist())
+
+        if move_index:
+            self._move_towards(enemies, np.array(move_index), np.array(move_x, dtype=np.float64),
+                               np.array(move_y, dtype=np.float64), x, y, angle, dt, game_map)
+
+        # 警戒: 到达后清除目标位置, 超时后恢复巡逻或空闲
+        arrived = has_target & ((target_x - x[alert]) ** 2 + (target_y - y[alert]) ** 2 < 1)
+        for enemy, timer in zip(alert_enemies, alert_timer.tolist()):
+            enemy.alert_timer = timer
+        for i in alert[arrived].tolist():
+            enemies[i].last_known_player_pos = None
+        for i in alert[alert_timer <= 0].tolist():
+            enemy = enemies[i]
+            enemy.state = EnemyState.PATROL if enemy.patrol_points else EnemyState.IDLE
+
+        # 写回批量计算的位置和朝向, 换了格子的更新空间哈希
+        changed = np.flatnonzero((x != start_x) | (y != start_y) | (angle != start_angle))
+        new_cell = (x[changed].astype(np.int64) != start_x[changed].astype(np.int64)) | \
+                   (y[changed].astype(np.int64) != start_y[changed].astype(np.int64))
+        for i, new_x, new_y, new_angle, moved in zip(
+                changed.tolist(), x[changed].tolist(), y[changed].tolist(),
+                angle[changed].tolist(), new_cell.tolist()):
+            enemy = enemies[i]
+            enemy.x = new_x
+            enemy.y = new_y
+            enemy.angle = new_angle
+            if moved:
+                manager._hash_move(enemy)
+
+        # 攻击 (用移动前的距离和本帧递减后的冷却) 和空闲时随机转向;
+        # 按敌人顺序处理, 随机数的使用顺序与逐个更新相同
+        if combat.size:
+            idle = np.union1d(idle, attackers)
+        for i in idle.tolist():
+            enemy = enemies[i]
+            if can_see[i]:
+                if enemy.shoot_cooldown <= 0:
+                    enemy._attack(player)
+            elif random.random() < 0.01:
+                enemy.angle += random.uniform(-0.5, 0.5)
+
+    def _update_timers(self, enemies, alive, dt):
+        """冷却、受伤闪烁和动画计时器 (冷却和受伤闪烁只在大于0时递减)"""
+        cooldown = np.array([e.shoot_cooldown for e in enemies])
+        flash = np.array([e.hit_flash for e in enemies])
+        timer = np.array([e.animation_timer for e in enemies]) + dt
+
+        for i in np.flatnonzero(alive & (cooldown > 0)).tolist():
+            enemies[i].shoot_cooldown = float(cooldown[i]) - dt
+        for i in np.flatnonzero(alive & (flash > 0)).tolist():
+            enemies[i].hit_flash = float(flash[i]) - dt
+
+        advance = alive & (timer > 0.2)
+        timer[advance] = 0
+        live = np.flatnonzero(alive)
+        for i, value in zip(live.tolist(), timer[live].tolist()):
+            enemies[i].animation_timer = value
+        for i in np.flatnonzero(advance).tolist():
+            enemy = enemies[i]
+            enemy.animation_frame = (enemy.animation_frame + 1) % 4
+
+    def _rotate(self, angle, target, dt):
+        """批量转向目标角度 (每帧最多 3 * dt 弧度)"""
+        diff = _normalize(target - angle)
+        rotation_speed = 3.0 * dt
+        return np.where(
+            np.abs(diff) < rotation_speed, target, angle + np.copysign(rotation_speed, diff)
+        )
+
+    def _chase_waypoints(self, index, target_x, target_y, x, y, game_map):
+        """沿共享流场追击的下一个路径点 (按目标格子分组查表, 与 Navigator.next_waypoint 相同)"""
+        navigator = self.manager.navigator
+        stride = game_map.stride
+        width = game_map.width
+        height = game_map.height
+
+        waypoint_x = target_x.copy()
+        waypoint_y = target_y.copy()
+
+        # 起点和目标所在格子 (越界为 -1)
+        def cells(px, py):
+            tx = np.floor(px).astype(np.int64)
+            ty = np.floor(py).astype(np.int64)
+            inside = (tx >= 0) & (tx < width) & (ty >= 0) & (ty < height)
+            return np.where(inside, (ty + 1) * stride + tx + 1, -1)
+
+        start = cells(x[index], y[index])
+        target = cells(target_x, target_y)
+        valid = (start >= 0) & (target >= 0) & (start != target)
+
+        for goal in np.unique(target[valid]).tolist():
+            group = np.flatnonzero(valid & (target == goal))
+            step = navigator.next_cells(goal)[start[group]]
+            # 没有更近的邻格或下一格就是目标格时直接走向目标
+            use = (step >= 0) & (step != goal)
+            group = group[use]
+            step = step[use]
+            waypoint_x[group] = step % stride - 0.5
+            waypoint_y[group] = step // stride - 0.5
+        return waypoint_x, waypoint_y
+
+    def _move_towards(self, enemies, index, target_x, target_y, x, y, angle, dt, game_map):
+        """批量向目标移动 (先转向, 再分别检测 x 和 y 方向是否可走)"""
+        dx = target_x - x[index]
+        dy = target_y - y[index]
+        distance = np.sqrt(dx * dx + dy * dy)
+        keep = distance >= 0.1
+        index = index[keep]
+        if not index.size:
+            return
+        dx = dx[keep] / distance[keep]
+        dy = dy[keep] / distance[keep]
+
+        angle[index] = self._rotate(angle[index], np.arctan2(dy, dx), dt)
+
+        speed = np.array([enemies[i].speed for i in index.tolist()]) * dt
+        self._step(index, x, y, dx * speed, dy * speed, game_map)
+
+    def _move_away(self, enemies, index, x, y, target_x, target_y, dt, game_map):
+        """批量远离目标 (不转向, 速度为七成)"""
+        dx = x[index] - target_x
+        dy = y[index] - target_y
+        distance = np.sqrt(dx * dx + dy * dy)
+        keep = distance >= 0.1
+        index = index[keep]
+        if not index.size:
+            return
+        speed = np.array([enemies[i].speed for i in index.tolist()]) * dt * 0.7
+        self._step(index, x, y, dx[keep] / distance[keep] * speed, dy[keep] / distance[keep] * speed, game_map)
+
+    def _step(self, index, x, y, step_x, step_y, game_map):
+        """按位移移动, x 和 y 方向分别做碰撞检测"""
+        new_x = x[index] + step_x
+        cur_y = y[index]
+        x[index] = np.where(game_map.is_walkable_many(new_x, cur_y, 0.3), new_x, x[index])
+        new_y = cur_y + step_y
+        y[index] = np.where(game_map.is_walkable_many(x[index], new_y, 0.3), new_y, cur_y)
@@ -0,0 +1,225 @@
+"""
+Black Ops - 地面/天花板投射
+按行向量化计算每个像素的世界坐标, 从地面图采样地面和天花板纹理
+"""
+
+import random
+import time
+import pygame
+from settings import *
+from dda import np
+from pixel_ops import pack_pixels, shade_packed
+from lighting import lighting
+from assets import atlas
+
+
+class FloorCaster:
+    """地面和天花板投射渲染器 (需要numpy)"""
+
+    def __init__(self, screen, game_map, screen_dist, ray_span):
+        self.screen = screen
+        self.width, self.height = screen.get_size()
+        self.game_map = game_map
+        self.screen_dist = screen_dist
+        self.ray_span = ray_span  # 光线覆盖的屏幕宽度
+
+        # 生成地面纹理 (素材图集中有时直接加载) 并导出为打包像素数组
+        self.textures = atlas.load('floor_textures', self._generate_floor_textures)
+        max_id = max(self.textures)
+        texture_array = np.empty((max_id + 1, TEXTURE_SIZE, TEXTURE_SIZE, 3), dtype=np.uint8)
+        for tid in range(max_id + 1):
+            texture = self.textures.get(tid, self.textures[1])
+            texture_array[tid] = pygame.surfarray.array3d(texture)
+        self.texture_flat = pack_pixels(texture_array, screen).ravel()
+
+        # 露天的天花板像素用透明色标记
+        self.sky_key = screen.map_rgb(FLOOR_SKY_KEY)
+
+        # 渲染步长: 每个投射像素覆盖 step x step 个屏幕像素, 根据耗时自动调整
+        self.step = FLOOR_CAST_START_STEP
+        self.last_time_ms = 0.0
+        self._fast_frames = 0
+        self._layouts = {}
+        self._surfaces = {}
+        self.light_version = lighting.version
+
+        # 地面/天花板网格叠层 (地图重新加载后重建)
+        self._layers = None
+        self._layers_source = None
+        self.has_ceiling = False
+
+    def _generate_floor_textures(self):
+        """生成地面/天花板纹理"""
+        textures = {}
+        size = TEXTURE_SIZE
+
+        # 纹理1: 混凝土地面
+        tex1 = pygame.Surface((size, size))
+        tex1.fill((72, 70, 66))
+        pygame.draw.rect(tex1, (58, 56, 52), (0, 0, size, size), 2)
+        for y in range(8, size, 16):
+            pygame.draw.line(tex1, (66, 64, 60), (0, y), (size, y))
+        textures[1] = tex1
+
+        # 纹理2: 木地板
+        tex2 = pygame.Surface((size, size))
+        tex2.fill((105, 70, 42))
+        plank_w = size // 4
+        for px in range(0, size, plank_w):
+            pygame.draw.rect(tex2, (95, 62, 36), (px, 0, plank_w - 2, size))
+            pygame.draw.line(tex2, (45, 28, 16), (px + plank_w - 1, 0), (px + plank_w - 1, size), 2)
+        textures[2] = tex2
+
+        # 纹理3: 金属格栅
+        tex3 = pygame.Surface((size, size))
+        tex3.fill((70, 75, 82))
+        for p in range(0, size, 16):
+            pygame.draw.line(tex3, (50, 54, 60), (p, 0), (p, size), 3)
+            pygame.draw.line(tex3, (50, 54, 60), (0, p), (size, p), 3)
+        textures[3] = tex3
+
+        # 纹理4: 泥地
+        tex4 = pygame.Surface((size, size))
+        tex4.fill((78, 66, 44))
+        rng = random.Random(4321)  # 固定种子保证一致性
+        for _ in range(160):
+            x = rng.randrange(size)
+            y = rng.randrange(size)
+            shade = rng.randint(55, 95)
+            pygame.draw.circle(tex4, (shade, int(shade * 0.85), int(shade * 0.55)), (x, y), rng.randint(1, 3))
+        textures[4] = tex4
+
+        return textures
+
+    def _layout(self, step):
+        """某个步长下的预计算数据: 列角度、行距离、行所在的层和行光照"""
+        layout = self._layouts.get(step)
+        if layout:
+            return layout
+
+        # 列角度与墙壁光线一致
+        columns = np.arange(0, self.width, step) + step / 2
+        theta = columns / self.ray_span * FOV - HALF_FOV
+
+        # 地面行 (视平线以下) 和天花板行 (视平线以上) 到玩家的垂直距离
+        rows = np.arange(0, self.height, step) + step / 2
+        offset = np.abs(rows - self.height / 2)
+        distance = self.screen_dist / (2 * np.maximum(offset, 0.5))
+        layer = (rows < self.height / 2).astype(np.int32)  # 0 = 地面, 1 = 天花板
+
+        # 光照: 查水平墙壁的光照表
+        light = lighting.index_array(distance)
+        keep = lighting.keep_table[0, light]
+        add = pack_pixels(lighting.fog_table[0, light], self.screen)
+
+        layout = {
+            'theta': theta,
+            'cos_theta': np.cos(theta),
+            'distance': distance.astype(np.float32),
+            'layer': layer,
+            'floor_start': int(np.argmin(layer)),  # 第一行地面
+            'keep': keep,
+            'add': add,
+            'pixels': np.full((len(columns), len(rows)), self.sky_key, dtype=np.uint32),
+        }
+        self._layouts[step] = layout
+        return layout
+
+    def _get_layers(self):
+        """地面和天花板网格叠为 (2, H + 2, W + 2) 数组"""
+        game_map = self.game_map
+        if self._layers_source is not game_map.floor:
+            self._layers = np.stack([game_map.floor_array, game_map.ceiling_array])
+            self._layers_source = game_map.floor
+            self.has_ceiling = bool(game_map.ceiling_array.any())
+        return self._layers
+
+    def render(self, player_x, player_y, player_angle):
+        """投射地面和天花板
+
+        返回 (pixels, step): pixels 为 (列, 行) 的屏幕格式像素数组,
+        露天的天花板像素为 sky_key
+        """
+        if self.light_version != lighting.version:
+            # 光照设置变化, 行光照需要重新查表
+            self.light_version = lighting.version
+            self._layouts.clear()
+
+        step = self.step
+        layout = self._layout(step)
+        layers = self._get_layers()
+        start = time.perf_counter()
+
+        # 地图没有天花板时只投射地面行
+        first_row = 0 if self.has_ceiling else layout['floor_start']
+        distance = layout['distance'][first_row:]
+        layer = layout['layer'][first_row:]
+
+        # 每列的方向向量 (除以 cos 将垂直距离换算为沿光线的距离)
+        angles = player_angle + layout['theta']
+        dir_x = (np.cos(angles) / layout['cos_theta']).astype(np.float32)
+        dir_y = (np.sin(angles) / layout['cos_theta']).astype(np.float32)
+
+        # 每个像素的世界坐标 (列, 行), 以 1/TEXTURE_SIZE 格为单位的定点数:
+        # 整数部分 (右移) 为带边框网格中的格子, 小数部分 (掩码) 为纹理坐标
+        fixed_x = ((np.float32(player_x + 1) + dir_x[:, None] * distance[None, :]) * TEXTURE_SIZE).astype(np.int32)
+        fixed_y = ((np.float32(player_y + 1) + dir_y[:, None] * distance[None, :]) * TEXTURE_SIZE).astype(np.int32)
+
+        # 查询地面图 (越界落在边框上)
+        rows, columns = layers.shape[1:]
+        grid_x = np.clip(fixed_x >> TEXTURE_SHIFT, 0, columns - 1)
+        grid_y = np.clip(fixed_y >> TEXTURE_SHIFT, 0, rows - 1)
+        tile = layers.take((layer * (rows * columns))[None, :] + grid_y * columns + grid_x)
+
+        # 采样纹理并按行光照
+        index = (((tile.astype(np.int32) << TEXTURE_SHIFT) + (fixed_x & (TEXTURE_SIZE - 1)))
+                 << TEXTURE_SHIFT) + (fixed_y & (TEXTURE_SIZE - 1))
+        texels = self.texture_flat.take(index)
+        pixels = layout['pixels']
+        pixels[:, first_row:] = shade_packed(
+            texels, layout['keep'][None, first_row:], layout['add'][None, first_row:]
+        )
+        if self.has_ceiling:
+            pixels[tile == 0] = self.sky_key
+
+        self._update_step((time.perf_counter() - start) * 1000)
+        return pixels, step
+
+    def draw(self, player_x, player_y, player_angle):
+        """投射并绘制到屏幕 (逐列贴图模式)"""
+        pixels, step = self.render(player_x, player_y, player_angle)
+
+        small = self._surfaces.get(step)
+        if small is None:
+            small = pygame.Surface(pixels.shape, 0, self.screen)
+            self._surfaces[step] = small
+        pygame.surfarray.blit_array(small, pixels)
+
+        surface = small
+        if step > 1:
+            surface = pygame.transform.scale(small, (pixels.shape[0] * step, pixels.shape[1] * step))
+
+        # 没有天花板时只需覆盖下半屏
+        if self.has_ceiling:
+            surface.set_colorkey(FLOOR_SKY_KEY)
+            self.screen.blit(surface, (0, 0))
+        else:
+            surface.set_colorkey(None)
+            top = self.height // 2
+            self.screen.blit(surface, (0, top), (0, top, self.width, self.height - top))
+
+    def _update_step(self, elapsed_ms):
+        """根据本帧耗时调整步长, 保持在 FLOOR_BUDGET_MS 以内"""
+        self.last_time_ms = elapsed_ms
+        if elapsed_ms > FLOOR_BUDGET_MS:
+            self._fast_frames = 0
+            if self.step < FLOOR_CAST_MAX_STEP:
+                self.step += 1
+        elif elapsed_ms < FLOOR_BUDGET_MS * 0.4 and self.step > 1:
+            # 连续多帧有余量才提高精度, 避免来回抖动
+            self._fast_frames += 1
+            if self._fast_frames >= 30:
+                self._fast_frames = 0
+                self.step -= 1
+        else:
+            self._fast_frames = 0
@@ -8,12 +8,18 @@ import math
 import random
 import os
 import sys
+import time
 
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(__file__))
 
 from settings import *
-from raycaster import Raycaster, GameMap
+from raycaster import GameMap
+from mapcache import load_compiled
+from resolution import ResolutionController
+from hitscan import wall_distances, ray_circle_hits
+from profiler import FrameProfiler, TRACE_DIR
+from assets import atlas
 from entities.player import Player
 from entities.enemy import Enemy, EnemyManager
 from systems.weapon import Weapon, WeaponManager, WeaponRenderer
@@ -64,13 +70,21 @@ class Game:
             'time_played': 0,
         }
 
+    @property
+    def raycaster(self):
+        """当前分辨率档位的渲染器"""
+        return self.resolution.raycaster
+
     def _init_systems(self):
         """初始化游戏系统"""
+        # 性能分析
+        self.profiler = FrameProfiler()
+
         # 地图
         self.game_map = GameMap()
 
-        # 渲染器
-        self.raycaster = Raycaster(self.screen, self.game_map)
+        # 渲染器 (动态分辨率)
+        self.resolution = ResolutionController(self.screen, self.game_map, self.profiler)
         self.weapon_renderer = WeaponRenderer(self.screen)
 
         # 玩家
@@ -101,6 +115,9 @@ class Game:
         self.muzzle_flash_timer = 0
         self.screen_shake = 0
 
+        # 保存启动时新生成的素材
+        atlas.save()
+
     def run(self):
         """游戏主循环"""
         print("=" * 50)
@@ -117,19 +134,31 @@ class Game:
         print("  ESC - 暂停")
         print("=" * 50)
 
+        profiler = self.profiler
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0
+            profiler.begin_frame()
 
             # 处理事件
             self._handle_events()
+            profiler.mark('input')
 
             # 更新
             self._update(dt)
+            # 游戏中的更新在 _update_playing 里已分为 update/ai 两段, 这里是其余部分 (物品, 任务, 菜单)
+            profiler.mark('update_rest')
+
+            # 根据上一帧的实际耗时调整渲染分辨率
+            if self.state == GameState.PLAYING:
+                self.resolution.update(self.clock.get_rawtime())
 
             # 渲染
             self._draw()
+            profiler.mark('draw')
 
             pygame.display.flip()
+            profiler.mark('present')
+            profiler.end_frame()
 
         pygame.quit()
 
@@ -205,6 +234,11 @@ class Game:
                 result = self.player.shoot()
                 if result:
                     self._process_shot(result)
+            elif event.key == pygame.K_F3:
+                # 帧时间图
+                self.profiler.toggle()
+            elif event.key == pygame.K_F4:
+                self._export_trace()
 
         # 玩家事件处理
         result = self.player.handle_event(event)
@@ -258,9 +292,13 @@ class Game:
             print(f"Failed to load mission: {mission_id}")
             return
 
-        # 加载地图
-        map_path = os.path.join(os.path.dirname(__file__), 'maps', mission_data['map'])
-        self.game_map.load_from_file(map_path)
+        # 加载地图 (优先使用编译缓存)
+        compiled = load_compiled(mission_id)
+        if compiled is not None:
+            self.game_map.load_compiled(compiled)
+        else:
+            map_path = os.path.join(os.path.dirname(__file__), 'maps', mission_data['map'])
+            self.game_map.load_from_file(map_path)
 
         # 设置玩家
         start_pos = self.mission_system.get_player_start()
@@ -282,6 +320,9 @@ class Game:
         # 生成物品
         self.item_manager.spawn_from_mission(mission_data)
 
+        # 保存新生成的素材 (新敌人类型的精灵, 新一档分辨率的天空和地面)
+        atlas.save()
+
         # 重置统计
         self.stats = {
             'kills': 0,
@@ -336,12 +377,15 @@ class Game:
                 if result:
                     self._process_shot(result)
 
+        self.profiler.mark('update')
+
         # 更新敌人
         attacks = self.enemy_manager.update(dt, self.player, self.game_map)
 
         # 处理敌人攻击
         for attack in attacks:
             self._process_enemy_attack(attack)
+        self.profiler.mark('ai')
 
         # 更新物品
         pickups = self.item_manager.update(dt, self.player.x, self.player.y)
@@ -388,7 +432,11 @@ class Game:
             shot_data.get('spread', 0)
         )
 
-        for enemy, damage in hit_enemies:
+        for enemy, damage, distance in hit_enemies:
+            # 同一次射击中已被前面的弹丸击杀
+            if not enemy.is_alive:
+                continue
+
             self.stats['shots_hit'] += 1
             self.hud.show_hit_marker()
 
@@ -406,52 +454,41 @@ class Game:
                 self.mission_system.check_objectives(enemy_type=enemy.type)
 
     def _raycast_shot(self, start_x, start_y, angle, max_range, damage, pellets=1, spread=0):
-        """射线检测射击命中"""
-        hit_enemies = []
-
-        for _ in range(pellets):
-            # 计算散布
-            shot_angle = angle + random.uniform(-spread, spread)
-            dx = math.cos(shot_angle)
-            dy = math.sin(shot_angle)
-
-            # 逐步检测
-            for dist in range(1, int(max_range * 4)):
-                check_x = start_x + dx * (dist / 4)
-                check_y = start_y + dy * (dist / 4)
-
-                # 检查墙壁
-                if self.game_map.is_wall(check_x, check_y):
-                    break
-
-                # 检查敌人
-                for enemy in self.enemy_manager.get_alive_enemies():
-                    ex, ey = enemy.x, enemy.y
-                    dist_to_enemy = math.sqrt((check_x - ex) ** 2 + (check_y - ey) ** 2)
-                    if dist_to_enemy < 0.5:
-                        # 命中
-                        hit_enemies.append((enemy, damage))
-                        break
-                else:
-                    continue
-                break
+        """射线检测射击命中
 
+        所有弹丸一起计算: 先求到墙壁的距离, 再与射程内敌人的碰撞圆解析求交
+        返回按距离排序的 [(enemy, damage, distance), ...], 每颗弹丸最多命中一个敌人
+        """
+        angles = [angle + random.uniform(-spread, spread) for _ in range(pellets)]
+        depths = wall_distances(self.game_map, start_x, start_y, angles, max_range)
+
+        # 从空间哈希取出弹道可能经过的敌人
+        reach = max(depths) + ENEMY_HIT_RADIUS
+        candidates = self.enemy_manager.query_radius(start_x, start_y, reach)
+        if not candidates:
+            return []
+
+        targets = [(enemy.x, enemy.y) for enemy in candidates]
+        hits = ray_circle_hits(start_x, start_y, angles, depths, targets)
+
+        hit_enemies = [(candidates[hit[0]], damage, hit[1]) for hit in hits if hit]
+        hit_enemies.sort(key=lambda h: h[2])
         return hit_enemies
 
     def _process_enemy_attack(self, attack):
         """处理敌人攻击"""
         # 简化的命中检测
-        dx = self.player.x - attack['x']
-        dy = self.player.y - attack['y']
+        dx = self.player.x - attack.x
+        dy = self.player.y - attack.y
         dist = math.sqrt(dx * dx + dy * dy)
 
         if dist < 15:  # 在攻击范围内
             # 根据距离和精度计算命中概率
-            hit_chance = attack['enemy'].accuracy * (1 - dist / 20)
+            hit_chance = attack.enemy.accuracy * (1 - dist / 20)
             if random.random() < hit_chance:
                 # 命中玩家
                 damage_angle = math.atan2(dy, dx)
-                self.player.take_damage(attack['damage'], damage_angle)
+                self.player.take_damage(attack.damage, damage_angle)
                 self.hud.show_damage_indicator(damage_angle)
                 self.screen_shake = 0.2
 
@@ -521,7 +558,8 @@ class Game:
         shake_y = random.randint(-int(self.screen_shake * 10), int(self.screen_shake * 10)) if self.screen_shake > 0 else 0
 
         # 光线投射渲染
-        self.raycaster.cast_rays(
+        raycaster = self.resolution.raycaster
+        raycaster.cast_rays(
             self.player.x + shake_x * 0.01,
             self.player.y + shake_y * 0.01,
             self.player.angle
@@ -530,8 +568,9 @@ class Game:
         # 渲染精灵 (敌人和物品)
         sprites = []
 
-        # 添加敌人
-        for enemy in self.enemy_manager.enemies:
+        # 添加敌人 (只取渲染距离内的)
+        nearby = self.enemy_manager.query_radius(self.player.x, self.player.y, MAX_DEPTH, alive_only=False)
+        for enemy in nearby:
             if enemy.is_alive or enemy.death_timer < 2:
                 sprites.append(enemy)
 
@@ -539,7 +578,12 @@ class Game:
         for item in self.item_manager.get_active_items():
             sprites.append(item)
 
-        self.raycaster.render_sprites(sprites, self.player.x, self.player.y, self.player.angle)
+        raycaster.render_sprites(sprites, self.player.x, self.player.y, self.player.angle)
+        self.profiler.mark('sprites')
+
+        # 内部分辨率低于窗口时放大
+        self.resolution.present()
+        self.profiler.mark('upscale')
 
         # 渲染武器
         weapon = self.player.get_current_weapon()
@@ -556,6 +600,7 @@ class Game:
         # 枪口火焰
         if self.muzzle_flash_timer > 0:
             self._draw_muzzle_flash()
+        self.profiler.mark('weapon')
 
         # HUD
         self.hud.draw(self.player, weapon, self.mission_system)
@@ -567,6 +612,21 @@ class Game:
         if self.player.damage_flash > 0:
             self._draw_damage_effect()
 
+        # 帧时间图
+        if self.profiler.enabled:
+            self.hud.draw_frame_graph(self.profiler)
+        self.profiler.mark('hud')
+
+    def _export_trace(self):
+        """导出最近的帧阶段耗时为 Chrome trace"""
+        if not self.profiler.enabled:
+            self.hud.add_kill_feed("Profiler off (F3)")
+            return
+        filename = time.strftime("trace_%Y%m%d_%H%M%S.json")
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        count = self.profiler.export_trace(os.path.join(TRACE_DIR, filename))
+        self.hud.add_kill_feed(f"Trace saved: traces/{filename} ({count} frames)")
+
     def _draw_muzzle_flash(self):
         """绘制枪口火焰"""
         weapon = self.player.get_current_weapon()
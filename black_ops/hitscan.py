@@ -0,0 +1,76 @@
+"""
+Black Ops - 射击命中检测
+网格DDA求弹道到墙壁的距离, 再与敌人的圆形碰撞体解析求交 (所有弹丸一起计算)
+"""
+
+import math
+from settings import *
+from dda import np, cast_rays_dda
+
+
+def wall_distances(game_map, x, y, angles, max_range):
+    """每颗弹丸到第一面墙的距离 (超出射程时为 max_range)"""
+    if np is not None and game_map.grid_array is not None:
+        depth = cast_rays_dda(game_map.grid_array, x, y, angles, max_range)[0]
+        return depth.tolist()
+    return [game_map.cast_ray(x, y, angle, max_range) for angle in angles]
+
+
+def ray_circle_hits(x, y, angles, depths, targets, radius=ENEMY_HIT_RADIUS):
+    """弹丸与圆形目标求交
+
+    targets 为 [(tx, ty), ...], 返回每颗弹丸最先命中的 (目标序号, 距离),
+    未命中 (或先命中墙壁) 时为 None
+    """
+    if not targets:
+        return [None] * len(angles)
+    if np is not None:
+        return _ray_circle_hits_numpy(x, y, angles, depths, targets, radius)
+
+    radius_sq = radius * radius
+    hits = []
+    for angle, depth in zip(angles, depths):
+        dx = math.cos(angle)
+        dy = math.sin(angle)
+        best = None
+        for index, (tx, ty) in enumerate(targets):
+            rx = tx - x
+            ry = ty - y
+            # 圆心在弹道上的投影和到弹道的垂直距离
+            t = rx * dx + ry * dy
+            perp_sq = rx * rx + ry * ry - t * t
+            if perp_sq > radius_sq:
+                continue
+            half = math.sqrt(radius_sq - perp_sq)
+            if t + half < 0:
+                continue
+            enter = max(t - half, 0.0)
+            if enter <= depth and (best is None or enter < best[1]):
+                best = (index, enter)
+        hits.append(best)
+    return hits
+
+
+def _ray_circle_hits_numpy(x, y, angles, depths, targets, radius):
+    """ray_circle_hits 的向量化版本: (弹丸, 目标) 矩阵一次求交"""
+    angles = np.asarray(angles, dtype=np.float64)
+    depths = np.asarray(depths, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    dx = np.cos(angles)[:, None]
+    dy = np.sin(angles)[:, None]
+    rx = targets[:, 0] - x
+    ry = targets[:, 1] - y
+
+    t = dx * rx + dy * ry
+    perp_sq = (rx * rx + ry * ry) - t * t
+    half = np.sqrt(np.maximum(radius * radius - perp_sq, 0))
+    enter = np.maximum(t - half, 0)
+    hit = (perp_sq <= radius * radius) & (t + half >= 0) & (enter <= depths[:, None])
+
+    dist = np.where(hit, enter, np.inf)
+    best = dist.argmin(axis=1)
+    best_dist = dist[np.arange(len(angles)), best]
+    return [
+        (int(index), float(d)) if d != np.inf else None
+        for index, d in zip(best, best_dist)
+    ]
@@ -0,0 +1,127 @@
+"""
+Black Ops - 光照查找表
+预计算 深度 -> (阴影, 雾) 表, 渲染时只做查表; 光照设置变化时重建
+"""
+
+import settings
+from settings import *
+from dda import np
+
+# 影响光照表的设置项 (运行时修改 settings 模块中的值即可触发重建)
+_LIGHT_SETTINGS = (
+    'ENABLE_SHADOWS', 'ENABLE_FOG', 'AMBIENT_LIGHT', 'FOG_START', 'FOG_END', 'FOG_COLOR', 'MAX_DEPTH',
+)
+
+
+class Lighting:
+    """深度 -> 光照查找表
+
+    墙壁按朝向 (0 = 水平墙, 1 = 竖直墙, 地面同水平墙) 各一张 LIGHT_TABLE_SIZE 项的表;
+    逐列贴图模式将光照量化为调色板档位, 每档对应一份预压暗的纹理
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._key = None
+        self.refresh()
+
+    def refresh(self):
+        """设置变化时重建查找表, 返回是否重建 (每帧调用一次)"""
+        key = tuple(getattr(settings, name) for name in _LIGHT_SETTINGS)
+        if key == self._key:
+            return False
+        self._key = key
+        self._build()
+        self.version += 1
+        return True
+
+    def _build(self):
+        """按当前设置生成所有表"""
+        size = LIGHT_TABLE_SIZE
+        fog_enabled = settings.ENABLE_FOG
+        fog_start = settings.FOG_START
+        fog_end = settings.FOG_END
+        ambient = settings.AMBIENT_LIGHT
+        fog_color = settings.FOG_COLOR
+        # 表覆盖到雾完全不透明的距离 (地面远处的行超过 MAX_DEPTH)
+        table_depth = max(settings.MAX_DEPTH, fog_end) if fog_enabled else settings.MAX_DEPTH
+        self.scale = (size - 1) / table_depth
+
+        levels = LIGHT_LEVELS
+        wall_keep = ([], [])
+        wall_fog = ([], [])
+        wall_level = ([], [])
+        level_samples = {}
+        sprite_shade = []
+
+        for i in range(size):
+            depth = i / self.scale
+            falloff = (min(depth, settings.MAX_DEPTH) / settings.MAX_DEPTH) ** 0.6
+            fog = 0.0
+            if fog_enabled and depth > fog_start:
+                fog = min(1, (depth - fog_start) / (fog_end - fog_start))
+
+            for side in (0, 1):
+                if settings.ENABLE_SHADOWS:
+                    # 距离衰减, 竖直墙壁稍暗 (模拟侧光), 再叠加环境光
+                    distance_shade = max(0.15, 1 - falloff)
+                    if side:
+                        distance_shade *= 0.75
+                    shade = ambient + (1 - ambient) * distance_shade
+                else:
+                    shade = 1.0
+                wall_alpha = fog * (220 / 255)
+                keep = (1 - wall_alpha) * shade
+                fog_weight = wall_alpha * shade
+                wall_keep[side].append(keep)
+                wall_fog[side].append(fog_weight)
+
+                # 调色板档位: 同一朝向下 keep 随深度单调, 按 keep 均匀量化
+                level = side * levels + min(levels - 1, int((1 - keep) * levels))
+                wall_level[side].append(level)
+                level_samples.setdefault(level, []).append((keep, fog_weight))
+
+            # 精灵使用更柔和的曲线
+            darkness = max(0.2, 1 - falloff) if settings.ENABLE_SHADOWS else 1.0
+            dark_alpha = int((1 - darkness) * 200) // SHADE_STEP * SHADE_STEP
+            fog_alpha = int(fog * 180) // SHADE_STEP * SHADE_STEP
+            sprite_shade.append((dark_alpha, fog_alpha))
+
+        # 每档取该档所有表项的平均光照
+        self.level_keep = [255] * (2 * levels)
+        self.level_fog = [(0, 0, 0)] * (2 * levels)
+        for level, samples in level_samples.items():
+            keep = sum(s[0] for s in samples) / len(samples)
+            fog_weight = sum(s[1] for s in samples) / len(samples)
+            self.level_keep[level] = int(keep * 255)
+            self.level_fog[level] = tuple(int(c * fog_weight) for c in fog_color)
+
+        self.wall_level = wall_level
+        self.fog_color = fog_color
+        self.sprite_shade = sprite_shade
+
+        # 数组版本 (整帧和地面投射使用): keep 为 0-256 的整数, fog 为每通道的雾颜色
+        if np is not None:
+            self.keep_table = (np.array(wall_keep) * 256).astype(np.uint32)
+            self.fog_table = np.array(wall_fog)[:, :, None] * np.array(fog_color, dtype=np.float64)
+
+    def index(self, depth):
+        """深度对应的表项"""
+        i = int(depth * self.scale)
+        return i if i < LIGHT_TABLE_SIZE else LIGHT_TABLE_SIZE - 1
+
+    def index_array(self, depth):
+        """深度数组对应的表项数组"""
+        return np.minimum((depth * self.scale).astype(np.intp), LIGHT_TABLE_SIZE - 1)
+
+    def wall_level_at(self, depth, side):
+        """墙壁列的调色板档位"""
+        return self.wall_level[side][self.index(depth)]
+
+    def sprite_alphas(self, distance):
+        """精灵的 (阴影透明度, 雾透明度)"""
+        return self.sprite_shade[self.index(distance)]
+
+
+# 所有渲染器共享的查找表
+lighting = Lighting()
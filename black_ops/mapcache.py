@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Black Ops - 地图编译缓存
+
+把 maps/*.txt (及地面图) 编译为紧凑的二进制文件, 加载时内存映射, 不再逐行解析 ASCII 地图;
+源文件变化时按内容哈希自动重新编译
+
+只包含地图文件本身的内容 (与 GameMap.load_from_string 的结果相同);
+关卡的玩家起点/朝向和敌人/物品生成数据仍从 data.missions 读取, 不编译
+
+文件布局 (小端):
+    头部   魔数, 版本, 源内容哈希 (SHA-1), 宽, 高, 区段数
+    目录   每个区段 (标签, 偏移, 长度), 区段按8字节对齐
+    GRID   带边框的墙壁网格 (与 GameMap.grid 布局相同)
+    FLOR   地面纹理网格
+    CEIL   天花板纹理网格
+    REGN   每个格子的连通区域编号 (uint16, 0 为墙壁), 用于寻路前判断可达性
+    MARK   地图中的标记: 玩家起点和 E/I 标记的坐标
+    PVS    每个格子的潜在可见集位集 (visibility.compute_pvs, 没有numpy时为空)
+
+运行方式:
+    python3 mapcache.py                  # 编译所有关卡
+    python3 mapcache.py --info mission1  # 查看编译结果
+"""
+
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import argparse
+from array import array
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from settings import *
+from dda import np
+from raycaster import GameMap
+from visibility import compute_pvs, PotentiallyVisibleSet
+from data.missions import MISSIONS
+
+MAP_DIR = os.path.join(os.path.dirname(__file__), 'maps')
+CACHE_DIR = os.path.join(MAP_DIR, '.cache')
+
+MAGIC = b'BOMP'
+FORMAT_VERSION = 3
+
+_HEADER = struct.Struct('<4sHH20sIII')
+_SECTION = struct.Struct('<4sII')
+
+
+class CompiledMap:
+    """内存映射的编译地图, 各区段为 mmap 上的 memoryview (写时复制, 不影响文件)"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        view = memoryview(self._mmap)
+
+        magic, version, _, self.source_hash, self.width, self.height, count = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"不是当前版本的编译地图: {path}")
+
+        self.sections = {}
+        for i in range(count):
+            tag, offset, length = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+            self.sections[tag.decode('ascii')] = view[offset:offset + length]
+
+        self.stride = self.width + 2
+        self.grid = self.sections['GRID']
+        self.floor = self.sections['FLOR']
+        self.ceiling = self.sections['CEIL']
+        self.regions = self.sections['REGN'].cast('H')
+
+        mark = self.sections['MARK']
+        start_x, start_y, enemy_count, item_count = struct.unpack_from('<ffII', mark, 0)
+        points = struct.unpack_from(f'<{2 * (enemy_count + item_count)}f', mark, 16)
+        pairs = list(zip(points[0::2], points[1::2]))
+        self.player_start = (start_x, start_y)
+        self.enemies_data = pairs[:enemy_count]
+        self.items_data = pairs[enemy_count:]
+
+        self.pvs = None
+        if len(self.sections['PVS ']):
+            self.pvs = PotentiallyVisibleSet(self.sections['PVS '], self.width, self.height)
+
+
+def _sources(mission_id):
+    """关卡的源数据: (地图文本, 地面图文本), 地面图可以缺失"""
+    mission = MISSIONS[mission_id]
+    map_path = os.path.join(MAP_DIR, mission['map'])
+    with open(map_path, 'rb') as f:
+        map_text = f.read()
+
+    floor_text = b''
+    floor_path = os.path.splitext(map_path)[0] + '_floor.txt'
+    if os.path.exists(floor_path):
+        with open(floor_path, 'rb') as f:
+            floor_text = f.read()
+    return map_text, floor_text
+
+
+def source_hash(map_text, floor_text):
+    """源内容哈希 (包括影响编译结果的符号表)"""
+    digest = hashlib.sha1()
+    digest.update(struct.pack('<H', FORMAT_VERSION))
+    for part in (map_text, floor_text):
+        digest.update(struct.pack('<I', len(part)))
+        digest.update(part)
+    settings = (MAP_SYMBOLS, FLOOR_SYMBOLS, DEFAULT_FLOOR, MAX_DEPTH, PVS_RAYS, np is not None)
+    digest.update(repr(settings).encode('utf-8'))
+    return digest.digest()
+
+
+def label_regions(grid, stride):
+    """四连通区域标记 (八方向移动不能穿过墙角, 连通性与四连通相同)"""
+    regions = array('H', bytes(2 * len(grid)))
+    region = 0
+    for start in range(stride, len(grid) - stride):
+        if grid[start] or regions[start]:
+            continue
+        region += 1
+        regions[start] = region
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            for neighbor in (index + 1, index - 1, index + stride, index - stride):
+                if not grid[neighbor] and not regions[neighbor]:
+                    regions[neighbor] = region
+                    queue.append(neighbor)
+    return regions
+
+
+def compile_mission(mission_id):
+    """编译关卡, 返回文件内容"""
+    # 复用 GameMap 的解析, 保证与直接加载 ASCII 地图的结果一致
+    map_text, floor_text = _sources(mission_id)
+    game_map = GameMap()
+    game_map.load_from_string(map_text.decode('utf-8'), floor_text.decode('utf-8') or None)
+
+    regions = label_regions(game_map.grid, game_map.stride)
+    if sys.byteorder != 'little':
+        regions.byteswap()
+
+    enemies = game_map.enemies_data
+    items = game_map.items_data
+    points = [c for point in enemies + items for c in point]
+    mark = struct.pack(f'<ffII{len(points)}f', *game_map.player_start, len(enemies), len(items), *points)
+
+    sections = [
+        (b'GRID', bytes(game_map.grid)),
+        (b'FLOR', bytes(game_map.floor)),
+        (b'CEIL', bytes(game_map.ceiling)),
+        (b'REGN', regions.tobytes()),
+        (b'MARK', mark),
+        (b'PVS ', compute_pvs(game_map.grid_array) if np is not None else b''),
+    ]
+
+    header_size = _HEADER.size + _SECTION.size * len(sections)
+    directory = []
+    body = bytearray()
+    offset = (header_size + 7) & ~7
+    for tag, data in sections:
+        directory.append(_SECTION.pack(tag, offset + len(body), len(data)))
+        body += data
+        body += bytes(-len(body) % 8)
+
+    digest = source_hash(map_text, floor_text)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, digest, game_map.width, game_map.height, len(sections))
+    head = header + b''.join(directory)
+    return head + bytes(offset - len(head)) + bytes(body)
+
+
+def cache_path(mission_id):
+    """关卡的编译文件路径"""
+    return os.path.join(CACHE_DIR, mission_id + '.bomap')
+
+
+def write_compiled(mission_id):
+    """编译并写入缓存 (先写临时文件再替换, 避免读到半个文件)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(mission_id)
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(compile_mission(mission_id))
+    os.replace(temp, path)
+    return path
+
+
+def load_compiled(mission_id):
+    """加载关卡的编译地图, 缺失或源文件变化时重新编译; 地图文件不存在时返回 None"""
+    path = cache_path(mission_id)
+    try:
+        map_text, floor_text = _sources(mission_id)
+    except FileNotFoundError:
+        return None
+    digest = source_hash(map_text, floor_text)
+    try:
+        compiled = CompiledMap(path)
+        if compiled.source_hash == digest:
+            return compiled
+    except (OSError, ValueError, KeyError, struct.error):
+        pass
+
+    try:
+        write_compiled(mission_id)
+    except OSError as e:
+        # 地图目录不可写时不使用缓存
+        print(f"无法写入编译地图: {e}")
+        return None
+    return CompiledMap(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Black Ops 地图编译')
+    parser.add_argument('missions', nargs='*', default=list(MISSIONS), help='要编译的关卡')
+    parser.add_argument('--info', action='store_true', help='只显示编译结果')
+    args = parser.parse_args()
+
+    for mission_id in args.missions:
+        if mission_id not in MISSIONS:
+            print(f"Mission not found: {mission_id}")
+            return 1
+        compiled = load_compiled(mission_id) if args.info else CompiledMap(write_compiled(mission_id))
+        if compiled is None:
+            return 1
+        print(f"{mission_id:<12}{compiled.width}x{compiled.height}  "
+              f"区域 {max(compiled.regions)}  敌人标记 {len(compiled.enemies_data)}  "
+              f"物品标记 {len(compiled.items_data)}  PVS {'有' if compiled.pvs else '无'}  {os.path.getsize(cache_path(mission_id))} 字节  "
+              f"{compiled.source_hash.hex()[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
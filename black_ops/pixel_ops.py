@@ -0,0 +1,42 @@
+"""
+Black Ops - 打包像素运算
+按屏幕像素格式 (每通道8位) 打包颜色, 并在打包后的整数上直接做明暗和雾混合
+"""
+
+from dda import np
+
+# 打包像素中 R/B 通道和 G 通道的掩码 (G 通道在中间的8位)
+_MASK_RB = 0xFF00FF
+_MASK_G = 0x00FF00
+
+
+def supports_packed(surface):
+    """表面是否为每通道8位、G 通道居中的32位格式"""
+    if np is None or surface.get_bitsize() != 32:
+        return False
+    shifts = surface.get_shifts()[:3]
+    losses = surface.get_losses()[:3]
+    return losses == (0, 0, 0) and sorted(shifts) == [0, 8, 16] and shifts[1] == 8
+
+
+def pack_pixels(rgb, surface):
+    """将 (..., 3) 的RGB数组打包为表面像素格式的 uint32"""
+    rgb = np.asarray(rgb).astype(np.uint32)
+    packed = np.zeros(rgb.shape[:-1], dtype=np.uint32)
+    for channel, shift in enumerate(surface.get_shifts()[:3]):
+        packed |= rgb[..., channel] << shift
+    return packed
+
+
+def shade_packed(pixels, keep, add=None):
+    """打包像素的明暗和雾: c' = c * keep / 256 + add
+
+    keep 为 0-256 的整数, add 为打包后的雾颜色 (调用方保证各通道不溢出)
+    两个通道同时相乘 (SWAR), 每个像素只需两次乘法
+    """
+    keep = np.asarray(keep, dtype=np.uint32)
+    shaded = ((pixels & _MASK_RB) * keep >> 8) & _MASK_RB
+    shaded |= ((pixels & _MASK_G) * keep >> 8) & _MASK_G
+    if add is not None:
+        shaded += add
+    return shaded
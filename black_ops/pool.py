@@ -0,0 +1,85 @@
+"""
+Black Ops - 对象池
+回收战斗中频繁创建的对象 (敌人攻击, 掉落物品, 敌人), 减少分配和GC停顿;
+调试模式下统计每个池的新建/复用次数和GC次数
+"""
+
+import gc
+import time
+from settings import *
+
+# 所有池 (名称 -> 池), 用于统计
+_pools = {}
+
+# GC 统计 (仅调试模式): 次数和累计停顿毫秒
+gc_stats = {'collections': 0, 'pause_ms': 0.0}
+_gc_start = [0.0]
+
+
+def _gc_callback(phase, info):
+    """记录每次GC的停顿时间"""
+    if phase == 'start':
+        _gc_start[0] = time.perf_counter()
+    else:
+        gc_stats['collections'] += 1
+        gc_stats['pause_ms'] += (time.perf_counter() - _gc_start[0]) * 1000
+
+
+if DEBUG_ALLOCATIONS:
+    gc.callbacks.append(_gc_callback)
+
+
+class ObjectPool:
+    """对象池: release 后的对象由下一次 acquire 复用
+
+    factory 创建的新对象由调用方负责初始化 (通常是对象的 reset 方法)
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.free = []
+        self.created = 0
+        self.reused = 0
+        _pools[name] = self
+
+    def acquire(self):
+        """取出一个对象"""
+        if self.free:
+            if DEBUG_ALLOCATIONS:
+                self.reused += 1
+            return self.free.pop()
+        if DEBUG_ALLOCATIONS:
+            self.created += 1
+        return self.factory()
+
+    def release(self, obj):
+        """归还对象"""
+        self.free.append(obj)
+
+
+class FramePool(ObjectPool):
+    """按帧回收的对象池: begin_frame 时上一帧取出的对象全部归还
+
+    适合只在一帧内使用的临时对象 (调用方丢弃也不会泄漏)
+    """
+
+    def __init__(self, name, factory):
+        super().__init__(name, factory)
+        self.used = []
+
+    def acquire(self):
+        obj = super().acquire()
+        self.used.append(obj)
+        return obj
+
+    def begin_frame(self):
+        """归还上一帧取出的所有对象"""
+        if self.used:
+            self.free.extend(self.used)
+            self.used.clear()
+
+
+def allocation_stats():
+    """各池的统计 {名称: (新建, 复用, 空闲)}"""
+    return {name: (pool.created, pool.reused, len(pool.free)) for name, pool in _pools.items()}
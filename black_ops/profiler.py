@@ -0,0 +1,107 @@
+"""
+Black Ops - 帧阶段性能分析
+按阶段记录每帧耗时, 供HUD绘制帧时间图, 并可导出为 Chrome trace-event JSON
+"""
+
+import os
+import json
+import time
+from collections import deque
+from settings import *
+
+# 导出的 trace 文件目录 (不纳入版本库)
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces')
+
+# 各阶段在帧时间图中的颜色
+STAGE_COLORS = {
+    'input': (120, 120, 120),
+    'update': (90, 160, 220),
+    'ai': (220, 120, 60),
+    'update_rest': (60, 110, 170),
+    'floor': (110, 90, 60),
+    'raycast': (230, 200, 60),
+    'walls': (200, 80, 80),
+    'sprites': (160, 90, 200),
+    'upscale': (200, 160, 220),
+    'weapon': (80, 200, 120),
+    'hud': (80, 200, 200),
+    'draw': (150, 150, 200),
+    'present': (60, 60, 60),
+}
+
+
+class FrameProfiler:
+    """帧阶段计时器
+
+    mark(stage) 将上一个标记到现在的时间记为该阶段;
+    未启用时 begin_frame/mark/end_frame 只做一次布尔判断
+    """
+
+    def __init__(self, enabled=PROFILER_ENABLED):
+        self.enabled = enabled
+        self.frames = deque()  # (帧开始, 帧结束, [(阶段, 开始, 结束), ...]), 单位纳秒
+        self._stages = []
+        self._frame_start = 0
+        self._last = 0
+
+    def toggle(self):
+        """开关分析器 (关闭时清空历史)"""
+        self.enabled = not self.enabled
+        if not self.enabled:
+            self.frames.clear()
+
+    def begin_frame(self):
+        """帧开始"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self._frame_start = now
+        self._last = now
+        self._stages = []
+
+    def mark(self, stage):
+        """结束当前阶段"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self._stages.append((stage, self._last, now))
+        self._last = now
+
+    def end_frame(self):
+        """帧结束, 丢弃超出历史时长的帧"""
+        if not self.enabled or not self._frame_start:
+            return
+        now = time.perf_counter_ns()
+        self.frames.append((self._frame_start, now, self._stages))
+        self._frame_start = 0
+
+        limit = now - int(PROFILER_HISTORY_SECONDS * 1e9)
+        frames = self.frames
+        while frames and frames[0][0] < limit:
+            frames.popleft()
+
+    def recent(self, count):
+        """最近 count 帧的各阶段耗时 [(总毫秒, [(阶段, 毫秒), ...]), ...]"""
+        frames = list(self.frames)[-count:]
+        return [
+            ((end - start) / 1e6, [(stage, (s1 - s0) / 1e6) for stage, s0, s1 in stages])
+            for start, end, stages in frames
+        ]
+
+    def export_trace(self, path):
+        """导出为 Chrome trace-event JSON (chrome://tracing 或 Perfetto 打开)"""
+        events = []
+        for index, (start, end, stages) in enumerate(self.frames):
+            events.append({
+                'name': 'frame', 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                'ts': start / 1000, 'dur': (end - start) / 1000, 'args': {'index': index},
+            })
+            for stage, s0, s1 in stages:
+                events.append({
+                    'name': stage, 'cat': 'stage', 'ph': 'X', 'pid': 1, 'tid': 1,
+                    'ts': s0 / 1000, 'dur': (s1 - s0) / 1000,
+                })
+
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(self.frames)
@@ -5,52 +5,93 @@ Black Ops - 高画质光线投射渲染引擎
 
 import pygame
 import math
+import os
 import random
+from collections import OrderedDict
 from settings import *
+from dda import np, cast_rays_dda
+from floorcaster import FloorCaster
+from spriterenderer import SpriteRenderer
+from pixel_ops import supports_packed, pack_pixels, shade_packed
+from profiler import FrameProfiler
+from lighting import lighting
+from assets import atlas
 
 
 class Raycaster:
     """高画质光线投射渲染器"""
 
-    def __init__(self, screen, game_map):
+    def __init__(self, screen, game_map, profiler=None, num_rays=NUM_RAYS):
         self.screen = screen
         self.game_map = game_map
-        self.z_buffer = [0] * NUM_RAYS
+        self.profiler = profiler if profiler is not None else FrameProfiler(enabled=False)
+
+        # 渲染分辨率 (由目标表面大小和光线数决定)
+        self.width, self.height = screen.get_size()
+        self.num_rays = num_rays
+        self.scale = max(1, self.width // num_rays)  # 每条光线的宽度
+        self.delta_angle = FOV / num_rays
+        self.z_buffer = [0] * num_rays
 
         # 预计算
-        self.screen_dist = (SCREEN_WIDTH // 2) / math.tan(HALF_FOV)
+        self.screen_dist = (self.width // 2) / math.tan(HALF_FOV)
+
+        # 生成高质量纹理 (素材图集中有时直接加载)
+        self.textures = atlas.load('wall_textures', self._generate_hd_textures)
+
+        # 预渲染天空和地面 (按渲染分辨率)
+        size = f'{self.width}x{self.height}'
+        self.sky_surface = atlas.load('sky/' + size, self._create_sky)
+        self.floor_surface = atlas.load('floor/' + size, self._create_floor)
+
+        # 预压暗的纹理 (纹理id, 光照档位) -> Surface, 按需生成
+        self.texture_variants = {}
+        self.light_version = lighting.version
 
-        # 生成高质量纹理
-        self.textures = self._generate_hd_textures()
+        # 墙壁切片缓存 (LRU)
+        self.wall_cache = OrderedDict()
+        self.wall_cache_bytes = 0
 
-        # 预渲染天空
-        self.sky_surface = self._create_sky()
+        # 批量DDA引擎
+        self.use_numpy = RAY_ENGINE == "numpy" and np is not None
+        if self.use_numpy:
+            self.ray_offsets = np.arange(self.num_rays) * self.delta_angle - HALF_FOV
 
-        # 预渲染地面
-        self.floor_surface = self._create_floor()
+        # 地面/天花板投射
+        self.floor_caster = None
+        if self.use_numpy and FLOOR_CASTING and supports_packed(screen):
+            self.floor_caster = FloorCaster(screen, game_map, self.screen_dist, self.num_rays * self.scale)
+
+        # 精灵渲染
+        self.sprite_renderer = SpriteRenderer(screen, self.screen_dist, self.num_rays, self.scale)
+
+        # 整帧数组渲染模式
+        self.use_framebuffer = self.use_numpy and RENDER_MODE == "framebuffer" and supports_packed(screen)
+        if self.use_framebuffer:
+            self._export_texture_arrays()
 
     def _create_sky(self):
         """创建高质量天空"""
-        sky = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT // 2))
+        sky = pygame.Surface((self.width, self.height // 2))
 
         # 渐变天空
-        for y in range(SCREEN_HEIGHT // 2):
-            ratio = y / (SCREEN_HEIGHT // 2)
+        for y in range(self.height // 2):
+            ratio = y / (self.height // 2)
             r = int(40 + 80 * (1 - ratio))
             g = int(80 + 100 * (1 - ratio))
             b = int(120 + 100 * (1 - ratio))
-            pygame.draw.line(sky, (r, g, b), (0, y), (SCREEN_WIDTH, y))
+            pygame.draw.line(sky, (r, g, b), (0, y), (self.width, y))
 
         # 添加云彩
-        random.seed(12345)  # 固定种子保证一致性
+        rng = random.Random(12345)  # 固定种子保证一致性 (不影响全局随机数)
         for _ in range(15):
-            cx = random.randint(0, SCREEN_WIDTH)
-            cy = random.randint(20, SCREEN_HEIGHT // 3)
+            cx = rng.randint(0, self.width)
+            cy = rng.randint(20, self.height // 3)
             for i in range(5):
-                offset_x = random.randint(-40, 40)
-                offset_y = random.randint(-10, 10)
-                size = random.randint(20, 50)
-                alpha = random.randint(30, 80)
+                offset_x = rng.randint(-40, 40)
+                offset_y = rng.randint(-10, 10)
+                size = rng.randint(20, 50)
+                alpha = rng.randint(30, 80)
                 cloud = pygame.Surface((size * 2, size), pygame.SRCALPHA)
                 pygame.draw.ellipse(cloud, (255, 255, 255, alpha), (0, 0, size * 2, size))
                 sky.blit(cloud, (cx + offset_x - size, cy + offset_y - size // 2))
@@ -59,17 +100,17 @@ class Raycaster:
 
     def _create_floor(self):
         """创建高质量地面"""
-        floor = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT // 2))
+        floor = pygame.Surface((self.width, self.height // 2))
 
-        for y in range(SCREEN_HEIGHT // 2):
-            ratio = y / (SCREEN_HEIGHT // 2)
+        for y in range(self.height // 2):
+            ratio = y / (self.height // 2)
             # 距离感渐变
             shade = int(30 + 40 * (1 - ratio * 0.5))
             # 添加一点颜色变化
             r = shade
             g = int(shade * 0.9)
             b = int(shade * 0.8)
-            pygame.draw.line(floor, (r, g, b), (0, y), (SCREEN_WIDTH, y))
+            pygame.draw.line(floor, (r, g, b), (0, y), (self.width, y))
 
         return floor
 
@@ -136,15 +177,76 @@ class Raycaster:
 
         return textures
 
+    def _export_texture_arrays(self):
+        """导出纹理和天空/地面为数组 (整帧渲染模式使用)"""
+        max_id = max(self.textures)
+        # 索引为纹理id, 未定义的id使用纹理1
+        self.texture_array = np.empty((max_id + 1, TEXTURE_SIZE, TEXTURE_SIZE, 3), dtype=np.uint8)
+        for tid in range(max_id + 1):
+            texture = self.textures.get(tid, self.textures[1])
+            self.texture_array[tid] = pygame.surfarray.array3d(texture)
+        self.texture_flat = pack_pixels(self.texture_array, self.screen).ravel()
+        self.texel_rows = np.arange(TEXTURE_SIZE)
+        self.screen_rows = np.arange(self.height, dtype=np.int32)
+        self.fog_packed = pack_pixels(lighting.fog_table, self.screen)
+
+        background = pygame.Surface((self.width, self.height), 0, self.screen)
+        background.blit(self.sky_surface, (0, 0))
+        background.blit(self.floor_surface, (0, self.height // 2))
+        background_pixels = pygame.surfarray.array2d(background).astype(np.uint32)
+
+        # 像素源: 前半部分每帧写入着色后的纹理列 (每条光线一列), 后半部分为背景像素
+        column_pixels = self.num_rays * TEXTURE_SIZE
+        self.pixel_source = np.empty(column_pixels + self.width * self.height, dtype=np.uint32)
+        self.pixel_source[column_pixels:] = background_pixels.ravel()
+        self.shaded_columns = self.pixel_source[:column_pixels].reshape(self.num_rays, TEXTURE_SIZE)
+        self.background_index = (
+            column_pixels + np.arange(self.width * self.height, dtype=np.int32)
+        ).reshape(self.width, self.height)
+        self.background_array = background_pixels
+        self.background_view = self.pixel_source[column_pixels:].reshape(self.width, self.height)
+        self.frame_array = np.empty_like(background_pixels)
+
+        # 屏幕列对应的光线 (光线覆盖范围以外的列只显示背景)
+        screen_columns = np.arange(self.width)
+        self.column_ray = np.minimum(screen_columns // self.scale, self.num_rays - 1)
+        self.column_valid = screen_columns < self.num_rays * self.scale
+        self.column_base = (self.column_ray * TEXTURE_SIZE).astype(np.int32)
+
+    def _check_lighting(self):
+        """光照设置变化后丢弃按旧光照生成的纹理和切片"""
+        lighting.refresh()
+        if self.light_version == lighting.version:
+            return
+        self.light_version = lighting.version
+        self.texture_variants.clear()
+        self.wall_cache.clear()
+        self.wall_cache_bytes = 0
+        if self.use_framebuffer:
+            self.fog_packed = pack_pixels(lighting.fog_table, self.screen)
+
     def cast_rays(self, player_x, player_y, player_angle):
         """高质量光线投射渲染"""
+        self._check_lighting()
+        if self.use_framebuffer:
+            self._cast_rays_framebuffer(player_x, player_y, player_angle)
+            return
+
         # 绘制天空和地面
         self.screen.blit(self.sky_surface, (0, 0))
-        self.screen.blit(self.floor_surface, (0, SCREEN_HEIGHT // 2))
+        if self.floor_caster:
+            self.floor_caster.draw(player_x, player_y, player_angle)
+        else:
+            self.screen.blit(self.floor_surface, (0, self.height // 2))
+        self.profiler.mark('floor')
+
+        if self.use_numpy:
+            self._cast_rays_batch(player_x, player_y, player_angle)
+            return
 
         ray_angle = player_angle - HALF_FOV
 
-        for ray in range(NUM_RAYS):
+        for ray in range(self.num_rays):
             sin_a = math.sin(ray_angle)
             cos_a = math.cos(ray_angle)
 
@@ -180,12 +282,111 @@ class Raycaster:
             if depth > 0.001:
                 wall_height = self.screen_dist / depth
             else:
-                wall_height = SCREEN_HEIGHT
+                wall_height = self.height
 
             # 绘制墙壁
             self._draw_wall_stripe_hd(ray, wall_height, texture, offset, depth, is_vertical)
 
-            ray_angle += DELTA_ANGLE
+            ray_angle += self.delta_angle
+
+        self.profiler.mark('walls')
+
+    def cast_all(self, player_x, player_y, player_angle):
+        """一次性计算所有列的命中结果
+
+        返回 (depth, texture, offset, is_vertical), depth 已做鱼眼修正
+        """
+        angles = player_angle + self.ray_offsets
+        depth, texture, offset, is_vertical = cast_rays_dda(
+            self.game_map.grid_array, player_x, player_y, angles
+        )
+        depth *= np.cos(self.ray_offsets)
+        return depth, texture, offset, is_vertical
+
+    def _cast_rays_batch(self, player_x, player_y, player_angle):
+        """批量DDA光线投射渲染"""
+        depth, texture, offset, is_vertical = self.cast_all(player_x, player_y, player_angle)
+        self.profiler.mark('raycast')
+
+        self.z_buffer = depth.tolist()
+        wall_heights = np.where(
+            depth > 0.001, self.screen_dist / np.maximum(depth, 0.001), self.height
+        ).tolist()
+
+        stripes = []
+        for ray, (wall_height, tex_id, tex_offset, vertical) in enumerate(zip(
+                wall_heights, texture.tolist(), offset.tolist(), is_vertical.tolist())):
+            stripe = self._get_wall_stripe(ray, wall_height, tex_id, tex_offset, self.z_buffer[ray], vertical)
+            if stripe:
+                stripes.append(stripe)
+        self.screen.blits(stripes, doreturn=False)
+        self.profiler.mark('walls')
+
+    def _cast_rays_framebuffer(self, player_x, player_y, player_angle):
+        """整帧数组渲染: 墙壁层在 (W, H, 3) 数组中合成后一次性写入屏幕"""
+        depth, texture, offset, is_vertical = self.cast_all(player_x, player_y, player_angle)
+        self.profiler.mark('raycast')
+        self.z_buffer = depth.tolist()
+
+        # 墙壁高度和顶部位置 (每条光线)
+        wall_height = np.where(
+            depth > 0.001, self.screen_dist / np.maximum(depth, 0.001), self.height
+        )
+        height = np.minimum(wall_height, self.height * 2).astype(np.int64)
+        top = (self.height - height) // 2
+        tex_x = np.minimum((offset * TEXTURE_SIZE).astype(np.int64), TEXTURE_SIZE - 1)
+
+        # 光照查表 (按墙壁朝向和深度)
+        side = is_vertical.astype(np.intp)
+        light = lighting.index_array(depth)
+        keep = lighting.keep_table[side, light]
+        add = self.fog_packed[side, light]
+
+        # 先对每条光线的纹理列 (R, TEXTURE_SIZE) 着色
+        base = (texture.astype(np.int64) * TEXTURE_SIZE + tex_x) * TEXTURE_SIZE
+        columns = self.texture_flat.take(base[:, None] + self.texel_rows)
+        self.shaded_columns[:] = shade_packed(columns, keep[:, None], add[:, None])
+
+        # 只处理墙壁覆盖的行范围
+        row_start = max(0, int(top.min()))
+        row_end = min(self.height, int((top + height).max()))
+        rows = self.screen_rows[row_start:row_end]
+
+        # 每个屏幕像素选择纹理列中的像素或背景像素, 一次 take 完成采样和合成
+        ray = self.column_ray
+        column_top = top.astype(np.int32)[ray]
+        column_height = np.where(self.column_valid, height[ray], 0).astype(np.int32)
+        # 16位定点数的纹理步长 (仅墙壁像素的结果会被使用, 其余像素溢出无影响)
+        tex_step = ((TEXTURE_SIZE << 16) // np.maximum(column_height, 1)).astype(np.int32)
+
+        rel = rows[None, :] - column_top[:, None]
+        mask = (rel >= 0) & (rel < column_height[:, None])
+        tex_y = (rel * tex_step[:, None]) >> 16
+        index = np.where(
+            mask,
+            self.column_base[:, None] + tex_y,
+            self.background_index[:, row_start:row_end],
+        )
+
+        if self.floor_caster:
+            self.profiler.mark('walls')
+            self._update_floor_background(player_x, player_y, player_angle)
+            self.profiler.mark('floor')
+
+        frame = self.frame_array
+        frame[:] = self.background_view
+        frame[:, row_start:row_end] = self.pixel_source.take(index)
+
+        pygame.surfarray.blit_array(self.screen, frame)
+        self.profiler.mark('walls')
+
+    def _update_floor_background(self, player_x, player_y, player_angle):
+        """将地面/天花板投射结果写入背景像素 (露天部分保留天空)"""
+        pixels, step = self.floor_caster.render(player_x, player_y, player_angle)
+        if step > 1:
+            pixels = pixels.repeat(step, axis=0).repeat(step, axis=1)[:self.width, :self.height]
+        self.background_view[:] = pixels
+        np.copyto(self.background_view, self.background_array, where=pixels == self.floor_caster.sky_key)
 
     def _cast_ray_vertical(self, px, py, sin_a, cos_a):
         """垂直墙壁检测"""
@@ -259,131 +460,88 @@ class Raycaster:
 
     def _draw_wall_stripe_hd(self, ray, wall_height, texture_id, offset, depth, is_vertical):
         """高质量墙壁渲染"""
-        wall_height = min(wall_height, SCREEN_HEIGHT * 2)
+        stripe = self._get_wall_stripe(ray, wall_height, texture_id, offset, depth, is_vertical)
+        if stripe:
+            self.screen.blit(*stripe)
 
-        wall_top = int((SCREEN_HEIGHT - wall_height) / 2)
-        x = ray * SCALE
+    def _get_wall_stripe(self, ray, wall_height, texture_id, offset, depth, is_vertical):
+        """计算墙壁列的 (切片, 位置), 切片来自缓存"""
+        wall_height = min(wall_height, self.height * 2)
 
-        # 获取纹理
-        texture = self.textures.get(texture_id, self.textures[1])
+        # 量化高度 (保持居中)
+        height = int(wall_height) // WALL_HEIGHT_STEP * WALL_HEIGHT_STEP
+        if height <= 0:
+            return None
 
         # 计算纹理列
+        if texture_id not in self.textures:
+            texture_id = 1
         tex_x = int(offset * TEXTURE_SIZE)
         if tex_x >= TEXTURE_SIZE:
             tex_x = TEXTURE_SIZE - 1
 
-        # 提取纹理列
-        tex_column = texture.subsurface((tex_x, 0, 1, TEXTURE_SIZE))
-
-        if wall_height > 0:
-            # 缩放纹理列
-            column_width = max(1, SCALE)
-            scaled_column = pygame.transform.scale(tex_column, (column_width, int(wall_height)))
-
-            # 计算光照
-            # 距离衰减 (更平滑的曲线)
-            distance_shade = max(0.15, 1 - (depth / MAX_DEPTH) ** 0.6)
-
-            # 垂直墙壁稍暗 (模拟侧光)
-            if is_vertical:
-                distance_shade *= 0.75
-
-            # 环境光
-            final_shade = AMBIENT_LIGHT + (1 - AMBIENT_LIGHT) * distance_shade
-
-            # 雾效果
-            if ENABLE_FOG and depth > FOG_START:
-                fog_ratio = min(1, (depth - FOG_START) / (FOG_END - FOG_START))
-                fog_color = (90, 100, 120)  # 蓝灰色雾
-
-                # 混合雾色
-                fog_surface = pygame.Surface(scaled_column.get_size())
-                fog_surface.fill(fog_color)
-                fog_surface.set_alpha(int(fog_ratio * 220))
-                scaled_column.blit(fog_surface, (0, 0))
-
-            # 应用阴影
-            if final_shade < 1:
-                dark_surface = pygame.Surface(scaled_column.get_size())
-                dark_surface.fill((0, 0, 0))
-                dark_surface.set_alpha(int((1 - final_shade) * 255))
-                scaled_column.blit(dark_surface, (0, 0))
-
-            self.screen.blit(scaled_column, (x, wall_top))
+        # 光照档位 (查表, 阴影和雾已包含在预压暗的纹理中)
+        level = lighting.wall_level_at(depth, 1 if is_vertical else 0)
+
+        key = (texture_id, tex_x, height, level)
+        cache = self.wall_cache
+        entry = cache.get(key)
+        if entry is None:
+            entry = self._build_wall_slice(texture_id, tex_x, height, level)
+            cache[key] = entry
+            self.wall_cache_bytes += entry[2]
+            while self.wall_cache_bytes > WALL_CACHE_MAX_BYTES and len(cache) > 1:
+                _, evicted = cache.popitem(last=False)
+                self.wall_cache_bytes -= evicted[2]
+        else:
+            cache.move_to_end(key)
+
+        surface, top = entry[0], entry[1]
+        return surface, (ray * self.scale, top)
+
+    def _get_texture_variant(self, texture_id, level):
+        """预压暗的纹理: 雾和阴影合并为一次乘法和一次加法"""
+        key = (texture_id, level)
+        variant = self.texture_variants.get(key)
+        if variant is None:
+            variant = self.textures[texture_id].copy()
+            keep = lighting.level_keep[level]
+            if keep < 255:
+                variant.fill((keep, keep, keep), special_flags=pygame.BLEND_MULT)
+            fog = lighting.level_fog[level]
+            if any(fog):
+                variant.fill(fog, special_flags=pygame.BLEND_ADD)
+            self.texture_variants[key] = variant
+        return variant
+
+    def _build_wall_slice(self, texture_id, tex_x, height, level):
+        """生成一个已着色的墙壁切片, 返回 (surface, top, bytes)"""
+        variant = self._get_texture_variant(texture_id, level)
+        width = max(1, self.scale)
+        top = (self.height - height) // 2
+
+        if top >= 0:
+            column = variant.subsurface((tex_x, 0, 1, TEXTURE_SIZE))
+            scaled = pygame.transform.scale(column, (width, height))
+        else:
+            # 超出屏幕时只缩放可见的纹素, 超出部分不缓存
+            crop = -top
+            t0 = crop * TEXTURE_SIZE // height
+            t1 = min(TEXTURE_SIZE, -(-(crop + self.height) * TEXTURE_SIZE // height))
+            part_top = t0 * height // TEXTURE_SIZE
+            part_height = t1 * height // TEXTURE_SIZE - part_top
+            column = variant.subsurface((tex_x, t0, 1, t1 - t0))
+            scaled = pygame.transform.scale(column, (width, part_height))
+            start = crop - part_top
+            scaled = scaled.subsurface((0, start, width, min(self.height, part_height - start))).copy()
+            top = 0
+
+        size = scaled.get_width() * scaled.get_height() * scaled.get_bytesize()
+        return scaled, top, size
 
     def render_sprites(self, sprites, player_x, player_y, player_angle):
-        """渲染精灵"""
-        sprites_to_render = []
-
-        for sprite in sprites:
-            dx = sprite.x - player_x
-            dy = sprite.y - player_y
-            distance = math.sqrt(dx * dx + dy * dy)
-
-            if distance < 0.5:
-                continue
-
-            theta = math.atan2(dy, dx)
-            delta = theta - player_angle
-
-            while delta > math.pi:
-                delta -= 2 * math.pi
-            while delta < -math.pi:
-                delta += 2 * math.pi
-
-            if abs(delta) > HALF_FOV + 0.3:
-                continue
-
-            sprites_to_render.append({
-                'sprite': sprite,
-                'distance': distance,
-                'delta': delta,
-            })
-
-        sprites_to_render.sort(key=lambda s: -s['distance'])
-
-        for data in sprites_to_render:
-            self._draw_sprite_hd(data, player_x, player_y)
-
-    def _draw_sprite_hd(self, data, player_x, player_y):
-        """高质量精灵渲染"""
-        sprite = data['sprite']
-        distance = data['distance']
-        delta = data['delta']
-
-        screen_x = int((delta / FOV + 0.5) * SCREEN_WIDTH)
-
-        sprite_height = min(int(self.screen_dist / distance * 1.2), SCREEN_HEIGHT)
-        sprite_width = sprite_height
-
-        draw_x = screen_x - sprite_width // 2
-        draw_y = (SCREEN_HEIGHT - sprite_height) // 2
-
-        # 深度测试
-        center_ray = int(screen_x / max(1, SCALE))
-        if 0 <= center_ray < NUM_RAYS:
-            if self.z_buffer[center_ray] < distance * 0.9:
-                return
-
-        # 获取精灵图像
-        sprite_surface = sprite.get_sprite_surface(sprite_width, sprite_height)
-
-        # 应用光照和雾
-        darkness = max(0.2, 1 - (distance / MAX_DEPTH) ** 0.6)
-
-        if ENABLE_FOG and distance > FOG_START:
-            fog_ratio = min(1, (distance - FOG_START) / (FOG_END - FOG_START))
-            fog_surface = pygame.Surface(sprite_surface.get_size())
-            fog_surface.fill((90, 100, 120))
-            fog_surface.set_alpha(int(fog_ratio * 180))
-            sprite_surface.blit(fog_surface, (0, 0))
-
-        dark_overlay = pygame.Surface(sprite_surface.get_size())
-        dark_overlay.fill((0, 0, 0))
-        dark_overlay.set_alpha(int((1 - darkness) * 200))
-        sprite_surface.blit(dark_overlay, (0, 0))
-
-        self.screen.blit(sprite_surface, (draw_x, draw_y))
+        """渲染精灵 (逐列深度裁剪)"""
+        self.sprite_renderer.render(sprites, player_x, player_y, player_angle, self.z_buffer)
 
 
 class GameMap:
@@ -398,19 +556,48 @@ class GameMap:
         self.enemies_data = []
         self.items_data = []
 
-    def load_from_string(self, map_string):
-        """从字符串加载地图"""
+        # 紧凑网格: 带一圈实心边框, 行优先, 索引为 (y + 1) * stride + (x + 1)
+        self.stride = 2
+        self.grid = bytearray(b'\x01' * 4)
+        self.grid_array = None  # grid 的 NumPy 视图 (共享内存)
+        if np is not None:
+            self.grid_array = np.frombuffer(self.grid, dtype=np.uint8).reshape(2, 2)
+
+        # 地面/天花板纹理网格 (与 grid 布局相同, 天花板为0表示露天)
+        self.floor = bytearray(4)
+        self.ceiling = bytearray(4)
+        self.floor_array = None
+        self.ceiling_array = None
+
+        # 连通区域编号和潜在可见集 (仅编译地图提供)
+        self.regions = None
+        self.pvs = None
+
+    def load_from_string(self, map_string, floor_string=None):
+        """从字符串加载地图 (floor_string 为可选的地面图)"""
         lines = [line for line in map_string.strip().split('\n')
                  if line and not line.startswith('# ')]
         self.height = len(lines)
         self.width = max(len(line) for line in lines) if lines else 0
 
+        self.stride = self.width + 2
+        grid = bytearray(b'\x01' * (self.stride * (self.height + 2)))
+        self.regions = None
+        self.pvs = None
+
+        # 地图中的标记 (重复加载时不保留上一张地图的)
+        self.player_start = (2, 2)
+        self.player_angle = 0
+        self.enemies_data = []
+        self.items_data = []
+
         self.tiles = []
         for y, line in enumerate(lines):
-            row = []
+            row = [0] * self.width
+            base = (y + 1) * self.stride + 1
             for x, char in enumerate(line):
                 tile_value = MAP_SYMBOLS.get(char, 0)
-                row.append(tile_value)
+                row[x] = tile_value
 
                 if char == 'S':
                     self.player_start = (x + 0.5, y + 0.5)
@@ -419,18 +606,81 @@ class GameMap:
                 elif char == 'I':
                     self.items_data.append((x + 0.5, y + 0.5))
 
-            while len(row) < self.width:
-                row.append(0)
+            grid[base:base + self.width] = bytes(row)
             self.tiles.append(row)
 
+        self.grid = grid
+        if np is not None:
+            self.grid_array = np.frombuffer(grid, dtype=np.uint8).reshape(self.height + 2, self.stride)
+
+        self._load_floor(floor_string or '')
+
+    def _load_floor(self, floor_string):
+        """加载地面图, 缺失的格子使用默认地面"""
+        lines = [line for line in floor_string.strip().split('\n')
+                 if line and not line.startswith('# ')]
+        default_floor, default_ceiling = FLOOR_SYMBOLS[DEFAULT_FLOOR]
+        size = self.stride * (self.height + 2)
+        floor = bytearray([default_floor]) * size
+        ceiling = bytearray(size)
+
+        for y, line in enumerate(lines[:self.height]):
+            base = (y + 1) * self.stride + 1
+            for x, char in enumerate(line[:self.width]):
+                floor_id, ceiling_id = FLOOR_SYMBOLS.get(char, (default_floor, default_ceiling))
+                floor[base + x] = floor_id
+                ceiling[base + x] = ceiling_id
+
+        self.floor = floor
+        self.ceiling = ceiling
+        if np is not None:
+            shape = (self.height + 2, self.stride)
+            self.floor_array = np.frombuffer(floor, dtype=np.uint8).reshape(shape)
+            self.ceiling_array = np.frombuffer(ceiling, dtype=np.uint8).reshape(shape)
+
+    def load_compiled(self, compiled):
+        """从编译地图 (mapcache.CompiledMap) 加载, 网格直接使用内存映射的数据"""
+        self.width = compiled.width
+        self.height = compiled.height
+        self.stride = compiled.stride
+        self.grid = compiled.grid
+        self.floor = compiled.floor
+        self.ceiling = compiled.ceiling
+        self.regions = compiled.regions
+        self.pvs = compiled.pvs
+        self.player_start = compiled.player_start
+        self.player_angle = 0  # 地图文件中没有朝向, 与 load_from_string 相同
+        self.enemies_data = list(compiled.enemies_data)
+        self.items_data = list(compiled.items_data)
+
+        stride = self.stride
+        self.tiles = [list(self.grid[(y + 1) * stride + 1:(y + 1) * stride + 1 + self.width])
+                      for y in range(self.height)]
+
+        if np is not None:
+            shape = (self.height + 2, stride)
+            self.grid_array = np.frombuffer(self.grid, dtype=np.uint8).reshape(shape)
+            self.floor_array = np.frombuffer(self.floor, dtype=np.uint8).reshape(shape)
+            self.ceiling_array = np.frombuffer(self.ceiling, dtype=np.uint8).reshape(shape)
+
     def load_from_file(self, filepath):
         """从文件加载地图"""
         try:
             with open(filepath, 'r') as f:
-                self.load_from_string(f.read())
+                map_string = f.read()
         except FileNotFoundError:
             print(f"地图文件未找到: {filepath}")
             self._create_default_map()
+            return
+
+        # 同名的地面图 (例如 mission1_floor.txt)
+        floor_path = os.path.splitext(filepath)[0] + '_floor.txt'
+        floor_string = None
+        if os.path.exists(floor_path):
+            with open(floor_path, 'r') as f:
+                floor_string = f.read()
+
+        self.load_from_string(map_string, floor_string)
 
     def _create_default_map(self):
         """创建默认地图"""
@@ -461,8 +711,8 @@ class GameMap:
 
     def get_tile(self, x, y):
         """获取瓦片"""
-        if 0 <= x < self.width and 0 <= y < self.height:
-            return self.tiles[y][x]
+        if -1 <= x <= self.width and -1 <= y <= self.height:
+            return self.grid[(y + 1) * self.stride + x + 1]
         return 1
 
     def is_wall(self, x, y):
@@ -470,9 +720,90 @@ class GameMap:
         return self.get_tile(int(x), int(y)) > 0
 
     def is_walkable(self, x, y, radius=0.2):
-        """检查可行走"""
-        for dx in [-radius, radius]:
-            for dy in [-radius, radius]:
-                if self.is_wall(x + dx, y + dy):
-                    return False
-        return True
+        """检查可行走 (四个角点)"""
+        x0 = int(x - radius) + 1
+        x1 = int(x + radius) + 1
+        y0 = int(y - radius) + 1
+        y1 = int(y + radius) + 1
+        if not (0 <= x0 and x1 <= self.width + 1 and 0 <= y0 and y1 <= self.height + 1):
+            return False
+
+        grid = self.grid
+        row0 = y0 * self.stride
+        row1 = y1 * self.stride
+        return not (grid[row0 + x0] or grid[row0 + x1] or grid[row1 + x0] or grid[row1 + x1])
+
+    def cast_ray(self, x, y, angle, max_depth=MAX_DEPTH):
+        """单条光线的网格DDA, 返回到第一面墙的距离 (未命中时为 max_depth)"""
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        if abs(cos_a) < 1e-9:
+            cos_a = 1e-9
+        if abs(sin_a) < 1e-9:
+            sin_a = 1e-9
+
+        delta_x = abs(1 / cos_a)
+        delta_y = abs(1 / sin_a)
+        map_x = math.floor(x)
+        map_y = math.floor(y)
+        step_x = 1 if cos_a > 0 else -1
+        step_y = 1 if sin_a > 0 else -1
+        side_x = ((map_x + 1 - x) if cos_a > 0 else (x - map_x)) * delta_x
+        side_y = ((map_y + 1 - y) if sin_a > 0 else (y - map_y)) * delta_y
+
+        grid = self.grid
+        stride = self.stride
+        while True:
+            if side_x < side_y:
+                dist = side_x
+                side_x += delta_x
+                map_x += step_x
+            else:
+                dist = side_y
+                side_y += delta_y
+                map_y += step_y
+
+            if dist >= max_depth:
+                return max_depth
+            if not (-1 <= map_x <= self.width and -1 <= map_y <= self.height):
+                return dist
+            if grid[(map_y + 1) * stride + map_x + 1]:
+                return dist
+
+    def has_line_of_sight(self, x0, y0, x1, y1):
+        """两点之间是否没有墙壁遮挡"""
+        dx = x1 - x0
+        dy = y1 - y0
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance < 1e-6:
+            return True
+        return self.cast_ray(x0, y0, math.atan2(dy, dx), distance) >= distance
+
+    def get_tiles_many(self, xs, ys):
+        """批量获取瓦片, 越界视为墙壁"""
+        if self.grid_array is None:
+            return [self.get_tile(int(x), int(y)) for x, y in zip(xs, ys)]
+
+        # 截断到边框范围内, 越界坐标都落在实心边框上
+        gx = np.clip(np.asarray(xs).astype(np.int64) + 1, 0, self.width + 1)
+        gy = np.clip(np.asarray(ys).astype(np.int64) + 1, 0, self.height + 1)
+        return self.grid_array[gy, gx]
+
+    def is_wall_many(self, xs, ys):
+        """批量检查墙壁"""
+        if self.grid_array is None:
+            return [tile > 0 for tile in self.get_tiles_many(xs, ys)]
+        return self.get_tiles_many(xs, ys) > 0
+
+    def is_walkable_many(self, xs, ys, radius=0.2):
+        """批量检查可行走"""
+        if self.grid_array is None:
+            return [self.is_walkable(x, y, radius) for x, y in zip(xs, ys)]
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        blocked = np.zeros(xs.shape, dtype=bool)
+        for dx in (-radius, radius):
+            for dy in (-radius, radius):
+                blocked |= self.is_wall_many(xs + dx, ys + dy)
+        return ~blocked
@@ -0,0 +1,90 @@
+"""
+Black Ops - 动态分辨率
+根据帧耗时在几档内部渲染分辨率之间切换, 低分辨率时放大到窗口大小
+"""
+
+import pygame
+from settings import *
+from raycaster import Raycaster
+
+
+class ResolutionController:
+    """动态分辨率控制器
+
+    每档分辨率对应一个独立的 Raycaster (按需创建), 渲染到缩小的内部表面;
+    平均帧耗时持续超过 RESOLUTION_DOWN_MS 时降一档, 持续低于 RESOLUTION_UP_MS 时升一档
+    """
+
+    def __init__(self, screen, game_map, profiler=None):
+        self.screen = screen
+        self.game_map = game_map
+        self.profiler = profiler
+        self.enabled = ADAPTIVE_RESOLUTION
+
+        self.level = 0
+        self.frame_ms = 0.0  # 帧耗时的滑动平均
+        self._slow_frames = 0
+        self._fast_frames = 0
+        self._raycasters = {}
+        self.raycaster = self._get_raycaster(0)
+
+    def _get_raycaster(self, level):
+        """获取某一档的渲染器"""
+        raycaster = self._raycasters.get(level)
+        if raycaster is None:
+            factor = RESOLUTION_LEVELS[level]
+            if factor >= 1:
+                target = self.screen
+            else:
+                size = (int(SCREEN_WIDTH * factor), int(SCREEN_HEIGHT * factor))
+                target = pygame.Surface(size, 0, self.screen)
+            num_rays = max(1, int(NUM_RAYS * factor))
+            raycaster = Raycaster(target, self.game_map, self.profiler, num_rays)
+            self._raycasters[level] = raycaster
+        return raycaster
+
+    def set_level(self, level):
+        """切换分辨率档位, 释放旧档位的缓存"""
+        level = max(0, min(level, len(RESOLUTION_LEVELS) - 1))
+        if level == self.level:
+            return
+        old = self.raycaster
+        old.wall_cache.clear()
+        old.wall_cache_bytes = 0
+        old.sprite_renderer.cache.clear()
+        old.sprite_renderer.cache_bytes = 0
+
+        self.level = level
+        self.raycaster = self._get_raycaster(level)
+
+        # 切换后重新积累样本
+        self.frame_ms = (RESOLUTION_DOWN_MS + RESOLUTION_UP_MS) / 2
+        self._slow_frames = 0
+        self._fast_frames = 0
+
+    def update(self, frame_ms):
+        """记录上一帧的耗时 (不含帧率限制的等待) 并调整档位"""
+        if not self.enabled:
+            return
+        self.frame_ms += (frame_ms - self.frame_ms) * 0.1
+
+        if self.frame_ms > RESOLUTION_DOWN_MS:
+            self._fast_frames = 0
+            self._slow_frames += 1
+            if self._slow_frames >= RESOLUTION_DOWN_FRAMES:
+                self.set_level(self.level + 1)
+        elif self.frame_ms < RESOLUTION_UP_MS:
+            # 长时间有余量才恢复, 避免来回切换
+            self._slow_frames = 0
+            self._fast_frames += 1
+            if self._fast_frames >= RESOLUTION_UP_FRAMES:
+                self.set_level(self.level - 1)
+        else:
+            self._slow_frames = 0
+            self._fast_frames = 0
+
+    def present(self):
+        """将内部渲染结果放大到窗口"""
+        target = self.raycaster.screen
+        if target is not self.screen:
+            pygame.transform.scale(target, self.screen.get_size(), self.screen)
@@ -18,10 +18,13 @@ NUM_RAYS = 320  # 平衡画质和性能
 MAX_DEPTH = 20  # 渲染距离
 DELTA_ANGLE = FOV / NUM_RAYS
 SCALE = max(1, SCREEN_WIDTH // NUM_RAYS)  # 每条光线的宽度
+RAY_ENGINE = "numpy"  # "numpy" 批量DDA (需要numpy) / "python" 逐条光线
+RENDER_MODE = "blit"  # "blit" 逐列贴图 / "framebuffer" 整帧数组 (需要numpy, 光线数多时更快)
 
 # 纹理设置
 TEXTURE_SIZE = 128  # 纹理大小
 HALF_TEXTURE_SIZE = TEXTURE_SIZE // 2
+TEXTURE_SHIFT = TEXTURE_SIZE.bit_length() - 1  # 纹理大小须为2的幂
 
 # 画质增强
 ENABLE_SHADOWS = True
@@ -29,6 +32,44 @@ ENABLE_FOG = True
 FOG_START = 8
 FOG_END = 30
 AMBIENT_LIGHT = 0.3
+FOG_COLOR = (90, 100, 120)  # 蓝灰色雾
+
+# 地面/天花板投射 (需要numpy)
+FLOOR_CASTING = True
+FLOOR_BUDGET_MS = 4.0  # 每帧耗时上限, 超出时降低投射分辨率
+FLOOR_CAST_START_STEP = 2  # 每个投射像素覆盖的屏幕像素边长
+FLOOR_CAST_MAX_STEP = 4
+FLOOR_SKY_KEY = (255, 0, 255)  # 露天天花板的透明色
+
+# 动态分辨率 (根据帧耗时降低内部渲染分辨率和光线数)
+ADAPTIVE_RESOLUTION = True
+RESOLUTION_LEVELS = [1.0, 0.85, 0.7, 0.5]  # 内部分辨率比例, 光线数同比例减少
+RESOLUTION_DOWN_MS = 15.0  # 平均帧耗时超过该值时降一档
+RESOLUTION_UP_MS = 10.0  # 平均帧耗时低于该值时升一档
+RESOLUTION_DOWN_FRAMES = 10  # 连续超时帧数
+RESOLUTION_UP_FRAMES = 120  # 连续有余量的帧数
+
+# 潜在可见集 (编译地图时预计算, 需要numpy)
+PVS_RAYS = 512  # 每个采样点投射的光线数
+
+# 光照查找表
+LIGHT_TABLE_SIZE = 256  # 深度 -> 光照表的项数
+LIGHT_LEVELS = 32  # 每种墙壁朝向的预压暗纹理档数
+
+# 墙壁切片缓存
+WALL_HEIGHT_STEP = 2  # 高度量化 (像素)
+SHADE_STEP = 4  # 精灵阴影/雾透明度量化
+WALL_CACHE_MAX_BYTES = 48 * 1024 * 1024  # 内存上限
+
+# 精灵帧缓存
+SPRITE_SIZE_STEP = 4  # 尺寸量化 (像素)
+SPRITE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 内存上限
+
+# 性能分析 (F3 开关帧时间图, F4 导出 Chrome trace)
+PROFILER_ENABLED = False
+PROFILER_HISTORY_SECONDS = 10  # 保留并可导出的历史时长
+PROFILER_GRAPH_FRAMES = 180  # 帧时间图显示的帧数
+DEBUG_ALLOCATIONS = False  # 统计对象池的新建/复用次数和GC停顿 (显示在帧时间图下方)
 
 # 玩家设置
 PLAYER_SPEED = 3.0
@@ -38,6 +79,16 @@ PLAYER_SIZE = 0.3  # 碰撞半径
 MOUSE_SENSITIVITY = 0.002
 MOUSE_MAX_REL = 40
 
+# 射击命中检测
+ENEMY_HIT_RADIUS = 0.5  # 敌人碰撞圆半径
+
+# 敌人AI
+LOS_CHECKS_PER_FRAME = 24  # 每帧最多做的视线检测次数, 其余敌人沿用上次结果
+NAV_FIELD_CACHE_SIZE = 8  # 缓存的流场数 (按目标格子)
+NAV_PATH_CACHE_SIZE = 256  # 缓存的巡逻路径数
+ENEMY_ENGINE = 'numpy'  # 'numpy' 批量更新所有敌人 (需要numpy), 'python' 逐个更新
+ENEMY_BATCH_MIN = 64  # 敌人数达到该值才批量更新 (敌人少时逐个更新更快)
+
 # 颜色定义
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -122,6 +173,15 @@ MAP_SYMBOLS = {
     'D': 6,   # 门
 }
 
+# 地面图符号: (地面纹理, 天花板纹理), 天花板为0表示露天
+FLOOR_SYMBOLS = {
+    '.': (1, 0),  # 混凝土, 露天
+    ',': (4, 0),  # 泥地, 露天
+    '=': (2, 2),  # 木地板, 木天花板
+    '+': (3, 3),  # 金属地板, 金属天花板
+}
+DEFAULT_FLOOR = '.'
+
 # 物品类型
 class ItemType(Enum):
     HEALTH = "health"
@@ -0,0 +1,152 @@
+"""
+Black Ops - 精灵渲染
+逐列与深度缓冲比较裁剪精灵, 并缓存缩放和光照后的精灵帧
+"""
+
+import math
+import pygame
+from collections import OrderedDict
+from settings import *
+from lighting import lighting
+
+
+class SpriteRenderer:
+    """精灵渲染器 (敌人和物品)"""
+
+    def __init__(self, screen, screen_dist, num_rays, scale):
+        self.screen = screen
+        self.width, self.height = screen.get_size()
+        self.screen_dist = screen_dist
+        self.num_rays = num_rays
+        self.scale = scale
+
+        # 精灵帧缓存 (LRU): (精灵id, 帧, 尺寸, 阴影, 雾) -> Surface
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.light_version = lighting.version
+
+    def render(self, sprites, player_x, player_y, player_angle, z_buffer):
+        """由远及近渲染精灵"""
+        if self.light_version != lighting.version:
+            self.light_version = lighting.version
+            self.cache.clear()
+            self.cache_bytes = 0
+
+        sprites_to_render = []
+
+        for sprite in sprites:
+            dx = sprite.x - player_x
+            dy = sprite.y - player_y
+            distance = math.sqrt(dx * dx + dy * dy)
+
+            if distance < 0.5:
+                continue
+
+            theta = math.atan2(dy, dx)
+            delta = theta - player_angle
+
+            while delta > math.pi:
+                delta -= 2 * math.pi
+            while delta < -math.pi:
+                delta += 2 * math.pi
+
+            if abs(delta) > HALF_FOV + 0.3:
+                continue
+
+            sprites_to_render.append((distance, delta, sprite))
+
+        sprites_to_render.sort(key=lambda s: -s[0])
+
+        for distance, delta, sprite in sprites_to_render:
+            self._draw_sprite(sprite, distance, delta, z_buffer)
+
+    def _draw_sprite(self, sprite, distance, delta, z_buffer):
+        """按可见列段绘制一个精灵"""
+        screen_x = int((delta / FOV + 0.5) * self.width)
+
+        size = min(int(self.screen_dist / distance * 1.2), self.height)
+        size = max(SPRITE_SIZE_STEP, size // SPRITE_SIZE_STEP * SPRITE_SIZE_STEP)
+
+        draw_x = screen_x - size // 2
+        draw_y = (self.height - size) // 2
+
+        # 逐列深度测试 (深度缓冲是垂直距离)
+        depth = distance * math.cos(delta)
+        runs = self._visible_runs(draw_x, size, depth, z_buffer)
+        if not runs:
+            return
+
+        surface = self._get_frame(sprite, size, distance)
+        alpha = sprite.get_sprite_alpha()
+        if alpha <= 0:
+            return
+
+        # 缓存的帧是共享的, 透明度只在本次绘制时设置
+        if alpha < 255:
+            surface.set_alpha(alpha)
+        self.screen.blits(
+            [(surface, (x0, draw_y), (x0 - draw_x, 0, x1 - x0, size)) for x0, x1 in runs],
+            doreturn=False,
+        )
+        if alpha < 255:
+            surface.set_alpha(255)
+
+    def _visible_runs(self, draw_x, size, depth, z_buffer):
+        """精灵未被墙壁遮挡的屏幕列段 [(x0, x1), ...]"""
+        start = max(0, draw_x)
+        end = min(self.width, draw_x + size)
+        if start >= end:
+            return []
+
+        runs = []
+        run_start = None
+        # 光线覆盖不到的右侧屏幕列没有墙壁
+        ray_end = min(self.num_rays, (end + self.scale - 1) // self.scale)
+        for ray in range(start // self.scale, ray_end):
+            if z_buffer[ray] >= depth:
+                if run_start is None:
+                    run_start = max(start, ray * self.scale)
+            elif run_start is not None:
+                runs.append((run_start, ray * self.scale))
+                run_start = None
+
+        if ray_end * self.scale < end:
+            if run_start is None:
+                run_start = max(start, ray_end * self.scale)
+            runs.append((run_start, end))
+        elif run_start is not None:
+            runs.append((run_start, end))
+        return runs
+
+    def _get_frame(self, sprite, size, distance):
+        """获取缩放和光照后的精灵帧"""
+        # 光照和雾 (查表, 已量化以提高缓存命中率)
+        dark_alpha, fog_alpha = lighting.sprite_alphas(distance)
+
+        sprite_id, frame = sprite.get_sprite_key()
+        key = (sprite_id, frame, size, dark_alpha, fog_alpha)
+        cache = self.cache
+        surface = cache.get(key)
+        if surface is not None:
+            cache.move_to_end(key)
+            return surface
+
+        surface = self._build_frame(sprite, size, dark_alpha, fog_alpha)
+        cache[key] = surface
+        self.cache_bytes += size * size * surface.get_bytesize()
+        while self.cache_bytes > SPRITE_CACHE_MAX_BYTES and len(cache) > 1:
+            _, old = cache.popitem(last=False)
+            self.cache_bytes -= old.get_width() * old.get_height() * old.get_bytesize()
+        return surface
+
+    def _build_frame(self, sprite, size, dark_alpha, fog_alpha):
+        """生成精灵帧: 先混合雾颜色再压暗, 只改变颜色不改变透明度"""
+        surface = sprite.get_sprite_surface(size, size)
+
+        fog = fog_alpha / 255
+        dark = dark_alpha / 255
+        keep = int(255 * (1 - fog) * (1 - dark))
+        surface.fill((keep, keep, keep), special_flags=pygame.BLEND_RGB_MULT)
+        if fog_alpha:
+            surface.fill(tuple(int(c * fog * (1 - dark)) for c in lighting.fog_color), special_flags=pygame.BLEND_RGB_ADD)
+        return surface
@@ -9,6 +9,17 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from data.missions import MISSIONS, MISSION_REWARDS
+from pool import ObjectPool
+
+# 物品颜色
+ITEM_COLORS = {
+    'health': (200, 50, 50),
+    'armor': (50, 100, 200),
+    'ammo': (200, 180, 50),
+    'weapon': (150, 100, 200),
+    'intel': (50, 200, 100),
+    'key': (200, 200, 50),
+}
 
 
 class Objective:
@@ -199,7 +210,16 @@ class MissionSystem:
 class GameItem:
     """游戏物品 (地图上的可拾取物)"""
 
+    __slots__ = (
+        'x', 'y', 'type', 'picked_up', 'id', 'amount', 'ammo_type', 'weapon_id',
+        'bob_offset', 'bob_timer', 'color',
+    )
+
     def __init__(self, x, y, item_type, **kwargs):
+        self.reset(x, y, item_type, **kwargs)
+
+    def reset(self, x, y, item_type, **kwargs):
+        """(重新) 初始化物品, 对象池复用时调用"""
         self.x = x
         self.y = y
         self.type = item_type
@@ -220,15 +240,7 @@ class GameItem:
 
     def _get_color(self):
         """根据类型获取颜色"""
-        colors = {
-            'health': (200, 50, 50),
-            'armor': (50, 100, 200),
-            'ammo': (200, 180, 50),
-            'weapon': (150, 100, 200),
-            'intel': (50, 200, 100),
-            'key': (200, 200, 50),
-        }
-        return colors.get(self.type, (150, 150, 150))
+        return ITEM_COLORS.get(self.type, (150, 150, 150))
 
     def update(self, dt):
         """更新物品状态"""
@@ -248,6 +260,14 @@ class GameItem:
 
         return False
 
+    def get_sprite_key(self):
+        """精灵缓存键: (精灵id, 帧)"""
+        return ('item', self.type), 'normal'
+
+    def get_sprite_alpha(self):
+        """精灵透明度"""
+        return 255
+
     def get_sprite_surface(self, width, height):
         """获取物品精灵"""
         import pygame
@@ -304,17 +324,20 @@ class ItemManager:
     """物品管理器"""
 
     def __init__(self):
-        self.items = []
+        self.items = []  # 未拾取的物品
+        self.pickups = []  # 本帧拾取的物品 (下一次 update 时归还对象池)
+        self.pool = ObjectPool('item', lambda: GameItem.__new__(GameItem))
 
     def spawn_item(self, x, y, item_type, **kwargs):
         """生成物品"""
-        item = GameItem(x, y, item_type, **kwargs)
+        item = self.pool.acquire()
+        item.reset(x, y, item_type, **kwargs)
         self.items.append(item)
         return item
 
     def spawn_from_mission(self, mission_data):
         """从关卡数据生成物品"""
-        self.items.clear()
+        self.clear()
         for item_data in mission_data.get('items', []):
             self.spawn_item(
                 item_data['x'],
@@ -333,24 +356,36 @@ class ItemManager:
         )
 
     def update(self, dt, player_x, player_y):
-        """更新所有物品"""
-        pickups = []
-
-        for item in self.items:
-            if item.picked_up:
-                continue
-
+        """更新所有物品, 返回本帧拾取的物品 (列表和物品在下一次 update 时复用)"""
+        pickups = self.pickups
+        for item in pickups:
+            self.pool.release(item)
+        pickups.clear()
+
+        # 拾取的物品移出列表 (原地压缩)
+        items = self.items
+        kept = 0
+        for item in items:
             item.update(dt)
 
             if item.check_pickup(player_x, player_y):
                 pickups.append(item)
+            else:
+                items[kept] = item
+                kept += 1
+        del items[kept:]
 
         return pickups
 
     def get_active_items(self):
-        """获取未拾取的物品"""
-        return [item for item in self.items if not item.picked_up]
+        """获取未拾取的物品 (返回内部列表, 不要修改)"""
+        return self.items
 
     def clear(self):
-        """清空所有物品"""
+        """清空所有物品 (归还对象池)"""
+        for item in self.items:
+            self.pool.release(item)
+        for item in self.pickups:
+            self.pool.release(item)
         self.items.clear()
+        self.pickups.clear()
@@ -0,0 +1,210 @@
+"""
+Black Ops - 寻路系统
+BFS流场 (所有追击同一目标的敌人共享) 和 A* 路径缓存 (巡逻路线)
+"""
+
+import heapq
+import math
+from collections import OrderedDict, deque
+from settings import *
+from dda import np
+
+# 8个方向 (dx, dy, 代价), 先直后斜
+_DIRECTIONS = [
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2)),
+]
+
+
+class Navigator:
+    """网格寻路 (基于 GameMap 的带边框网格)"""
+
+    def __init__(self):
+        self.game_map = None
+        self.grid = None
+        self.stride = 0
+
+        # 流场缓存 (LRU): 目标格子索引 -> 每个格子到目标的步数 (-1 为不可达)
+        self.fields = OrderedDict()
+        # 下一格表缓存 (LRU, 需要numpy): 目标格子索引 -> 每个格子沿流场的下一个格子 (-1 为无)
+        self.next_tables = OrderedDict()
+        # 路径缓存 (LRU): (起点格子, 终点格子) -> 路径点列表
+        self.paths = OrderedDict()
+
+    def begin_frame(self, game_map):
+        """每帧开始时调用, 地图重新加载后清空缓存"""
+        if self.grid is not game_map.grid:
+            self.game_map = game_map
+            self.grid = game_map.grid
+            self.stride = game_map.stride
+            self.fields.clear()
+            self.next_tables.clear()
+            self.paths.clear()
+
+    def _index(self, x, y):
+        """世界坐标所在格子在网格中的索引 (越界时返回 None)"""
+        tx = math.floor(x)
+        ty = math.floor(y)
+        if 0 <= tx < self.game_map.width and 0 <= ty < self.game_map.height:
+            return (ty + 1) * self.stride + tx + 1
+        return None
+
+    def _neighbors(self, index):
+        """可走的相邻格子 (斜向移动不能穿过墙角)"""
+        grid = self.grid
+        stride = self.stride
+        for dx, dy, cost in _DIRECTIONS:
+            neighbor = index + dy * stride + dx
+            if grid[neighbor]:
+                continue
+            if dx and dy and (grid[index + dx] or grid[index + dy * stride]):
+                continue
+            yield neighbor, cost
+
+    def flow_field(self, target_index):
+        """以目标格子为起点的BFS距离场"""
+        field = self.fields.get(target_index)
+        if field is not None:
+            self.fields.move_to_end(target_index)
+            return field
+
+        grid = self.grid
+        stride = self.stride
+        field = [-1] * len(grid)
+        field[target_index] = 0
+        queue = deque([target_index])
+        while queue:
+            index = queue.popleft()
+            step = field[index] + 1
+            for neighbor in (index + 1, index - 1, index + stride, index - stride):
+                if field[neighbor] < 0 and not grid[neighbor]:
+                    field[neighbor] = step
+                    queue.append(neighbor)
+
+        self.fields[target_index] = field
+        while len(self.fields) > NAV_FIELD_CACHE_SIZE:
+            self.fields.popitem(last=False)
+        return field
+
+    def next_cells(self, target_index):
+        """所有格子沿流场前往目标的下一个格子 (numpy数组, 与 next_waypoint 的选择相同)"""
+        table = self.next_tables.get(target_index)
+        if table is not None:
+            self.next_tables.move_to_end(target_index)
+            return table
+
+        field = np.array(self.flow_field(target_index), dtype=np.int32)
+        grid = np.frombuffer(self.grid, dtype=np.uint8)
+        size = len(field)
+        index = np.arange(size)
+        best_step = field.copy()
+        table = np.full(size, -1, dtype=np.int64)
+
+        # 按方向顺序取步数严格更小的邻格, 与逐个比较的结果一致 (越界的只有边框墙壁)
+        for dx, dy, _ in _DIRECTIONS:
+            neighbor = np.clip(index + dy * self.stride + dx, 0, size - 1)
+            step = field[neighbor]
+            better = (grid[neighbor] == 0) & (step >= 0) & (step < best_step)
+            if dx and dy:
+                better &= grid[np.clip(index + dx, 0, size - 1)] == 0
+                better &= grid[np.clip(index + dy * self.stride, 0, size - 1)] == 0
+            best_step = np.where(better, step, best_step)
+            table = np.where(better, neighbor, table)
+
+        self.next_tables[target_index] = table
+        while len(self.next_tables) > NAV_FIELD_CACHE_SIZE:
+            self.next_tables.popitem(last=False)
+        return table
+
+    def next_waypoint(self, x, y, target_x, target_y):
+        """从 (x, y) 前往目标的下一个路径点
+
+        同格或无法寻路时直接返回目标, 否则返回流场中下一个格子的中心
+        """
+        start = self._index(x, y)
+        target = self._index(target_x, target_y)
+        if start is None or target is None or start == target:
+            return target_x, target_y
+
+        field = self.flow_field(target)
+        best = None
+        best_step = field[start]
+        if best_step < 0:
+            return target_x, target_y
+
+        for neighbor, _ in self._neighbors(start):
+            step = field[neighbor]
+            if 0 <= step < best_step:
+                best = neighbor
+                best_step = step
+
+        if best is None:
+            return target_x, target_y
+        if best == target:
+            return target_x, target_y
+        return best % self.stride - 0.5, best // self.stride - 0.5
+
+    def find_path(self, x, y, target_x, target_y):
+        """A* 路径 (缓存), 返回路径点列表, 最后一个点为目标本身; 不可达时为 None"""
+        start = self._index(x, y)
+        target = self._index(target_x, target_y)
+        if start is None or target is None:
+            return None
+
+        # 编译地图提供连通区域, 不同区域之间不可达, 无需搜索
+        regions = self.game_map.regions
+        if regions is not None and regions[start] != regions[target]:
+            return None
+
+        key = (start, target)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            cells = self.paths[key]
+        else:
+            cells = self._a_star(start, target)
+            self.paths[key] = cells
+            while len(self.paths) > NAV_PATH_CACHE_SIZE:
+                self.paths.popitem(last=False)
+
+        if cells is None:
+            return None
+        stride = self.stride
+        path = [(index % stride - 0.5, index // stride - 0.5) for index in cells[:-1]]
+        path.append((target_x, target_y))
+        return path
+
+    def _a_star(self, start, target):
+        """格子索引之间的A*搜索, 返回不含起点的格子列表"""
+        if start == target:
+            return [target]
+
+        stride = self.stride
+        target_x, target_y = target % stride, target // stride
+
+        def heuristic(index):
+            # 八方向距离
+            dx = abs(index % stride - target_x)
+            dy = abs(index // stride - target_y)
+            return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+        came_from = {start: None}
+        cost = {start: 0.0}
+        heap = [(heuristic(start), start)]
+        while heap:
+            _, index = heapq.heappop(heap)
+            if index == target:
+                cells = []
+                while index != start:
+                    cells.append(index)
+                    index = came_from[index]
+                cells.reverse()
+                return cells
+
+            base = cost[index]
+            for neighbor, step in self._neighbors(index):
+                new_cost = base + step
+                if new_cost < cost.get(neighbor, math.inf):
+                    cost[neighbor] = new_cost
+                    came_from[neighbor] = index
+                    heapq.heappush(heap, (new_cost + heuristic(neighbor), neighbor))
+        return None
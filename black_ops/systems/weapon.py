@@ -12,11 +12,19 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from data.weapons import WEAPONS, AMMO_TYPES
+from assets import atlas
 
 
 class Weapon:
     """武器类"""
 
+    __slots__ = (
+        'id', 'name', 'type', 'damage', 'fire_rate', 'magazine', 'max_ammo', 'reload_time',
+        'accuracy', 'recoil', 'range', 'is_auto', 'has_scope', 'description',
+        'scope_zoom', 'pellets', 'spread', 'single_reload',
+        'current_ammo', 'reserve_ammo', 'recoil_offset', 'muzzle_flash',
+    )
+
     def __init__(self, weapon_id):
         if weapon_id not in WEAPONS:
             raise ValueError(f"Unknown weapon: {weapon_id}")
@@ -126,13 +134,13 @@ class WeaponRenderer:
 
     def __init__(self, screen):
         self.screen = screen
-        self.weapon_sprites = {}
-        self._generate_hd_weapon_sprites()
+        self.weapon_sprites = atlas.load('weapons', self._generate_hd_weapon_sprites)
         self.sway_timer = 0
         self.bob_timer = 0
 
     def _generate_hd_weapon_sprites(self):
-        """生成高清武器图像"""
+        """生成高清武器图像 (武器id -> 图像, 同类武器共用一张)"""
+        sprites = {}
 
         # M1911 手枪 (高清版)
         pistol = pygame.Surface((160, 120), pygame.SRCALPHA)
@@ -157,8 +165,8 @@ class WeaponRenderer:
         pygame.draw.rect(pistol, (60, 60, 65), (148, 45, 6, 10))
         # 击锤
         pygame.draw.rect(pistol, (40, 40, 45), (42, 38, 15, 10))
-        self.weapon_sprites['m1911'] = pistol
-        self.weapon_sprites['python'] = pistol
+        sprites['m1911'] = pistol
+        sprites['python'] = pistol
 
         # M16 突击步枪 (高清版)
         rifle = pygame.Surface((350, 140), pygame.SRCALPHA)
@@ -189,8 +197,8 @@ class WeaponRenderer:
         pygame.draw.rect(rifle, (40, 40, 45), (340, 58, 8, 26))
         # 准星
         pygame.draw.rect(rifle, (50, 50, 55), (335, 50, 8, 15))
-        self.weapon_sprites['m16'] = rifle
-        self.weapon_sprites['commando'] = rifle
+        sprites['m16'] = rifle
+        sprites['commando'] = rifle
 
         # AK47 (略有不同的外观)
         ak = pygame.Surface((350, 140), pygame.SRCALPHA)
@@ -211,7 +219,7 @@ class WeaponRenderer:
         pygame.draw.rect(ak, (48, 48, 52), (260, 62, 85, 16))
         # 准星
         pygame.draw.polygon(ak, (45, 45, 48), [(338, 45), (345, 65), (352, 45)])
-        self.weapon_sprites['ak47'] = ak
+        sprites['ak47'] = ak
 
         # MP5 冲锋枪 (高清版)
         smg = pygame.Surface((280, 130), pygame.SRCALPHA)
@@ -234,8 +242,8 @@ class WeaponRenderer:
         pygame.draw.rect(smg, (55, 55, 60), (200, 58, 75, 5))
         # 准星
         pygame.draw.rect(smg, (50, 50, 55), (268, 50, 6, 12))
-        self.weapon_sprites['mp5'] = smg
-        self.weapon_sprites['mac11'] = smg
+        sprites['mp5'] = smg
+        sprites['mac11'] = smg
 
         # L96 狙击枪 (高清版)
         sniper = pygame.Surface((400, 150), pygame.SRCALPHA)
@@ -265,8 +273,8 @@ class WeaponRenderer:
         pygame.draw.rect(sniper, (58, 58, 62), (240, 68, 155, 5))
         # 消焰器
         pygame.draw.rect(sniper, (42, 42, 46), (388, 62, 10, 32))
-        self.weapon_sprites['l96'] = sniper
-        self.weapon_sprites['dragunov'] = sniper
+        sprites['l96'] = sniper
+        sprites['dragunov'] = sniper
 
         # SPAS-12 霰弹枪 (高清版)
         shotgun = pygame.Surface((330, 140), pygame.SRCALPHA)
@@ -289,8 +297,8 @@ class WeaponRenderer:
         pygame.draw.rect(shotgun, (58, 58, 62), (185, 72, 140, 4))
         # 准星
         pygame.draw.rect(shotgun, (50, 50, 55), (318, 62, 8, 15))
-        self.weapon_sprites['spas12'] = shotgun
-        self.weapon_sprites['stakeout'] = shotgun
+        sprites['spas12'] = shotgun
+        sprites['stakeout'] = shotgun
 
         # 战术刀 (高清版)
         knife = pygame.Surface((200, 80), pygame.SRCALPHA)
@@ -315,7 +323,8 @@ class WeaponRenderer:
             pygame.draw.line(knife, (48, 32, 20), (x, 34), (x, 52), 2)
         # 尾锥
         pygame.draw.polygon(knife, (50, 50, 55), [(5, 38), (12, 32), (12, 54), (5, 48)])
-        self.weapon_sprites['knife'] = knife
+        sprites['knife'] = knife
+        return sprites
 
     def draw_weapon(self, weapon, is_aiming=False, recoil_offset=0):
         """绘制武器 (带摇摆动画)"""
@@ -5,6 +5,8 @@ Black Ops - 游戏HUD界面
 import pygame
 import math
 from settings import *
+from profiler import STAGE_COLORS
+from pool import allocation_stats, gc_stats
 
 
 class GameHUD:
@@ -258,6 +260,67 @@ class GameHUD:
             y += 25
 
 
+    def draw_frame_graph(self, profiler):
+        """绘制帧时间图 (每帧一列, 按阶段堆叠)"""
+        frames = profiler.recent(PROFILER_GRAPH_FRAMES)
+        if not frames:
+            return
+
+        width = PROFILER_GRAPH_FRAMES * 2
+        height = 120
+        x = SCREEN_WIDTH - width - 20
+        y = 170
+        budget = 1000 / FPS
+        scale = height / (budget * 2)  # 图高对应两倍帧预算
+
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 150))
+        self.screen.blit(panel, (x, y))
+
+        # 每帧一列, 自下而上堆叠各阶段
+        fill = self.screen.fill
+        totals = {}
+        column_x = x + width - len(frames) * 2
+        for frame_ms, stages in frames:
+            bottom = y + height
+            for stage, ms in stages:
+                totals[stage] = totals.get(stage, 0) + ms
+                bar = ms * scale
+                if bar >= 0.5 and bottom > y:
+                    top = max(y, bottom - bar)
+                    fill(STAGE_COLORS.get(stage, GRAY), (column_x, int(top), 2, int(bottom) - int(top)))
+                    bottom = top
+            column_x += 2
+
+        # 帧预算线 (60 FPS)
+        budget_y = y + height - int(budget * scale)
+        pygame.draw.line(self.screen, RED, (x, budget_y), (x + width, budget_y))
+
+        # 平均耗时和各阶段图例 (按耗时排序)
+        count = len(frames)
+        average = sum(frame_ms for frame_ms, _ in frames) / count
+        worst = max(frame_ms for frame_ms, _ in frames)
+        text = self.font_small.render(f"frame {average:.1f} ms  max {worst:.1f} ms", True, WHITE)
+        self.screen.blit(text, (x, y + height + 4))
+
+        legend_y = y + height + 22
+        for stage, total in sorted(totals.items(), key=lambda item: -item[1])[:6]:
+            fill(STAGE_COLORS.get(stage, GRAY), (x, legend_y + 3, 10, 10))
+            text = self.font_small.render(f"{stage} {total / count:.2f} ms", True, WHITE)
+            self.screen.blit(text, (x + 16, legend_y))
+            legend_y += 16
+
+        # 对象池和GC统计 (调试模式)
+        if DEBUG_ALLOCATIONS:
+            for name, (created, reused, free) in allocation_stats().items():
+                text = self.font_small.render(f"pool {name}: new {created} reuse {reused} free {free}", True, WHITE)
+                self.screen.blit(text, (x, legend_y))
+                legend_y += 16
+            text = self.font_small.render(
+                f"gc {gc_stats['collections']}  {gc_stats['pause_ms']:.1f} ms", True, WHITE)
+            self.screen.blit(text, (x, legend_y))
+
+
 class DialogueBox:
     """对话框"""
 
@@ -0,0 +1,150 @@
+"""
+Black Ops - 潜在可见集 (PVS)
+编译地图时预计算每个格子能看到的格子, 以位集存储;
+AI 用它决定视线检测的先后 (不在集合中的敌人推迟到预算有剩余时再检测)
+"""
+
+import math
+from settings import *
+from dda import np
+
+# 每个格子内的采样点 (格子中心和稍向内收的四个角)
+_SAMPLE_POINTS = [(0.5, 0.5), (0.02, 0.02), (0.98, 0.02), (0.02, 0.98), (0.98, 0.98)]
+
+# 每批处理的起点格子数 (限制中间数组大小)
+_BATCH = 32
+
+
+def compute_pvs(grid_array, max_distance=MAX_DEPTH, rays=PVS_RAYS):
+    """计算带边框网格中每个可走格子的可见格子, 返回打包的位集 bytes
+
+    从每个格子的采样点向四周投射 rays 条光线, 记录DDA经过的格子 (含命中的墙);
+    结果再做对称化并向外扩展一格, 减少站在格子边缘的敌人被漏掉。
+    每个格子一行 (ceil(格子数 / 8) 字节), 第 i 位对应索引 i 的格子; 墙壁格子的行为空。
+    中间结果按批打包存储, 不展开整张 可走格子数 x 格子数 的布尔矩阵
+    """
+    rows, stride = grid_array.shape
+    cells = rows * stride
+    row_bytes = (cells + 7) // 8
+    flat = np.ascontiguousarray(grid_array).ravel()
+    walk = np.flatnonzero(flat == 0)
+    count = len(walk)
+
+    # 光线经过的格子, 每个格子一行打包的位集
+    seen = np.zeros((cells, row_bytes), dtype=np.uint8)
+
+    # 角度错开半格, 避免与坐标轴平行
+    angles = (np.arange(rays) + 0.5) * (2 * math.pi / rays)
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    delta_x = np.abs(1.0 / cos_a)
+    delta_y = np.abs(1.0 / sin_a)
+    step_x = np.where(cos_a > 0, 1, -1)
+    step_y = np.where(sin_a > 0, 1, -1)
+    points = np.array(_SAMPLE_POINTS)
+
+    for first in range(0, count, _BATCH):
+        source_cells = walk[first:first + _BATCH]
+        batch = len(source_cells)
+        visible = np.zeros((batch, cells), dtype=bool)
+        visible[np.arange(batch), source_cells] = True
+
+        # 每条光线: (起点格子, 采样点, 方向) 展开为一维
+        shape = (batch, len(points), rays)
+        owner = np.broadcast_to(np.arange(batch)[:, None, None], shape).ravel()
+        px = np.broadcast_to((source_cells % stride)[:, None, None] + points[None, :, 0, None], shape).ravel()
+        py = np.broadcast_to((source_cells // stride)[:, None, None] + points[None, :, 1, None], shape).ravel()
+        ray = np.broadcast_to(np.arange(rays), shape).ravel()
+
+        map_x = px.astype(np.int64)
+        map_y = py.astype(np.int64)
+        side_x = np.where(cos_a[ray] > 0, map_x + 1 - px, px - map_x) * delta_x[ray]
+        side_y = np.where(sin_a[ray] > 0, map_y + 1 - py, py - map_y) * delta_y[ray]
+
+        active = np.arange(owner.size)
+        while active.size:
+            sx = side_x[active]
+            sy = side_y[active]
+            r = ray[active]
+            vertical = sx < sy
+            dist = np.where(vertical, sx, sy)
+            map_x[active] += np.where(vertical, step_x[r], 0)
+            map_y[active] += np.where(vertical, 0, step_y[r])
+            side_x[active] = np.where(vertical, sx + delta_x[r], sx)
+            side_y[active] = np.where(vertical, sy, sy + delta_y[r])
+
+            # 边框是实心的, 光线不会越界
+            in_range = dist < max_distance
+            active = active[in_range]
+            cell = map_y[active] * stride + map_x[active]
+            visible[owner[active], cell] = True
+            active = active[flat[cell] == 0]
+
+        seen[source_cells] = np.packbits(visible, axis=1, bitorder='little')
+
+    # 对称化和扩展按 8 * _BATCH 个格子一组处理, 写入新的数组 (seen 的列在后面的组还要读)
+    walkable = flat == 0
+    packed = np.zeros((cells, row_bytes), dtype=np.uint8)
+    block = 8 * _BATCH
+    for first in range(0, cells, block):
+        last = min(first + block, cells)
+        visible = np.unpackbits(seen[first:last], axis=1, count=cells, bitorder='little').astype(bool)
+
+        # 对称化: A 的某点能看到 B, 则 B 的某点也能看到 A (只在可走格子之间; 墙壁格子的行为空)
+        columns = np.unpackbits(seen[:, first // 8:(last + 7) // 8], axis=1, bitorder='little')
+        visible |= columns[:, :last - first].T.astype(bool)
+        visible[~walkable[first:last]] = False
+
+        # 向外扩展一格 (敌人可能站在格子边缘)
+        grid = visible.reshape(last - first, rows, stride)
+        expanded = grid.copy()
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dx or dy:
+                    expanded[:, max(dy, 0):rows + min(dy, 0), max(dx, 0):stride + min(dx, 0)] |= \
+                        grid[:, max(-dy, 0):rows + min(-dy, 0), max(-dx, 0):stride + min(-dx, 0)]
+        packed[first:last] = np.packbits(expanded.reshape(last - first, cells), axis=1, bitorder='little')
+    return packed.tobytes()
+
+
+class PotentiallyVisibleSet:
+    """潜在可见集查询 (每个格子的位集按需转换为整数并缓存)"""
+
+    def __init__(self, data, width, height):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.row_bytes = (self.stride * (height + 2) + 7) // 8
+        self._rows = {}
+
+    def index(self, x, y):
+        """世界坐标所在格子的索引 (越界时为 None)"""
+        tx = int(x)
+        ty = int(y)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return (ty + 1) * self.stride + tx + 1
+        return None
+
+    def visible_from(self, x, y):
+        """(x, y) 所在格子的可见位集 (越界时为 None, 表示不做剔除)"""
+        index = self.index(x, y)
+        if index is None:
+            return None
+        row = self._rows.get(index)
+        if row is None:
+            start = index * self.row_bytes
+            row = int.from_bytes(self.data[start:start + self.row_bytes], 'little')
+            self._rows[index] = row
+        return row
+
+    def contains(self, row, x, y):
+        """位集中是否包含 (x, y) 所在的格子"""
+        if row is None:
+            return True
+        index = self.index(x, y)
+        return index is None or (row >> index) & 1 == 1
+
+    def can_see(self, x0, y0, x1, y1):
+        """两点之间是否可能有视线 (为 False 时一定被墙挡住)"""
+        return self.contains(self.visible_from(x0, y0), x1, y1)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Minecraft 3D - 区块绘制性能基准测试
+
+生成玩家周围的区块, 分别用显示列表和顶点缓冲 (VBO) 两种方式绘制,
+统计首次构建区块的耗时、旋转视角时每帧的绘制耗时,
+以及每帧修改一个方块 (重建该区块) 时的帧耗时
+(只计清屏和区块绘制, 不含云层、僵尸等其他部分)
+
+运行方式:
+    python3 benchmark3d.py                      # 比较两种绘制方式 (逐面和合并面网格)
+    python3 benchmark3d.py --distance 4 --frames 300
+    python3 benchmark3d.py --egl                # 没有显示器时用 EGL 离屏上下文 (Mesa)
+    python3 benchmark3d.py --egl --size 320x180 # 软件光栅化时缩小画面, 突出提交开销
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+BACKENDS = ('display_list', 'vbo')
+MESHES = ('faces', 'greedy')
+
+
+def percentile(values, q):
+    """线性插值分位数 (q 为 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def create_context(width, height, egl):
+    """创建 OpenGL 上下文: 隐藏的 pygame 窗口, 或 EGL 离屏缓冲"""
+    if not egl:
+        import pygame
+        pygame.init()
+        pygame.display.set_mode((width, height), pygame.OPENGL | pygame.DOUBLEBUF | pygame.HIDDEN)
+        return
+
+    import ctypes
+    from OpenGL import EGL
+
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor))
+
+    attribs = [EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8,
+               EGL.EGL_BLUE_SIZE, 8, EGL.EGL_DEPTH_SIZE, 24, EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+               EGL.EGL_NONE]
+    config = EGL.EGLConfig()
+    count = EGL.EGLint()
+    EGL.eglChooseConfig(display, (EGL.EGLint * len(attribs))(*attribs), ctypes.pointer(config), 1,
+                        ctypes.pointer(count))
+    if count.value == 0:
+        raise RuntimeError("没有可用的 EGL 配置")
+
+    size = [EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE]
+    surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * len(size))(*size))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    EGL.eglMakeCurrent(display, surface, surface, context)
+
+
+def draw_frame(renderer, world, player):
+    """绘制一帧区块并等待 GPU 完成, 返回耗时 (毫秒)"""
+    from OpenGL.GL import glClear, glFinish, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT
+
+    start = time.perf_counter()
+    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    renderer.set_camera(player)
+    renderer.render_chunks(world, player)
+    glFinish()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_backend(world, player, backend, greedy, frames, edits, seed):
+    """测试一种绘制方式, 返回统计结果 (毫秒)"""
+    from OpenGL.GL import glDeleteLists, glDeleteBuffers
+    from renderer3d import Renderer
+    from settings3d import CHUNK_SIZE, BlockType
+
+    renderer = Renderer(backend, greedy)
+    for chunk in world.chunks.values():
+        chunk.dirty = True
+
+    # 首次构建所有可见区块
+    first_frame = draw_frame(renderer, world, player)
+    builds = renderer.stats['builds']
+    build_ms = renderer.stats['build_total_ms'] / max(builds, 1)
+
+    # 原地旋转视角
+    draw = []
+    for i in range(frames):
+        player.yaw = i * 2 * math.pi / frames
+        draw.append(draw_frame(renderer, world, player))
+
+    # 每帧在附近修改一个方块, 对应区块重建
+    rng = random.Random(seed)
+    edit = []
+    base_x = math.floor(player.x)
+    base_z = math.floor(player.z)
+    for i in range(edits):
+        x = base_x + rng.randint(-CHUNK_SIZE, CHUNK_SIZE)
+        z = base_z + rng.randint(-CHUNK_SIZE, CHUNK_SIZE)
+        y = int(player.y) - 2 - rng.randint(0, 3)
+        block = world.get_block(x, y, z)
+        world.set_block(x, y, z, BlockType.STONE if block == BlockType.AIR else BlockType.AIR)
+        edit.append(draw_frame(renderer, world, player))
+        world.set_block(x, y, z, block)
+
+    result = {
+        'chunks': renderer.stats['chunks'],
+        'vertices': renderer.stats['vertices'],
+        'first_frame': first_frame,
+        'build': build_ms,
+        'draw_p50': percentile(draw, 50),
+        'draw_p95': percentile(draw, 95),
+        'edit_p50': percentile(edit, 50),
+        'edit_p95': percentile(edit, 95),
+    }
+
+    # 释放本次测试的显示列表和缓冲, 下一种方式从头构建
+    for chunk in world.chunks.values():
+        for name in ('display_list', 'trans_display_list'):
+            if getattr(chunk, name, None):
+                glDeleteLists(getattr(chunk, name), 1)
+        for name in ('vbo', 'trans_vbo'):
+            if getattr(chunk, name, None) is not None:
+                glDeleteBuffers(1, [getattr(chunk, name)])
+        for name in ('display_list', 'trans_display_list', 'vbo', 'vbo_capacity',
+                     'trans_vbo', 'trans_vbo_capacity'):
+            if hasattr(chunk, name):
+                delattr(chunk, name)
+    return result
+
+
+def print_results(results):
+    """输出对比表"""
+    header = (f"{'方式':<14}{'网格':<8}{'区块':>5}{'顶点':>9}{'首帧':>9}{'构建/区块':>11}"
+              f"{'绘制p50':>9}{'p95':>7}{'改方块p50':>11}{'p95':>7}")
+    print(header)
+    print('-' * 90)
+    for (backend, mesh), r in results:
+        print(f"{backend:<16}{mesh:<10}{r['chunks']:>5}{r['vertices']:>9}{r['first_frame']:>10.1f}"
+              f"{r['build']:>10.2f}{r['draw_p50']:>10.2f}{r['draw_p95']:>7.2f}"
+              f"{r['edit_p50']:>10.2f}{r['edit_p95']:>7.2f}")
+    print("(单位: 毫秒; 首帧包含全部区块的构建)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minecraft 3D 区块绘制基准测试')
+    parser.add_argument('--backends', nargs='*', default=list(BACKENDS), choices=BACKENDS,
+                        help='要比较的绘制方式')
+    parser.add_argument('--meshes', nargs='*', default=list(MESHES), choices=MESHES,
+                        help='网格类型 (逐面 / 合并面)')
+    parser.add_argument('--distance', type=int, default=None, help='渲染距离 (区块数, 默认取设置)')
+    parser.add_argument('--frames', type=int, default=120, help='旋转视角的帧数')
+    parser.add_argument('--edits', type=int, default=60, help='修改方块的帧数')
+    parser.add_argument('--seed', type=int, default=1234, help='世界和修改位置的随机种子')
+    parser.add_argument('--one-block', action='store_true', help='使用 One Block 模式的世界 (默认普通地形)')
+    parser.add_argument('--egl', action='store_true', help='使用 EGL 离屏上下文 (无显示器时)')
+    parser.add_argument('--size', default=None, help='画面尺寸 (如 320x180, 默认取窗口设置)')
+    args = parser.parse_args()
+
+    # 必须在导入 OpenGL 之前设置
+    if args.egl:
+        os.environ['PYOPENGL_PLATFORM'] = 'egl'
+        os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+
+    from settings3d import WINDOW_WIDTH, WINDOW_HEIGHT, RENDER_DISTANCE, CHUNK_SIZE
+    width, height = WINDOW_WIDTH, WINDOW_HEIGHT
+    if args.size:
+        width, height = (int(v) for v in args.size.lower().split('x'))
+    create_context(width, height, args.egl)
+
+    import renderer3d
+    from OpenGL.GL import glGetString, GL_RENDERER
+    from world3d import World
+    from player3d import Player
+
+    distance = RENDER_DISTANCE if args.distance is None else args.distance
+    # 渲染器按模块中的渲染距离选择区块
+    renderer3d.RENDER_DISTANCE = distance
+
+    world = World(seed=args.seed, one_block_mode=args.one_block)
+    world.get_chunks_around(0, 0, distance + 1)
+
+    # 站在出生点地面上方
+    x, z = CHUNK_SIZE // 2, CHUNK_SIZE // 2
+    ground = max(y for y in range(1, 128) if world.get_block(x, y, z) != 0)
+    player = Player(x + 0.5, ground + 2, z + 0.5)
+    player.pitch = 0.3
+
+    print(f"OpenGL: {glGetString(GL_RENDERER).decode()}  {width}x{height}  渲染距离: {distance}  "
+          f"{'One Block' if args.one_block else '普通地形'}")
+
+    results = []
+    for backend in args.backends:
+        for mesh in args.meshes:
+            result = run_backend(world, player, backend, mesh == 'greedy', args.frames, args.edits, args.seed)
+            results.append(((backend, mesh), result))
+
+    print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# 后台区块加载 - 地形生成和网格构建放到进程池中
+#
+# 主线程每帧只做三件事: 收集完成的任务, 按到玩家所在区块的距离提交新任务,
+# 在每帧的上传额度内把构建好的网格上传到显卡 (OpenGL 调用只能在主线程)
+#
+# 生成和构建网格都是纯 Python / NumPy 计算, 用线程会和主循环争抢 GIL, 所以用进程;
+# 进程用 spawn 方式启动, 不复制主进程的窗口和 OpenGL 状态
+import math
+import time
+import heapq
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from settings3d import CHUNK_SIZE, RENDER_DISTANCE, CHUNK_WORKERS, CHUNK_UPLOADS_PER_FRAME
+from world3d import World, Chunk
+from mesher3d import build_meshes
+
+# 工作进程中的世界 (只用来生成区块) 和网格参数, 由 _init_worker 设置
+_world = None
+_passes = None
+_greedy = False
+
+# 四个相邻区块的偏移 (网格边界由它们决定)
+NEIGHBORS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# 进程池异常退出后最多重建的次数, 超过后改为在主线程同步加载
+MAX_POOL_RESTARTS = 3
+
+
+def _init_worker(seed, one_block_mode, one_block_pos, passes, greedy):
+    """工作进程初始化: 用同一个种子创建世界"""
+    global _world, _passes, _greedy
+    _world = World(seed, one_block_mode)
+    _world.one_block_pos = one_block_pos
+    _passes = passes
+    _greedy = greedy
+
+
+def _generate_job(chunk_x, chunk_z):
+    """生成区块, 返回 (方块数组, 是否生成了村庄)"""
+    chunk = _world._generate_chunk(chunk_x, chunk_z)
+    return chunk.blocks, (chunk_x, chunk_z) in _world.village_chunks
+
+
+def _mesh_job(padded):
+    """构建区块网格, 返回 (各遍的 (顶点, 颜色), 耗时毫秒)"""
+    start = time.perf_counter()
+    meshes = build_meshes(padded, _passes, _greedy)
+    return meshes, (time.perf_counter() - start) * 1000
+
+
+class ChunkLoader:
+    """按距离优先加载玩家周围的区块
+
+    workers 为 0 时和以前一样在主线程同步生成, 由渲染器绘制时构建网格
+    """
+
+    def __init__(self, world, renderer, workers=CHUNK_WORKERS, uploads_per_frame=CHUNK_UPLOADS_PER_FRAME):
+        self.world = world
+        self.renderer = renderer
+        self.workers = workers
+        self.uploads_per_frame = uploads_per_frame
+        # 同时在进程池中的任务数; 其余留在主线程, 提交时按玩家最新位置排序
+        self.max_jobs = workers * 2
+
+        self.generating = {}  # 区块坐标 -> 生成任务
+        self.meshing = {}     # 区块坐标 -> (网格任务, 序号, 区块)
+        self.ready = []       # 待上传的网格 (距离, 序号, 区块坐标, 区块, 网格), 按距离排序的堆
+        self.latest = {}      # 区块坐标 -> 最近一次提交的网格任务序号, 更早的结果不再上传
+        self._sequence = itertools.count()
+
+        self.pool = None
+        self.pool_broken = False
+        self.restarts = 0
+        if workers > 0:
+            self._start_pool()
+
+    def _start_pool(self):
+        """创建进程池, 绘制时不再同步构建网格"""
+        self.pool = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+            initargs=(self.world.seed, self.world.one_block_mode, self.world.one_block_pos,
+                      self.renderer.mesh_passes(), self.renderer.greedy))
+        self.renderer.build_on_draw = False
+
+    def _restart_pool(self):
+        """工作进程异常退出 (如内存不足被杀) 后重建进程池, 未完成的任务重新提交"""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = None
+        self.pool_broken = False
+        self.generating.clear()
+        for _, _, chunk in self.meshing.values():
+            chunk.dirty = True
+        self.meshing.clear()
+
+        self.restarts += 1
+        if self.restarts > MAX_POOL_RESTARTS:
+            print("区块加载进程池多次异常退出, 改为在主线程同步加载")
+            self.ready.clear()
+            self.renderer.stats.pop('jobs', None)
+            self.renderer.build_on_draw = True
+            return
+        print(f"区块加载进程池异常退出, 重新创建 ({self.restarts}/{MAX_POOL_RESTARTS})")
+        self._start_pool()
+
+    def reset(self):
+        """读档后调用: 丢弃所有进行中的任务, 按存档的种子和模式重建进程池"""
+        for future in self.generating.values():
+            future.cancel()
+        for future, _, _ in self.meshing.values():
+            future.cancel()
+        self.generating.clear()
+        self.meshing.clear()
+        self.ready.clear()
+        self.latest.clear()
+        self.renderer.stats.pop('jobs', None)
+
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            self.pool_broken = False
+            self._start_pool()
+
+    def update(self, player):
+        """每帧调用"""
+        center_x = math.floor(player.x / CHUNK_SIZE)
+        center_z = math.floor(player.z / CHUNK_SIZE)
+        if self.pool is None:
+            self.world.get_chunks_around(center_x, center_z, RENDER_DISTANCE)
+            return
+
+        self._collect(center_x, center_z)
+        if self.pool_broken:
+            self._restart_pool()
+            if self.pool is None:
+                self.world.get_chunks_around(center_x, center_z, RENDER_DISTANCE)
+                return
+
+        # 玩家所在和相邻的区块要用于碰撞, 后台还没生成好 (如传送、重生后) 时直接同步生成
+        for dx in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                key = (center_x + dx, center_z + dz)
+                if key not in self.world.chunks:
+                    self.world.get_chunk(*key)
+                    self._chunk_added(key)
+
+        self._submit_generation(center_x, center_z)
+        self._submit_meshing(center_x, center_z)
+        self._upload()
+
+        self.renderer.stats['jobs'] = (len(self.generating), len(self.meshing), len(self.ready))
+
+    def _collect(self, center_x, center_z):
+        """收集完成的生成和网格任务"""
+        for key, future in list(self.generating.items()):
+            if not future.done():
+                continue
+            del self.generating[key]
+            try:
+                blocks, village = future.result()
+            except BrokenProcessPool:
+                self.pool_broken = True
+                continue
+            except Exception as e:
+                print(f"后台生成区块 {key} 失败, 改为同步生成: {e!r}")
+                if key not in self.world.chunks:
+                    self.world.get_chunk(*key)
+                    self._chunk_added(key)
+                continue
+            # 期间已同步生成或从存档加载的区块以主线程为准
+            if key in self.world.chunks:
+                continue
+            chunk = Chunk(*key)
+            chunk.blocks = blocks
+            self.world.chunks[key] = chunk
+            self.world.generated_chunks.add(key)
+            if village:
+                self.world.village_chunks.add(key)
+            self._chunk_added(key)
+
+        for key, (future, sequence, chunk) in list(self.meshing.items()):
+            if not future.done():
+                continue
+            del self.meshing[key]
+            try:
+                meshes, elapsed = future.result()
+            except BrokenProcessPool:
+                self.pool_broken = True
+                chunk.dirty = True
+                continue
+            except Exception as e:
+                print(f"后台构建区块 {key} 网格失败, 改为同步构建: {e!r}")
+                if self.world.chunks.get(key) is chunk:
+                    self.renderer.build_chunk(chunk, self.world)
+                continue
+            self.renderer.record_build(elapsed)
+            distance = (key[0] - center_x) ** 2 + (key[1] - center_z) ** 2
+            heapq.heappush(self.ready, (distance, sequence, key, chunk, meshes))
+
+    def _chunk_added(self, key):
+        """新区块加入世界: 相邻区块的边界面要重建"""
+        for dx, dz in NEIGHBORS:
+            neighbor = self.world.chunks.get((key[0] + dx, key[1] + dz))
+            if neighbor is not None:
+                neighbor.dirty = True
+
+    def _visible(self, center_x, center_z):
+        """渲染距离内的区块坐标和到玩家的距离"""
+        for dx in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
+            for dz in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
+                yield dx * dx + dz * dz, (center_x + dx, center_z + dz)
+
+    def _submit_generation(self, center_x, center_z):
+        """提交最近的待生成区块"""
+        free = self.max_jobs - len(self.generating)
+        if free <= 0:
+            return
+        wanted = [(distance, key) for distance, key in self._visible(center_x, center_z)
+                  if key not in self.world.chunks and key not in self.generating]
+        for _, key in heapq.nsmallest(free, wanted):
+            try:
+                self.generating[key] = self.pool.submit(_generate_job, *key)
+            except BrokenProcessPool:
+                self.pool_broken = True
+                return
+
+    def _submit_meshing(self, center_x, center_z):
+        """提交最近的脏区块的网格任务"""
+        free = self.max_jobs - len(self.meshing)
+        if free <= 0:
+            return
+        wanted = []
+        for distance, key in self._visible(center_x, center_z):
+            chunk = self.world.chunks.get(key)
+            if chunk is None or not chunk.dirty or key in self.meshing:
+                continue
+            # 相邻区块马上就会生成好, 等它们到了再构建, 免得边界面构建两次
+            if any((key[0] + dx, key[1] + dz) in self.generating for dx, dz in NEIGHBORS):
+                continue
+            wanted.append((distance, key))
+
+        for _, key in heapq.nsmallest(free, wanted):
+            chunk = self.world.chunks[key]
+            try:
+                future = self.pool.submit(_mesh_job, self.world.get_padded_blocks(chunk))
+            except BrokenProcessPool:
+                self.pool_broken = True
+                return
+            # 提交时的方块快照; 之后再修改会重新标记为脏, 下一轮重新构建
+            chunk.dirty = False
+            sequence = next(self._sequence)
+            self.latest[key] = sequence
+            self.meshing[key] = (future, sequence, chunk)
+
+    def _upload(self):
+        """按距离上传构建好的网格, 每帧最多 uploads_per_frame 个
+
+        丢弃已过时的网格: 同一区块之后又提交过任务 (堆按距离排序, 新结果可能先出堆),
+        或区块已被替换 (读档会重建所有区块)
+        """
+        uploads = 0
+        while self.ready and uploads < self.uploads_per_frame:
+            _, sequence, key, chunk, meshes = heapq.heappop(self.ready)
+            if sequence != self.latest.get(key) or self.world.chunks.get(key) is not chunk:
+                continue
+            self.renderer.upload_chunk(chunk, meshes)
+            del self.latest[key]
+            uploads += 1
+
+    def close(self):
+        """退出时关闭进程池, 丢弃未开始的任务"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -22,7 +22,6 @@ Minecraft 3D - 一个用Python、Pygame和OpenGL制作的3D Minecraft风格游
 
 import sys
 import os
-import math
 
 # 添加当前目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -39,6 +38,7 @@ from settings3d import (
 from world3d import World
 from player3d import Player
 from renderer3d import Renderer
+from chunkloader3d import ChunkLoader
 from hud3d import HUD, PauseMenu, InventoryScreen
 from save_system import save_game, load_game, has_save
 from daynight import DayNightCycle
@@ -100,6 +100,9 @@ class Game:
         # 创建渲染器
         self.renderer = Renderer()
 
+        # 后台加载区块 (生成地形和构建网格)
+        self.chunk_loader = ChunkLoader(self.world, self.renderer)
+
         # 创建HUD
         self.hud = HUD()
         self.pause_menu = PauseMenu()
@@ -203,10 +206,10 @@ class Game:
             # 加载游戏
             if has_save():
                 load_game(self.world, self.player)
-                # 重新加载周围区块
-                player_chunk_x = math.floor(self.player.x / CHUNK_SIZE)
-                player_chunk_z = math.floor(self.player.z / CHUNK_SIZE)
-                self.world.get_chunks_around(player_chunk_x, player_chunk_z, RENDER_DISTANCE)
+                # 后台任务和工作进程的世界还是读档前的, 重新开始;
+                # 周围缺少的区块由区块加载器补上 (玩家附近的同步生成)
+                self.chunk_loader.reset()
+                self.chunk_loader.update(self.player)
             else:
                 print("没有找到存档文件")
 
@@ -265,9 +268,7 @@ class Game:
             self.player.attack(self.zombie_manager)
 
         # 加载新区块
-        player_chunk_x = math.floor(self.player.x / CHUNK_SIZE)
-        player_chunk_z = math.floor(self.player.z / CHUNK_SIZE)
-        self.world.get_chunks_around(player_chunk_x, player_chunk_z, RENDER_DISTANCE)
+        self.chunk_loader.update(self.player)
 
     def _render(self):
         """渲染画面"""
@@ -296,7 +297,7 @@ class Game:
         fps = self.clock.get_fps()
         zombie_count = len(self.zombie_manager.get_zombies())
         self.hud.render(self.hud_surface, self.player, fps, self.debug_mode, self.world,
-                       self.day_night, zombie_count)
+                       self.day_night, zombie_count, self.renderer.stats)
 
         # 挖掘进度
         if self.player.is_mining:
@@ -376,6 +377,7 @@ class Game:
 
     def _cleanup(self):
         """清理资源"""
+        self.chunk_loader.close()
         pygame.mouse.set_visible(True)
         pygame.event.set_grab(False)
         pygame.quit()
@@ -19,7 +19,8 @@ class HUD:
         self.small_font = pygame.font.Font(None, 20)
         self.large_font = pygame.font.Font(None, 48)
 
-    def render(self, screen, player, fps=0, debug=False, world=None, day_night=None, zombie_count=0):
+    def render(self, screen, player, fps=0, debug=False, world=None, day_night=None, zombie_count=0,
+               render_stats=None):
         """渲染HUD"""
         self._render_hotbar(screen, player)
         self._render_crosshair(screen, player)
@@ -38,7 +39,7 @@ class HUD:
             self._render_one_block_info(screen, world)
 
         if debug:
-            self._render_debug(screen, player, fps)
+            self._render_debug(screen, player, fps, render_stats)
 
     def _render_crosshair(self, screen, player=None):
         """渲染准星"""
@@ -262,7 +263,7 @@ class HUD:
         text3 = self.small_font.render(phase_name, True, (200, 200, 200))
         screen.blit(text3, (WINDOW_WIDTH - text3.get_width() - 15, 56))
 
-    def _render_debug(self, screen, player, fps):
+    def _render_debug(self, screen, player, fps, render_stats=None):
         """渲染调试信息"""
         lines = [
             f"FPS: {fps:.0f}",
@@ -273,6 +274,22 @@ class HUD:
             f"In Water: {player.in_water}",
         ]
 
+        # 网格统计: 顶点数和重建耗时
+        if render_stats:
+            vertices = render_stats['vertices']
+            builds = render_stats['builds']
+            average = render_stats['build_total_ms'] / builds if builds else 0.0
+            lines += [
+                f"Chunks: {render_stats['chunks']}  Quads: {vertices // 4}  Vertices: {vertices}",
+                f"Mesh: {render_stats['mode']} / {render_stats['backend']}  "
+                f"{vertices * render_stats['vertex_size'] // 1024} KB",
+                f"Chunk build: {render_stats['build_ms']:.1f} ms (avg {average:.1f} ms, {builds} builds)",
+            ]
+            # 后台区块加载的排队情况
+            if 'jobs' in render_stats:
+                generating, meshing, uploads = render_stats['jobs']
+                lines.append(f"Chunk jobs: gen {generating}  mesh {meshing}  upload {uploads}")
+
         y = 10
         for line in lines:
             # 阴影
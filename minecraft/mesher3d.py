@@ -0,0 +1,144 @@
+# 区块网格构建 - NumPy 向量化
+#
+# 输入是带一格边缘的方块数组 (边缘由 World.get_padded_blocks 从相邻区块复制),
+# 用数组平移求出每个方向的可见面, 一次性生成顶点和颜色, 不再逐格调用 world.get_block
+import numpy as np
+
+# 六个面的顺序: 上, 下, 前 (Z-), 后 (Z+), 左 (X-), 右 (X+)
+FACES = ('top', 'bottom', 'front', 'back', 'left', 'right')
+
+# 每个面的法线, 也是遮挡该面的相邻方块的偏移
+FACE_NORMALS = np.array([
+    (0, 1, 0), (0, -1, 0), (0, 0, -1), (0, 0, 1), (-1, 0, 0), (1, 0, 0),
+], dtype=np.int64)
+
+# 每个面四个角相对方块原点的坐标 (与 GL_QUADS 的绕序一致)
+FACE_CORNERS = np.array([
+    [(0, 1, 0), (1, 1, 0), (1, 1, 1), (0, 1, 1)],  # 上
+    [(0, 0, 1), (1, 0, 1), (1, 0, 0), (0, 0, 0)],  # 下
+    [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)],  # 前
+    [(1, 0, 1), (0, 0, 1), (0, 1, 1), (1, 1, 1)],  # 后
+    [(0, 0, 1), (0, 0, 0), (0, 1, 0), (0, 1, 1)],  # 左
+    [(1, 0, 0), (1, 0, 1), (1, 1, 1), (1, 1, 0)],  # 右
+], dtype=np.float32)
+
+
+def block_table(predicate):
+    """按方块 id 建立布尔查找表 (uint8 方块数组可以直接索引)"""
+    return np.array([bool(predicate(block)) for block in range(256)])
+
+
+def face_masks(padded, draw, clear):
+    """每个面的可见掩码
+
+    draw: 需要生成面的方块, clear: 不遮挡相邻方块的方块 (都是 block_table 查找表)
+    返回 6 个与区块同形状的布尔数组 (没有需要生成面的方块时返回空列表)
+    """
+    sx, sy, sz = padded.shape[0] - 2, padded.shape[1] - 2, padded.shape[2] - 2
+    drawn = draw[padded[1:-1, 1:-1, 1:-1]]
+    if not drawn.any():
+        return []
+    see = clear[padded]
+    return [drawn & see[1 + dx:1 + dx + sx, 1 + dy:1 + dy + sy, 1 + dz:1 + dz + sz]
+            for dx, dy, dz in FACE_NORMALS]
+
+
+# 合并面时每个方向的 (平面轴, 行轴, 列轴): 同一平面内先沿列轴合并成条, 再合并相邻行中相同的条
+GREEDY_AXES = (
+    (1, 2, 0),  # 上: y 平面, 行 z, 列 x
+    (1, 2, 0),  # 下
+    (2, 1, 0),  # 前: z 平面, 行 y, 列 x
+    (2, 1, 0),  # 后
+    (0, 1, 2),  # 左: x 平面, 行 y, 列 z
+    (0, 1, 2),  # 右
+)
+
+
+def _unit_quads(mask, inner):
+    """每个可见面一个四边形: 返回 (起点 (n, 3), 尺寸 (n, 3), 方块 (n,))"""
+    xs, ys, zs = np.nonzero(mask)
+    start = np.stack((xs, ys, zs), axis=1)
+    return start, np.ones_like(start), inner[xs, ys, zs]
+
+
+def _greedy_quads(mask, inner, axes):
+    """合并同一平面内相邻的同种方块面: 返回 (起点 (n, 3), 尺寸 (n, 3), 方块 (n,))"""
+    # 方块 +1 作为合并键, 0 表示没有面; 转成 (平面, 行, 列)
+    key = np.where(mask, inner.astype(np.int16) + 1, 0).transpose(axes)
+    planes, rows, cols = key.shape
+    key = key.reshape(-1, cols)
+
+    # 沿列轴找出相同键的连续段
+    differs = key[:, 1:] != key[:, :-1]
+    edge = np.ones((len(key), 1), dtype=bool)
+    line, col0 = np.nonzero((key != 0) & np.concatenate((edge, differs), axis=1))
+    col1 = np.nonzero((key != 0) & np.concatenate((differs, edge), axis=1))[1]
+    if len(line) == 0:
+        empty = np.zeros((0, 3), dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.int64)
+    blocks = key[line, col0]
+    plane, row = np.divmod(line, rows)
+
+    # 相邻行中起止列和方块都相同的段合并成矩形
+    order = np.lexsort((row, blocks, col1, col0, plane))
+    plane, row, col0, col1, blocks = plane[order], row[order], col0[order], col1[order], blocks[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = ((plane[1:] != plane[:-1]) | (col0[1:] != col0[:-1]) | (col1[1:] != col1[:-1])
+                 | (blocks[1:] != blocks[:-1]) | (row[1:] != row[:-1] + 1))
+    heads = np.flatnonzero(first)
+    tails = np.append(heads[1:], len(order)) - 1
+
+    start = np.zeros((len(heads), 3), dtype=np.int64)
+    size = np.ones((len(heads), 3), dtype=np.int64)
+    start[:, axes[0]] = plane[heads]
+    start[:, axes[1]] = row[heads]
+    start[:, axes[2]] = col0[heads]
+    size[:, axes[1]] = row[tails] - row[heads] + 1
+    size[:, axes[2]] = col1[heads] - col0[heads] + 1
+    return start, size, blocks[heads] - 1
+
+
+def build_mesh(padded, draw, clear, face_colors, origin=(0, 0, 0), greedy=False):
+    """构建区块网格
+
+    padded: (CHUNK_SIZE+2, WORLD_HEIGHT+2, CHUNK_SIZE+2) 方块数组, 边缘为相邻方块
+    face_colors: 每种方块每个面的颜色 (256, 6, 通道数), 已乘光照
+    origin: 区块原点, 顶点坐标 = 原点 + 局部坐标
+    greedy: 把同一平面内相邻的同种方块面合并成大四边形
+    返回 (顶点 (n*4, 3), 颜色 (n*4, 通道数), 每个四边形的面序号 (n,))
+    """
+    inner = padded[1:-1, 1:-1, 1:-1]
+    origin = np.asarray(origin, dtype=np.float32)
+    vertices = []
+    colors = []
+    faces = []
+
+    for face, mask in enumerate(face_masks(padded, draw, clear)):
+        if greedy:
+            start, size, blocks = _greedy_quads(mask, inner, GREEDY_AXES[face])
+        else:
+            start, size, blocks = _unit_quads(mask, inner)
+        if len(blocks) == 0:
+            continue
+        base = start.astype(np.float32) + origin
+        corners = FACE_CORNERS[face] * size[:, None, :].astype(np.float32)
+        vertices.append((base[:, None, :] + corners).reshape(-1, 3))
+        colors.append(np.repeat(face_colors[blocks, face], 4, axis=0))
+        faces.append(np.full(len(blocks), face, dtype=np.uint8))
+
+    if not faces:
+        return (np.zeros((0, 3), dtype=np.float32),
+                np.zeros((0, face_colors.shape[2]), dtype=np.float32),
+                np.zeros(0, dtype=np.uint8))
+    return np.concatenate(vertices), np.concatenate(colors), np.concatenate(faces)
+
+
+def build_meshes(padded, passes, greedy=False):
+    """按多遍参数 [(draw, clear, face_colors)] 构建区块局部坐标的网格, 返回 [(顶点, 颜色)]"""
+    return [build_mesh(padded, draw, clear, face_colors, greedy=greedy)[:2]
+            for draw, clear, face_colors in passes]
+
+
+def face_normals(faces):
+    """每个顶点的法线 (build_mesh 返回的面序号展开为 n*4 个顶点)"""
+    return np.repeat(FACE_NORMALS[faces].astype(np.float32), 4, axis=0)
@@ -1,5 +1,7 @@
 # 3D OpenGL 渲染器
 import math
+import time
+import ctypes
 import random
 import numpy as np
 from OpenGL.GL import *
@@ -7,9 +9,10 @@ from OpenGL.GLU import *
 import pygame
 from settings3d import (
     WINDOW_WIDTH, WINDOW_HEIGHT, FOV, NEAR_PLANE, FAR_PLANE,
-    CHUNK_SIZE, WORLD_HEIGHT, RENDER_DISTANCE, BLOCK_SIZE,
+    CHUNK_SIZE, RENDER_DISTANCE, BLOCK_SIZE, GREEDY_MESHING, CHUNK_RENDERER,
     BlockType, BLOCK_DATA, BLOCK_COLORS
 )
+from mesher3d import FACES, block_table, build_mesh, build_meshes, face_normals
 
 # 雾效果设置
 FOG_START = 30.0  # 雾开始距离
@@ -20,6 +23,9 @@ FOG_COLOR = (0.75, 0.85, 0.95, 1.0)  # 淡蓝色天空雾（默认白天）
 CLOUD_HEIGHT = 100  # 云的高度
 CLOUD_SIZE = 8      # 每朵云的大小
 
+# 顶点缓冲中每个顶点: 位置 3 个 float + RGBA 4 个 float
+VBO_STRIDE = 7 * 4
+
 # 当前光照强度（由昼夜循环更新）
 current_ambient_light = 1.0
 
@@ -27,13 +33,32 @@ current_ambient_light = 1.0
 class Renderer:
     """OpenGL 3D渲染器"""
 
-    def __init__(self):
+    def __init__(self, chunk_renderer=CHUNK_RENDERER, greedy=GREEDY_MESHING):
         self._init_opengl()
         self._init_clouds()
+        self._init_mesh_tables()
         self.ambient_light = 1.0
         self.sky_color = (0.53, 0.81, 0.92)
         self.fog_color = FOG_COLOR
 
+        # 区块绘制方式和是否合并相邻面
+        self.chunk_renderer = chunk_renderer
+        self.greedy = greedy
+        # 绘制时同步重建脏区块; 使用后台区块加载器时关闭, 网格由加载器构建后调用 upload_chunk
+        self.build_on_draw = True
+
+        # 网格统计 (调试信息显示)
+        self.stats = {
+            'mode': 'greedy' if self.greedy else 'faces',
+            'backend': chunk_renderer,
+            'vertex_size': VBO_STRIDE,  # 每个顶点的字节数 (位置和 RGBA 颜色)
+            'chunks': 0,          # 本帧绘制的区块数
+            'vertices': 0,        # 本帧绘制的顶点数
+            'builds': 0,          # 累计重建区块数
+            'build_ms': 0.0,      # 最近一次重建耗时
+            'build_total_ms': 0.0,
+        }
+
     def _init_opengl(self):
         """初始化OpenGL设置"""
         # 启用深度测试
@@ -97,6 +122,30 @@ class Renderer:
                 'blocks': cloud_blocks
             })
 
+    def _init_mesh_tables(self):
+        """建立网格构建用的方块查找表和每个面的颜色"""
+        # 不透明一遍: 水和空气不画, 也不遮挡相邻方块
+        self.list_draw = block_table(lambda b: b != BlockType.AIR and b != BlockType.WATER)
+        self.list_clear = block_table(lambda b: b == BlockType.AIR or b == BlockType.WATER)
+        self.list_colors = np.array([[self._face_vertex_color(b, face) for face in FACES]
+                                     for b in range(256)], dtype=np.float32)
+
+        # 区块网格 (两种绘制方式相同): 不透明一遍用上面的表, 水作为透明一遍 (只画与空气相邻的面)
+        self.chunk_colors = np.concatenate((self.list_colors, np.ones((256, 6, 1), dtype=np.float32)), axis=2)
+        self.chunk_colors[BlockType.WATER, :, 3] = 0.7
+        self.water_draw = block_table(lambda b: b == BlockType.WATER)
+        self.water_clear = block_table(lambda b: b == BlockType.AIR)
+
+        # 网格: 不透明和透明方块分开, 只有不透明方块遮挡相邻面
+        def is_transparent(b):
+            return BLOCK_DATA.get(b, {}).get('transparent', False)
+
+        self.mesh_draw = block_table(lambda b: b != BlockType.AIR and not is_transparent(b))
+        self.mesh_trans_draw = block_table(lambda b: b != BlockType.AIR and is_transparent(b))
+        self.mesh_clear = block_table(lambda b: b == BlockType.AIR or is_transparent(b))
+        self.mesh_colors = np.array([[self._face_mesh_color(b, face, is_transparent(b)) for face in FACES]
+                                     for b in range(256)], dtype=np.float32)
+
     def _render_clouds(self, player):
         """渲染云层"""
         glDisable(GL_FOG)  # 云不受雾影响
@@ -179,20 +228,9 @@ class Renderer:
         # 渲染云层（先渲染远处的对象）
         self._render_clouds(player)
 
-        # 获取玩家所在区块
-        player_chunk_x = math.floor(player.x / CHUNK_SIZE)
-        player_chunk_z = math.floor(player.z / CHUNK_SIZE)
-
         # 渲染周围区块
         glEnable(GL_FOG)  # 确保雾效果启用
-        for dx in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
-            for dz in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
-                chunk_x = player_chunk_x + dx
-                chunk_z = player_chunk_z + dz
-                key = (chunk_x, chunk_z)
-                if key in world.chunks:
-                    chunk = world.chunks[key]
-                    self._render_chunk_cached(chunk, world)
+        self.render_chunks(world, player)
 
         # 渲染僵尸
         if zombies:
@@ -205,6 +243,49 @@ class Renderer:
         # 渲染选中方块高亮
         self._render_block_highlight(player, world)
 
+    def render_chunks(self, world, player):
+        """渲染玩家周围的区块"""
+        # 获取玩家所在区块
+        player_chunk_x = math.floor(player.x / CHUNK_SIZE)
+        player_chunk_z = math.floor(player.z / CHUNK_SIZE)
+
+        self.stats['chunks'] = 0
+        self.stats['vertices'] = 0
+        chunks = []
+        for dx in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
+            for dz in range(-RENDER_DISTANCE, RENDER_DISTANCE + 1):
+                chunk_x = player_chunk_x + dx
+                chunk_z = player_chunk_z + dz
+                key = (chunk_x, chunk_z)
+                if key in world.chunks:
+                    chunks.append(world.chunks[key])
+
+        if self.build_on_draw:
+            for chunk in chunks:
+                if chunk.dirty or not self._has_mesh(chunk):
+                    self.build_chunk(chunk, world)
+        # 后台加载时还没上传过网格的区块先跳过
+        chunks = [chunk for chunk in chunks if self._has_mesh(chunk)]
+
+        # 先画所有不透明面, 再画透明面 (水): 不写深度, 按区块中心到玩家的距离从远到近
+        center_x = player.x / CHUNK_SIZE - 0.5
+        center_z = player.z / CHUNK_SIZE - 0.5
+        far_to_near = sorted(chunks, key=lambda c: (c.chunk_x - center_x) ** 2 + (c.chunk_z - center_z) ** 2,
+                             reverse=True)
+        if self.chunk_renderer == 'vbo':
+            self._render_chunks_vbo(chunks, far_to_near)
+        else:
+            self._render_chunks_lists(chunks, far_to_near)
+
+        self.stats['chunks'] += len(chunks)
+        self.stats['vertices'] += sum(c.vertex_count + c.trans_vertex_count for c in chunks)
+
+    def _has_mesh(self, chunk):
+        """区块是否已上传过当前绘制方式的网格"""
+        if self.chunk_renderer == 'vbo':
+            return hasattr(chunk, 'vbo')
+        return getattr(chunk, 'display_list', None) is not None
+
     def _render_bullets(self, bullets):
         """渲染所有子弹"""
         glDisable(GL_FOG)
@@ -394,80 +475,144 @@ class Renderer:
 
         glEnd()
 
-    def _render_chunk_cached(self, chunk, world):
-        """使用缓存渲染区块"""
-        # 如果区块是脏的，重建显示列表
-        if chunk.dirty or not hasattr(chunk, 'display_list') or chunk.display_list is None:
-            self._build_chunk_display_list(chunk, world)
-            chunk.dirty = False
-
-        # 调用显示列表
-        if hasattr(chunk, 'display_list') and chunk.display_list is not None:
+    def _render_chunks_lists(self, chunks, far_to_near):
+        """用显示列表绘制区块"""
+        for chunk in chunks:
             glCallList(chunk.display_list)
 
-    def _build_chunk_display_list(self, chunk, world):
-        """构建区块的显示列表"""
-        # 删除旧的显示列表
-        if hasattr(chunk, 'display_list') and chunk.display_list is not None:
-            glDeleteLists(chunk.display_list, 1)
-
-        chunk.display_list = glGenLists(1)
-        glNewList(chunk.display_list, GL_COMPILE)
-
-        world_x = chunk.chunk_x * CHUNK_SIZE
-        world_z = chunk.chunk_z * CHUNK_SIZE
-
-        glBegin(GL_QUADS)
-        for x in range(CHUNK_SIZE):
-            for z in range(CHUNK_SIZE):
-                for y in range(WORLD_HEIGHT):
-                    block = chunk.blocks[x][y][z]
-                    if block == BlockType.AIR or block == BlockType.WATER:
-                        continue
-
-                    wx, wz = world_x + x, world_z + z
-
-                    # 检查6个面
-                    # 上面
-                    if y == WORLD_HEIGHT - 1 or chunk.blocks[x][y+1][z] == BlockType.AIR or chunk.blocks[x][y+1][z] == BlockType.WATER:
-                        self._add_face_vertices(wx, y, wz, 'top', block)
-                    # 下面
-                    if y == 0 or chunk.blocks[x][y-1][z] == BlockType.AIR or chunk.blocks[x][y-1][z] == BlockType.WATER:
-                        self._add_face_vertices(wx, y, wz, 'bottom', block)
-                    # 前面 (Z-)
-                    if z == 0:
-                        neighbor = world.get_block(wx, y, wz - 1)
-                    else:
-                        neighbor = chunk.blocks[x][y][z-1]
-                    if neighbor == BlockType.AIR or neighbor == BlockType.WATER:
-                        self._add_face_vertices(wx, y, wz, 'front', block)
-                    # 后面 (Z+)
-                    if z == CHUNK_SIZE - 1:
-                        neighbor = world.get_block(wx, y, wz + 1)
-                    else:
-                        neighbor = chunk.blocks[x][y][z+1]
-                    if neighbor == BlockType.AIR or neighbor == BlockType.WATER:
-                        self._add_face_vertices(wx, y, wz, 'back', block)
-                    # 左面 (X-)
-                    if x == 0:
-                        neighbor = world.get_block(wx - 1, y, wz)
-                    else:
-                        neighbor = chunk.blocks[x-1][y][z]
-                    if neighbor == BlockType.AIR or neighbor == BlockType.WATER:
-                        self._add_face_vertices(wx, y, wz, 'left', block)
-                    # 右面 (X+)
-                    if x == CHUNK_SIZE - 1:
-                        neighbor = world.get_block(wx + 1, y, wz)
-                    else:
-                        neighbor = chunk.blocks[x+1][y][z]
-                    if neighbor == BlockType.AIR or neighbor == BlockType.WATER:
-                        self._add_face_vertices(wx, y, wz, 'right', block)
+        glDepthMask(GL_FALSE)
+        for chunk in far_to_near:
+            if chunk.trans_display_list is not None:
+                glCallList(chunk.trans_display_list)
+        glDepthMask(GL_TRUE)
+
+    def _render_chunks_vbo(self, chunks, far_to_near):
+        """用顶点缓冲绘制区块"""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+
+        for chunk in chunks:
+            self._draw_vbo(chunk, chunk.vbo, chunk.vertex_count)
+
+        glDepthMask(GL_FALSE)
+        for chunk in far_to_near:
+            self._draw_vbo(chunk, chunk.trans_vbo, chunk.trans_vertex_count)
+        glDepthMask(GL_TRUE)
+
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def mesh_passes(self):
+        """区块网格的两遍 [(draw, clear, 面颜色)]: 不透明方块和水, 顶点都用区块局部坐标
+
+        两种绘制方式相同; 后台进程用同样的参数构建网格
+        """
+        return [(self.list_draw, self.list_clear, self.chunk_colors),
+                (self.water_draw, self.water_clear, self.chunk_colors)]
+
+    def build_chunk(self, chunk, world):
+        """在当前线程构建区块网格并上传"""
+        start = time.perf_counter()
+        meshes = build_meshes(world.get_padded_blocks(chunk), self.mesh_passes(), self.greedy)
+        self.upload_chunk(chunk, meshes)
+        chunk.dirty = False
+        self._record_build(start)
+
+    def upload_chunk(self, chunk, meshes):
+        """把 mesh_passes 对应的网格 [(顶点, 颜色)] 上传为顶点缓冲或显示列表 (需要在 GL 线程调用)"""
+        (vertices, colors), (trans_vertices, trans_colors) = meshes
+        if self.chunk_renderer == 'vbo':
+            chunk.vbo, chunk.vbo_capacity = self._upload_vbo(
+                getattr(chunk, 'vbo', None), getattr(chunk, 'vbo_capacity', 0), vertices, colors)
+            chunk.vertex_count = len(vertices)
+            chunk.trans_vbo, chunk.trans_vbo_capacity = self._upload_vbo(
+                getattr(chunk, 'trans_vbo', None), getattr(chunk, 'trans_vbo_capacity', 0),
+                trans_vertices, trans_colors)
+            chunk.trans_vertex_count = len(trans_vertices)
+            return
 
-        glEnd()
+        # 不透明面的列表总是编译 (空列表也表示已构建), 没有水时不保留透明列表
+        chunk.display_list = self._compile_list(chunk, getattr(chunk, 'display_list', None), vertices, colors)
+        chunk.vertex_count = len(vertices)
+        trans_list = getattr(chunk, 'trans_display_list', None)
+        if len(trans_vertices) == 0:
+            if trans_list is not None:
+                glDeleteLists(trans_list, 1)
+            chunk.trans_display_list = None
+        else:
+            chunk.trans_display_list = self._compile_list(chunk, trans_list, trans_vertices, trans_colors)
+        chunk.trans_vertex_count = len(trans_vertices)
+
+    def _compile_list(self, chunk, display_list, vertices, colors):
+        """把区块局部坐标的网格编译为显示列表 (已有列表时原地重新编译), 返回列表编号"""
+        if display_list is None:
+            display_list = glGenLists(1)
+        glNewList(display_list, GL_COMPILE)
+        glPushMatrix()
+        glTranslatef(chunk.chunk_x * CHUNK_SIZE, 0, chunk.chunk_z * CHUNK_SIZE)
+        self._draw_arrays(vertices, colors)
+        glPopMatrix()
         glEndList()
-
-    def _add_face_vertices(self, x, y, z, face, block_type):
-        """添加一个面的顶点到当前GL_QUADS"""
+        return display_list
+
+    def _upload_vbo(self, buffer, capacity, vertices, colors):
+        """上传交错的顶点数据, 返回 (缓冲, 容量)
+
+        容量足够时用 glBufferSubData 覆盖原缓冲, 不够时重新分配并预留余量
+        """
+        if len(vertices) == 0:
+            return buffer, capacity
+        data = np.concatenate((vertices, colors), axis=1)
+        if buffer is None:
+            buffer = glGenBuffers(1)
+            capacity = 0
+
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        if data.nbytes > capacity:
+            # 预留 25%, 挖掘/放置方块后的重建一般不用重新分配
+            capacity = data.nbytes + data.nbytes // 4
+            glBufferData(GL_ARRAY_BUFFER, capacity, None, GL_DYNAMIC_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        return buffer, capacity
+
+    def _draw_vbo(self, chunk, buffer, count):
+        """绘制区块的一个顶点缓冲 (调用前需启用顶点和颜色数组)"""
+        if count == 0:
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glVertexPointer(3, GL_FLOAT, VBO_STRIDE, ctypes.c_void_p(0))
+        glColorPointer(4, GL_FLOAT, VBO_STRIDE, ctypes.c_void_p(12))
+        glPushMatrix()
+        glTranslatef(chunk.chunk_x * CHUNK_SIZE, 0, chunk.chunk_z * CHUNK_SIZE)
+        glDrawArrays(GL_QUADS, 0, count)
+        glPopMatrix()
+
+    def _record_build(self, start):
+        """记录一次在主线程重建区块的耗时"""
+        self.record_build((time.perf_counter() - start) * 1000)
+
+    def record_build(self, elapsed):
+        """记录一次区块重建的耗时 (毫秒)"""
+        self.stats['builds'] += 1
+        self.stats['build_ms'] = elapsed
+        self.stats['build_total_ms'] += elapsed
+
+    def _draw_arrays(self, vertices, colors):
+        """用顶点数组绘制四边形 (在显示列表中编译时会复制数据)"""
+        if len(vertices) == 0:
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices)
+        glColorPointer(colors.shape[1], GL_FLOAT, 0, colors)
+        glDrawArrays(GL_QUADS, 0, len(vertices))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def _face_vertex_color(self, block_type, face):
+        """显示列表中一个面的颜色 (已乘光照)"""
         colors = BLOCK_COLORS.get(block_type, {'all': (0.5, 0.5, 0.5)})
         if 'all' in colors:
             c = colors['all'][:3]
@@ -489,38 +634,7 @@ class Renderer:
         else:
             light = 0.7
 
-        glColor3f(c[0] * light, c[1] * light, c[2] * light)
-
-        if face == 'top':
-            glVertex3f(x, y+1, z)
-            glVertex3f(x+1, y+1, z)
-            glVertex3f(x+1, y+1, z+1)
-            glVertex3f(x, y+1, z+1)
-        elif face == 'bottom':
-            glVertex3f(x, y, z+1)
-            glVertex3f(x+1, y, z+1)
-            glVertex3f(x+1, y, z)
-            glVertex3f(x, y, z)
-        elif face == 'front':
-            glVertex3f(x, y, z)
-            glVertex3f(x+1, y, z)
-            glVertex3f(x+1, y+1, z)
-            glVertex3f(x, y+1, z)
-        elif face == 'back':
-            glVertex3f(x+1, y, z+1)
-            glVertex3f(x, y, z+1)
-            glVertex3f(x, y+1, z+1)
-            glVertex3f(x+1, y+1, z+1)
-        elif face == 'left':
-            glVertex3f(x, y, z+1)
-            glVertex3f(x, y, z)
-            glVertex3f(x, y+1, z)
-            glVertex3f(x, y+1, z+1)
-        elif face == 'right':
-            glVertex3f(x+1, y, z)
-            glVertex3f(x+1, y, z+1)
-            glVertex3f(x+1, y+1, z+1)
-            glVertex3f(x+1, y+1, z)
+        return (c[0] * light, c[1] * light, c[2] * light)
 
     def _render_block(self, x, y, z, block_type):
         """渲染单个方块"""
@@ -623,9 +737,11 @@ class Renderer:
     def _render_chunk(self, chunk, world, transparent=False):
         """渲染单个区块"""
         if chunk.dirty:
+            start = time.perf_counter()
             self._build_chunk_mesh(chunk, world)
             self._build_display_list(chunk)
             chunk.dirty = False
+            self._record_build(start)
 
         # 使用显示列表渲染
         if transparent:
@@ -647,14 +763,7 @@ class Renderer:
 
             glPushMatrix()
             glTranslatef(world_x, 0, world_z)
-            glBegin(GL_QUADS)
-            for i in range(0, chunk.vertex_count * 3, 3):
-                ci = (i // 3) * 4
-                glColor4f(chunk.mesh_colors[ci], chunk.mesh_colors[ci+1],
-                         chunk.mesh_colors[ci+2], chunk.mesh_colors[ci+3])
-                glVertex3f(chunk.mesh_vertices[i], chunk.mesh_vertices[i+1],
-                          chunk.mesh_vertices[i+2])
-            glEnd()
+            self._draw_arrays(chunk.mesh_vertices, chunk.mesh_colors)
             glPopMatrix()
 
             glEndList()
@@ -668,14 +777,7 @@ class Renderer:
 
             glPushMatrix()
             glTranslatef(world_x, 0, world_z)
-            glBegin(GL_QUADS)
-            for i in range(0, chunk.trans_vertex_count * 3, 3):
-                ci = (i // 3) * 4
-                glColor4f(chunk.trans_colors[ci], chunk.trans_colors[ci+1],
-                         chunk.trans_colors[ci+2], chunk.trans_colors[ci+3])
-                glVertex3f(chunk.trans_vertices[i], chunk.trans_vertices[i+1],
-                          chunk.trans_vertices[i+2])
-            glEnd()
+            self._draw_arrays(chunk.trans_vertices, chunk.trans_colors)
             glPopMatrix()
 
             glEndList()
@@ -683,110 +785,22 @@ class Renderer:
             chunk.trans_display_list = None
 
     def _build_chunk_mesh(self, chunk, world):
-        """构建区块网格"""
-        vertices = []
-        colors = []
-        normals = []
-        trans_vertices = []
-        trans_colors = []
-        trans_normals = []
-
-        world_x = chunk.chunk_x * CHUNK_SIZE
-        world_z = chunk.chunk_z * CHUNK_SIZE
-
-        for x in range(CHUNK_SIZE):
-            for y in range(WORLD_HEIGHT):
-                for z in range(CHUNK_SIZE):
-                    block = chunk.blocks[x][y][z]
-                    if block == BlockType.AIR:
-                        continue
-
-                    data = BLOCK_DATA.get(block, {})
-                    is_transparent = data.get('transparent', False)
-
-                    # 获取方块颜色
-                    block_colors = BLOCK_COLORS.get(block, {'all': (0.5, 0.5, 0.5)})
-
-                    # 检查每个面是否需要渲染
-                    # 上面 (Y+)
-                    if not self._is_opaque(chunk, world, x, y + 1, z, world_x, world_z):
-                        color = self._get_face_color(block_colors, 'top')
-                        self._add_face(
-                            x, y, z, 'top', color, is_transparent,
-                            vertices, colors, normals,
-                            trans_vertices, trans_colors, trans_normals
-                        )
-
-                    # 下面 (Y-)
-                    if not self._is_opaque(chunk, world, x, y - 1, z, world_x, world_z):
-                        color = self._get_face_color(block_colors, 'bottom')
-                        self._add_face(
-                            x, y, z, 'bottom', color, is_transparent,
-                            vertices, colors, normals,
-                            trans_vertices, trans_colors, trans_normals
-                        )
-
-                    # 前面 (Z-)
-                    if not self._is_opaque(chunk, world, x, y, z - 1, world_x, world_z):
-                        color = self._get_face_color(block_colors, 'side')
-                        self._add_face(
-                            x, y, z, 'front', color, is_transparent,
-                            vertices, colors, normals,
-                            trans_vertices, trans_colors, trans_normals
-                        )
-
-                    # 后面 (Z+)
-                    if not self._is_opaque(chunk, world, x, y, z + 1, world_x, world_z):
-                        color = self._get_face_color(block_colors, 'side')
-                        self._add_face(
-                            x, y, z, 'back', color, is_transparent,
-                            vertices, colors, normals,
-                            trans_vertices, trans_colors, trans_normals
-                        )
-
-                    # 左面 (X-)
-                    if not self._is_opaque(chunk, world, x - 1, y, z, world_x, world_z):
-                        color = self._get_face_color(block_colors, 'side')
-                        self._add_face(
-                            x, y, z, 'left', color, is_transparent,
-                            vertices, colors, normals,
-                            trans_vertices, trans_colors, trans_normals
-                        )
-
-                    # 右面 (X+)
-                    if not self._is_opaque(chunk, world, x + 1, y, z, world_x, world_z):
-                        color = self._get_face_color(block_colors, 'side')
-                        self._add_face(
-                            x, y, z, 'right', color, is_transparent,
-                            vertices, colors, normals,
-                            trans_vertices, trans_colors, trans_normals
-                        )
-
-        # 转换为numpy数组
-        chunk.mesh_vertices = np.array(vertices, dtype=np.float32)
-        chunk.mesh_colors = np.array(colors, dtype=np.float32)
-        chunk.mesh_normals = np.array(normals, dtype=np.float32)
-        chunk.vertex_count = len(vertices) // 3
-
-        chunk.trans_vertices = np.array(trans_vertices, dtype=np.float32)
-        chunk.trans_colors = np.array(trans_colors, dtype=np.float32)
-        chunk.trans_normals = np.array(trans_normals, dtype=np.float32)
-        chunk.trans_vertex_count = len(trans_vertices) // 3
-
-    def _is_opaque(self, chunk, world, x, y, z, world_x, world_z):
-        """检查方块是否不透明"""
-        if y < 0 or y >= WORLD_HEIGHT:
-            return False
-
-        if 0 <= x < CHUNK_SIZE and 0 <= z < CHUNK_SIZE:
-            block = chunk.blocks[x][y][z]
-        else:
-            block = world.get_block(world_x + x, y, world_z + z)
-
-        if block == BlockType.AIR:
-            return False
-
-        return not BLOCK_DATA.get(block, {}).get('transparent', False)
+        """构建区块网格 (局部坐标, 不透明和透明方块分开)"""
+        padded = world.get_padded_blocks(chunk)
+
+        vertices, colors, faces = build_mesh(padded, self.mesh_draw, self.mesh_clear, self.mesh_colors,
+                                             greedy=self.greedy)
+        chunk.mesh_vertices = vertices
+        chunk.mesh_colors = colors
+        chunk.mesh_normals = face_normals(faces)
+        chunk.vertex_count = len(vertices)
+
+        vertices, colors, faces = build_mesh(padded, self.mesh_trans_draw, self.mesh_clear, self.mesh_colors,
+                                             greedy=self.greedy)
+        chunk.trans_vertices = vertices
+        chunk.trans_colors = colors
+        chunk.trans_normals = face_normals(faces)
+        chunk.trans_vertex_count = len(vertices)
 
     def _get_face_color(self, block_colors, face):
         """获取面的颜色"""
@@ -802,49 +816,10 @@ class Renderer:
             return color[:3]
         return color
 
-    def _add_face(self, x, y, z, face, color, is_transparent,
-                  vertices, colors, normals,
-                  trans_vertices, trans_colors, trans_normals):
-        """添加一个面的顶点"""
-        # 面的顶点定义
-        face_vertices = {
-            'top': [
-                (x, y + 1, z), (x + 1, y + 1, z),
-                (x + 1, y + 1, z + 1), (x, y + 1, z + 1)
-            ],
-            'bottom': [
-                (x, y, z + 1), (x + 1, y, z + 1),
-                (x + 1, y, z), (x, y, z)
-            ],
-            'front': [
-                (x, y, z), (x + 1, y, z),
-                (x + 1, y + 1, z), (x, y + 1, z)
-            ],
-            'back': [
-                (x + 1, y, z + 1), (x, y, z + 1),
-                (x, y + 1, z + 1), (x + 1, y + 1, z + 1)
-            ],
-            'left': [
-                (x, y, z + 1), (x, y, z),
-                (x, y + 1, z), (x, y + 1, z + 1)
-            ],
-            'right': [
-                (x + 1, y, z), (x + 1, y, z + 1),
-                (x + 1, y + 1, z + 1), (x + 1, y + 1, z)
-            ],
-        }
-
-        face_normals = {
-            'top': (0, 1, 0),
-            'bottom': (0, -1, 0),
-            'front': (0, 0, -1),
-            'back': (0, 0, 1),
-            'left': (-1, 0, 0),
-            'right': (1, 0, 0),
-        }
-
-        verts = face_vertices[face]
-        normal = face_normals[face]
+    def _face_mesh_color(self, block_type, face, is_transparent):
+        """网格中一个面的 RGBA 颜色 (已乘光照)"""
+        block_colors = BLOCK_COLORS.get(block_type, {'all': (0.5, 0.5, 0.5)})
+        color = self._get_face_color(block_colors, face if face in ('top', 'bottom') else 'side')
 
         # 光照调整
         light_factors = {
@@ -857,18 +832,8 @@ class Renderer:
         }
         light = light_factors[face]
 
-        # 调整颜色
-        r, g, b = color[0] * light, color[1] * light, color[2] * light
         alpha = 0.7 if is_transparent else 1.0
-
-        target_v = trans_vertices if is_transparent else vertices
-        target_c = trans_colors if is_transparent else colors
-        target_n = trans_normals if is_transparent else normals
-
-        for vx, vy, vz in verts:
-            target_v.extend([vx, vy, vz])
-            target_c.extend([r, g, b, alpha])
-            target_n.extend(normal)
+        return (color[0] * light, color[1] * light, color[2] * light, alpha)
 
     def _render_block_highlight(self, player, world):
         """渲染方块选中高亮"""
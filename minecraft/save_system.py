@@ -1,7 +1,8 @@
 # Minecraft 3D 存档系统
 import json
 import os
-from settings3d import CHUNK_SIZE, WORLD_HEIGHT, BlockType
+import numpy as np
+from settings3d import BlockType
 
 
 SAVE_DIR = os.path.join(os.path.dirname(__file__), 'saves')
@@ -118,29 +119,22 @@ def load_game(world, player, filename='save.json'):
 
 def _serialize_chunk(chunk):
     """序列化区块（只保存非空气方块）"""
-    blocks = []
-    for x in range(CHUNK_SIZE):
-        for y in range(WORLD_HEIGHT):
-            for z in range(CHUNK_SIZE):
-                block = chunk.blocks[x][y][z]
-                if block != BlockType.AIR:
-                    blocks.append([x, y, z, block])
-
-    return blocks if blocks else None
+    # nonzero 按 x, y, z 顺序返回, 与逐格遍历的顺序相同
+    xs, ys, zs = np.nonzero(chunk.blocks)
+    if len(xs) == 0:
+        return None
+    return np.stack((xs, ys, zs, chunk.blocks[xs, ys, zs]), axis=1).tolist()
 
 
 def _deserialize_chunk(chunk, blocks_data):
     """反序列化区块"""
     # 先清空区块
-    for x in range(CHUNK_SIZE):
-        for y in range(WORLD_HEIGHT):
-            for z in range(CHUNK_SIZE):
-                chunk.blocks[x][y][z] = BlockType.AIR
+    chunk.blocks[:] = BlockType.AIR
 
     # 恢复保存的方块
-    for block_data in blocks_data:
-        x, y, z, block_type = block_data
-        chunk.blocks[x][y][z] = block_type
+    if blocks_data:
+        data = np.array(blocks_data, dtype=np.int64)
+        chunk.blocks[data[:, 0], data[:, 1], data[:, 2]] = data[:, 3]
 
     chunk.dirty = True
 
@@ -12,6 +12,10 @@ BLOCK_SIZE = 1.0
 # 区块设置
 CHUNK_SIZE = 16  # 16x16x128 方块
 RENDER_DISTANCE = 2  # 渲染距离（区块数）- 降低以提高性能
+GREEDY_MESHING = True  # 合并同一平面内相邻的同种方块面为大四边形（减少顶点数）
+CHUNK_RENDERER = 'vbo'  # 区块绘制方式: 'vbo'（顶点缓冲, 不透明/透明两遍）或 'display_list'（显示列表）
+CHUNK_WORKERS = 2  # 后台生成区块和构建网格的进程数（0 = 在主线程同步完成）
+CHUNK_UPLOADS_PER_FRAME = 2  # 每帧最多上传到显卡的区块网格数
 
 # 世界设置
 WORLD_HEIGHT = 128
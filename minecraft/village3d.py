@@ -29,7 +29,7 @@ class VillageGenerator:
         local_z = z - world_z_offset
 
         if 0 <= local_x < CHUNK_SIZE and 0 <= y < WORLD_HEIGHT and 0 <= local_z < CHUNK_SIZE:
-            chunk.blocks[local_x][y][local_z] = block_type
+            chunk.blocks[local_x, y, local_z] = block_type
             return True
         return False
 
@@ -518,13 +518,11 @@ def generate_terrain_with_hills(chunk, chunk_x, chunk_z, seed, ground_y):
             ground_heights[local_x][local_z] = local_ground
 
             # 填充地面
-            for y in range(local_ground + 1):
-                if y == local_ground:
-                    chunk.blocks[local_x][y][local_z] = BlockType.GRASS
-                elif y >= local_ground - 3:
-                    chunk.blocks[local_x][y][local_z] = BlockType.DIRT
-                else:
-                    chunk.blocks[local_x][y][local_z] = BlockType.STONE
+            column = chunk.get_column(local_x, local_z)
+            dirt_y = max(local_ground - 3, 0)
+            column[:dirt_y] = BlockType.STONE
+            column[dirt_y:local_ground] = BlockType.DIRT
+            column[local_ground] = BlockType.GRASS
 
     # 生成自然装饰（高草和花朵）
     _generate_terrain_decorations(chunk, ground_heights, terrain_rng)
@@ -542,29 +540,29 @@ def _generate_terrain_decorations(chunk, ground_heights, rng):
             ground_y = ground_heights[local_x][local_z]
 
             # 只在草方块上生成装饰
-            if chunk.blocks[local_x][ground_y][local_z] != BlockType.GRASS:
+            if chunk.blocks[local_x, ground_y, local_z] != BlockType.GRASS:
                 continue
 
             # 确保上方是空气
             if ground_y + 1 >= WORLD_HEIGHT:
                 continue
-            if chunk.blocks[local_x][ground_y + 1][local_z] != BlockType.AIR:
+            if chunk.blocks[local_x, ground_y + 1, local_z] != BlockType.AIR:
                 continue
 
             roll = rng.random()
 
             if roll < 0.12:
                 # 高草 (12%)
-                chunk.blocks[local_x][ground_y + 1][local_z] = BlockType.TALL_GRASS
+                chunk.blocks[local_x, ground_y + 1, local_z] = BlockType.TALL_GRASS
             elif roll < 0.14:
                 # 红花 (2%)
-                chunk.blocks[local_x][ground_y + 1][local_z] = BlockType.FLOWER_RED
+                chunk.blocks[local_x, ground_y + 1, local_z] = BlockType.FLOWER_RED
             elif roll < 0.155:
                 # 黄花 (1.5%)
-                chunk.blocks[local_x][ground_y + 1][local_z] = BlockType.FLOWER_YELLOW
+                chunk.blocks[local_x, ground_y + 1, local_z] = BlockType.FLOWER_YELLOW
             elif roll < 0.165:
                 # 蓝花 (1%)
-                chunk.blocks[local_x][ground_y + 1][local_z] = BlockType.FLOWER_BLUE
+                chunk.blocks[local_x, ground_y + 1, local_z] = BlockType.FLOWER_BLUE
 
 
 def generate_fortress(world, center_x, center_y, center_z):
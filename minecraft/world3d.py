@@ -1,6 +1,7 @@
 # 3D 世界生成系统
 import random
 import math
+import numpy as np
 from settings3d import (
     BlockType, BLOCK_DATA, CHUNK_SIZE, WORLD_HEIGHT,
     SEA_LEVEL, GROUND_LEVEL, RENDER_DISTANCE
@@ -52,10 +53,8 @@ class Chunk:
         self.chunk_x = chunk_x
         self.chunk_z = chunk_z
 
-        # 方块数据: blocks[x][y][z]
-        self.blocks = [[[BlockType.AIR for _ in range(CHUNK_SIZE)]
-                        for _ in range(WORLD_HEIGHT)]
-                       for _ in range(CHUNK_SIZE)]
+        # 方块数据: blocks[x, y, z], 连续的 uint8 数组 (32KB, 空气为 0)
+        self.blocks = np.zeros((CHUNK_SIZE, WORLD_HEIGHT, CHUNK_SIZE), dtype=np.uint8)
 
         # 是否需要重新构建网格
         self.dirty = True
@@ -68,17 +67,42 @@ class Chunk:
     def get_block(self, x, y, z):
         """获取局部坐标的方块"""
         if 0 <= x < CHUNK_SIZE and 0 <= y < WORLD_HEIGHT and 0 <= z < CHUNK_SIZE:
-            return self.blocks[x][y][z]
+            return int(self.blocks[x, y, z])
         return BlockType.AIR
 
     def set_block(self, x, y, z, block_type):
         """设置局部坐标的方块"""
         if 0 <= x < CHUNK_SIZE and 0 <= y < WORLD_HEIGHT and 0 <= z < CHUNK_SIZE:
-            self.blocks[x][y][z] = block_type
+            self.blocks[x, y, z] = block_type
             self.dirty = True
             return True
         return False
 
+    def get_column(self, x, z):
+        """获取一列方块 (长度 WORLD_HEIGHT 的视图, 修改后需自行标记 dirty)"""
+        return self.blocks[x, :, z]
+
+    def set_column(self, x, z, column, y0=0):
+        """从 y0 开始写入一列方块"""
+        self.blocks[x, y0:y0 + len(column), z] = column
+        self.dirty = True
+
+    def get_region(self, x0, y0, z0, x1, y1, z1):
+        """获取 [x0, x1) x [y0, y1) x [z0, z1) 范围的方块 (视图)"""
+        return self.blocks[x0:x1, y0:y1, z0:z1]
+
+    def fill(self, x0, y0, z0, x1, y1, z1, block_type):
+        """用一种方块填充 [x0, x1) x [y0, y1) x [z0, z1) 范围 (超出区块的部分忽略)"""
+        self.blocks[max(x0, 0):x1, max(y0, 0):y1, max(z0, 0):z1] = block_type
+        self.dirty = True
+
+    def top_block(self, x, z, block_type, y_min=0, y_max=WORLD_HEIGHT):
+        """[y_min, y_max) 范围内最高的指定方块的 y, 没有时返回 None"""
+        ys = np.flatnonzero(self.blocks[x, y_min:y_max, z] == block_type)
+        if len(ys) == 0:
+            return None
+        return y_min + int(ys[-1])
+
 
 class World:
     """3D 游戏世界 - One Block 模式"""
@@ -146,9 +170,9 @@ class World:
                 # 生成高度图
                 height = self._get_terrain_height(world_x, world_z)
 
-                for y in range(WORLD_HEIGHT):
-                    block = self._get_block_at(world_x, y, world_z, height)
-                    chunk.blocks[local_x][y][local_z] = block
+                column = [self._get_block_at(world_x, y, world_z, height)
+                          for y in range(WORLD_HEIGHT)]
+                chunk.set_column(local_x, local_z, column)
 
         # 生成树木
         self._generate_trees(chunk, chunk_x, chunk_z)
@@ -171,10 +195,9 @@ class World:
             local_obx = obx - world_x_offset
             local_obz = obz - world_z_offset
             if 0 <= local_obx < CHUNK_SIZE and 0 <= local_obz < CHUNK_SIZE:
-                chunk.blocks[local_obx][oby][local_obz] = BlockType.GRASS
+                chunk.blocks[local_obx, oby, local_obz] = BlockType.GRASS
                 # 确保核心方块上方是空气
-                for y in range(oby + 1, oby + 5):
-                    chunk.blocks[local_obx][y][local_obz] = BlockType.AIR
+                chunk.blocks[local_obx, oby + 1:oby + 5, local_obz] = BlockType.AIR
 
         # 在平台上生成树木
         self._generate_one_block_trees(chunk, chunk_x, chunk_z, oby)
@@ -219,11 +242,10 @@ class World:
             if abs(world_x - obx) <= platform_radius and abs(world_z - obz) <= platform_radius:
                 if abs(world_x - obx) > 3 or abs(world_z - obz) > 3:  # 不在核心方块附近
                     # 寻找该位置的草方块（地形有起伏）
-                    for y in range(base_ground_y + 10, base_ground_y - 10, -1):
-                        if 0 <= y < WORLD_HEIGHT:
-                            if chunk.blocks[local_x][y][local_z] == BlockType.GRASS:
-                                self._place_tree(chunk, local_x, y + 1, local_z, tree_random)
-                                break
+                    y = chunk.top_block(local_x, local_z, BlockType.GRASS,
+                                        max(base_ground_y - 9, 0), base_ground_y + 11)
+                    if y is not None:
+                        self._place_tree(chunk, local_x, y + 1, local_z, tree_random)
 
     def get_next_one_block(self):
         """获取下一个 One Block 方块类型"""
@@ -332,11 +354,7 @@ class World:
             local_z = tree_random.randint(3, CHUNK_SIZE - 4)
 
             # 找到地表
-            surface_y = None
-            for y in range(WORLD_HEIGHT - 1, 0, -1):
-                if chunk.blocks[local_x][y][local_z] == BlockType.GRASS:
-                    surface_y = y
-                    break
+            surface_y = chunk.top_block(local_x, local_z, BlockType.GRASS, 1)
 
             if surface_y is None or surface_y < SEA_LEVEL + 5 or surface_y > 75:
                 continue
@@ -349,9 +367,7 @@ class World:
         trunk_height = rng.randint(4, 6)
 
         # 树干
-        for y in range(trunk_height):
-            if base_y + y < WORLD_HEIGHT:
-                chunk.blocks[x][base_y + y][z] = BlockType.WOOD
+        chunk.blocks[x, base_y:base_y + trunk_height, z] = BlockType.WOOD
 
         # 树叶
         leaf_y = base_y + trunk_height - 2
@@ -363,8 +379,31 @@ class World:
                     if dist <= 3:
                         lx, ly, lz = x + dx, leaf_y + dy, z + dz
                         if (0 <= lx < CHUNK_SIZE and 0 <= ly < WORLD_HEIGHT and 0 <= lz < CHUNK_SIZE):
-                            if chunk.blocks[lx][ly][lz] == BlockType.AIR:
-                                chunk.blocks[lx][ly][lz] = BlockType.LEAVES
+                            if chunk.blocks[lx, ly, lz] == BlockType.AIR:
+                                chunk.blocks[lx, ly, lz] = BlockType.LEAVES
+
+    def get_padded_blocks(self, chunk):
+        """区块方块加上四周相邻区块的一格边缘, 供网格构建使用
+
+        形状 (CHUNK_SIZE+2, WORLD_HEIGHT+2, CHUNK_SIZE+2); 世界上下边界和未生成的相邻区块视为空气
+        """
+        padded = np.zeros((CHUNK_SIZE + 2, WORLD_HEIGHT + 2, CHUNK_SIZE + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1, 1:-1] = chunk.blocks
+
+        chunk_x, chunk_z = chunk.chunk_x, chunk.chunk_z
+        neighbor = self.chunks.get((chunk_x - 1, chunk_z))
+        if neighbor is not None:
+            padded[0, 1:-1, 1:-1] = neighbor.blocks[-1]
+        neighbor = self.chunks.get((chunk_x + 1, chunk_z))
+        if neighbor is not None:
+            padded[-1, 1:-1, 1:-1] = neighbor.blocks[0]
+        neighbor = self.chunks.get((chunk_x, chunk_z - 1))
+        if neighbor is not None:
+            padded[1:-1, 1:-1, 0] = neighbor.blocks[:, :, -1]
+        neighbor = self.chunks.get((chunk_x, chunk_z + 1))
+        if neighbor is not None:
+            padded[1:-1, 1:-1, -1] = neighbor.blocks[:, :, 0]
+        return padded
 
     def get_block(self, x, y, z):
         """获取世界坐标的方块"""